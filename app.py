@@ -6,6 +6,12 @@ Perfil Humano - 9na Edición
 import streamlit as st
 import pandas as pd
 from pathlib import Path
+import sys
+
+# Agregar el directorio raíz al path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.utils.datos import cargar_encuesta_normalizada
 
 # Configuración de la página
 st.set_page_config(
@@ -95,8 +101,8 @@ def load_logos():
 @st.cache_data
 def load_data():
     base_path = Path(__file__).parent
-    csv_path = base_path / 'data' / 'processed' / 'encuesta_normalizada.csv'
-    df = pd.read_csv(csv_path)
+    # Solo las columnas que usa la portada
+    df = cargar_encuesta_normalizada(base_path, columns=['rubro', 'categoria_tamano'])
     return df
 
 def main():
@@ -8,6 +8,14 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from pathlib import Path
+import sys
+
+# Agregar el directorio src al path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.utils.datos import cargar_encuesta_normalizada, quitar_categorias_vacias
+from src.analytics.beneficios import (prevalencia_beneficios_en_cache, prevalencia_otorgados,
+                                     coocurrencia_beneficios_en_cache, lift_segmento)
 
 # Configuración de página
 st.set_page_config(
@@ -35,10 +43,34 @@ COLOR_PALETTE = ['#ED1C24', '#00A651', '#FDB913', '#2E5090', '#F68B1F',
 @st.cache_data
 def load_data():
     base_path = Path(__file__).parent.parent
-    csv_path = base_path / 'data' / 'processed' / 'encuesta_normalizada.csv'
-    df = pd.read_csv(csv_path)
+    df = cargar_encuesta_normalizada(base_path)
     return df
 
+# Prevalencia de beneficios por tamaño y rubro (se recalcula solo si cambia el dataset)
+@st.cache_data
+def load_prevalencia():
+    base_path = Path(__file__).parent.parent
+    return prevalencia_beneficios_en_cache(base_path)
+
+# Co-ocurrencia y lift de beneficios por segmento (matrices precalculadas)
+@st.cache_data
+def load_coocurrencia():
+    base_path = Path(__file__).parent.parent
+    coocurrencia = coocurrencia_beneficios_en_cache(base_path)
+    nombres = pd.Series(coocurrencia['beneficios'])
+    coocurrencia['etiquetas'] = nombres.str.replace('benef_', '').str.replace('_', ' ').str.title().to_numpy()
+    return coocurrencia
+
+def tabla_beneficios(prevalencia, nombres):
+    """Beneficios de la lista que otorga al menos una empresa, con el formato de los gráficos"""
+    filas = prevalencia[[any(nombre in col for nombre in nombres) for col in prevalencia.index]]
+    filas = filas[filas['empresas'] > 0]
+    return pd.DataFrame({
+        'Beneficio': [col.replace('benef_', '').replace('_', ' ').title()[:30] for col in filas.index],
+        'Porcentaje': filas['proporcion'].to_numpy() * 100,
+        'Empresas': filas['empresas'].to_numpy()
+    })
+
 def acortar_texto(texto, max_len=30):
     """Acorta textos largos para mejor visualización"""
     if pd.isna(texto):
@@ -95,6 +127,9 @@ def main():
     if filtro_rubro != 'Todos':
         df_filtered = df_filtered[df_filtered[rubro_col] == filtro_rubro]
 
+    # Las columnas categóricas conservan las categorías filtradas: quitarlas de los conteos
+    df_filtered = quitar_categorias_vacias(df_filtered)
+
     # Mostrar información de filtros aplicados
     if filtro_tamano != 'Todos' or filtro_rubro != 'Todos':
         st.success(f"📌 Mostrando datos para: **{len(df_filtered)}** empresas (de {len(df)} total)")
@@ -560,6 +595,9 @@ def main():
     # ============ SECCIÓN 5: BENEFICIOS ============
     st.markdown("## 🎁 Beneficios Ofrecidos")
 
+    # Proporción de empresas que otorgan cada beneficio en el segmento filtrado
+    prevalencia = prevalencia_otorgados(load_prevalencia(), filtro_tamano, filtro_rubro)
+
     tab1, tab2 = st.tabs(["💵 Beneficios Monetarios", "⏰ Beneficios de Tiempo"])
 
     with tab1:
@@ -573,71 +611,34 @@ def main():
                                     'tarjeta_credito', 'colegio', 'pension', 'pago_dolares',
                                     'posgrados', 'coaching', 'idiomas', 'internet']
 
-        benef_cols = [col for col in df_filtered.columns
-                      if col.startswith('benef_') and
-                      any(mon in col for mon in benef_monetarios_nombres)]
-
-        if benef_cols:
-            benef_data = []
-
-            for col in benef_cols:
-                if col not in df_filtered.columns:
-                    continue
-
-                # Filtrar valores que son headers (con emojis)
-                valores = df_filtered[col].dropna()
-                valores = valores[~valores.str.contains('💵|⏰', na=False)]
-
-                if len(valores) == 0:
-                    continue
-
-                # Contar diferentes formas de "Si"
-                si_count = 0
-                if 'medicina_prepaga' in col:
-                    # Para medicina prepaga: contar "Otorgamos..." como Si
-                    si_count = valores.str.contains('Otorgamos', case=False, na=False).sum()
-                else:
-                    # Para otros: contar "Si"
-                    si_count = (valores == 'Si').sum()
-
-                total = len(valores)
-
-                if total > 0 and si_count > 0:
-                    pct = (si_count / total) * 100
-                    benef_name = col.replace('benef_', '').replace('_', ' ').title()
-                    benef_data.append({
-                        'Beneficio': benef_name[:30],  # Acortar
-                        'Porcentaje': pct,
-                        'Empresas': si_count
-                    })
-
-            if benef_data:
-                df_benef = pd.DataFrame(benef_data)
-                df_benef = df_benef.sort_values('Porcentaje', ascending=True)  # Mostrar TODOS
-
-                fig_benef = px.bar(
-                    df_benef,
-                    x='Porcentaje',
-                    y='Beneficio',
-                    orientation='h',
-                    title='% de Empresas que Ofrecen cada Beneficio',
-                    color='Porcentaje',
-                    color_continuous_scale=['#FDB913', '#00A651'],
-                    custom_data=['Empresas']
-                )
-                fig_benef.update_traces(
-                    hovertemplate='<b>%{y}</b><br>Empresas: %{customdata[0]}<br>Porcentaje: %{x:.1f}%<extra></extra>'
-                )
-                # Altura dinámica basada en cantidad de beneficios
-                altura = max(450, len(df_benef) * 30)
-                fig_benef.update_layout(
-                    height=altura,
-                    showlegend=False,
-                    xaxis_title="Porcentaje de Empresas",
-                    yaxis_title=""
-                )
+        df_benef = tabla_beneficios(prevalencia, benef_monetarios_nombres)
+
+        if len(df_benef) > 0:
+            df_benef = df_benef.sort_values('Porcentaje', ascending=True)  # Mostrar TODOS
+
+            fig_benef = px.bar(
+                df_benef,
+                x='Porcentaje',
+                y='Beneficio',
+                orientation='h',
+                title='% de Empresas que Ofrecen cada Beneficio',
+                color='Porcentaje',
+                color_continuous_scale=['#FDB913', '#00A651'],
+                custom_data=['Empresas']
+            )
+            fig_benef.update_traces(
+                hovertemplate='<b>%{y}</b><br>Empresas: %{customdata[0]}<br>Porcentaje: %{x:.1f}%<extra></extra>'
+            )
+            # Altura dinámica basada en cantidad de beneficios
+            altura = max(450, len(df_benef) * 30)
+            fig_benef.update_layout(
+                height=altura,
+                showlegend=False,
+                xaxis_title="Porcentaje de Empresas",
+                yaxis_title=""
+            )
 
-                st.plotly_chart(fig_benef, use_column_width=True)
+            st.plotly_chart(fig_benef, use_column_width=True)
         else:
             st.info("No hay datos de beneficios disponibles con los filtros actuales")
 
@@ -649,67 +650,70 @@ def main():
                                 'cumpleanos', 'maternidad', 'paternidad',
                                 'after_office', 'integracion']
 
-        benef_tiempo_cols = [col for col in df_filtered.columns
-                             if col.startswith('benef_') and
-                             any(tiempo in col for tiempo in benef_tiempo_nombres)]
-
-        if benef_tiempo_cols:
-            benef_tiempo_data = []
-
-            for col in benef_tiempo_cols:
-                if col not in df_filtered.columns:
-                    continue
-
-                # Filtrar valores que son headers (con emojis)
-                valores = df_filtered[col].dropna()
-                valores = valores[~valores.str.contains('💵|⏰', na=False)]
-
-                if len(valores) == 0:
-                    continue
-
-                # Contar "Si"
-                si_count = (valores == 'Si').sum()
-                total = len(valores)
-
-                if total > 0 and si_count > 0:
-                    pct = (si_count / total) * 100
-                    benef_name = col.replace('benef_', '').replace('_', ' ').title()
-                    benef_tiempo_data.append({
-                        'Beneficio': benef_name[:30],
-                        'Porcentaje': pct,
-                        'Empresas': si_count
-                    })
-
-            if benef_tiempo_data:
-                df_benef_tiempo = pd.DataFrame(benef_tiempo_data)
-                df_benef_tiempo = df_benef_tiempo.sort_values('Porcentaje', ascending=True)  # Mostrar TODOS
-
-                fig_benef_tiempo = px.bar(
-                    df_benef_tiempo,
-                    x='Porcentaje',
-                    y='Beneficio',
-                    orientation='h',
-                    title='% de Empresas que Ofrecen cada Beneficio',
-                    color='Porcentaje',
-                    color_continuous_scale=['#2E5090', '#00A651'],
-                    custom_data=['Empresas']
-                )
-                fig_benef_tiempo.update_traces(
-                    hovertemplate='<b>%{y}</b><br>Empresas: %{customdata[0]}<br>Porcentaje: %{x:.1f}%<extra></extra>'
-                )
-                # Altura dinámica basada en cantidad de beneficios
-                altura_tiempo = max(450, len(df_benef_tiempo) * 30)
-                fig_benef_tiempo.update_layout(
-                    height=altura_tiempo,
-                    showlegend=False,
-                    xaxis_title="Porcentaje de Empresas",
-                    yaxis_title=""
-                )
+        df_benef_tiempo = tabla_beneficios(prevalencia, benef_tiempo_nombres)
 
-                st.plotly_chart(fig_benef_tiempo, use_column_width=True)
+        if len(df_benef_tiempo) > 0:
+            df_benef_tiempo = df_benef_tiempo.sort_values('Porcentaje', ascending=True)  # Mostrar TODOS
+
+            fig_benef_tiempo = px.bar(
+                df_benef_tiempo,
+                x='Porcentaje',
+                y='Beneficio',
+                orientation='h',
+                title='% de Empresas que Ofrecen cada Beneficio',
+                color='Porcentaje',
+                color_continuous_scale=['#2E5090', '#00A651'],
+                custom_data=['Empresas']
+            )
+            fig_benef_tiempo.update_traces(
+                hovertemplate='<b>%{y}</b><br>Empresas: %{customdata[0]}<br>Porcentaje: %{x:.1f}%<extra></extra>'
+            )
+            # Altura dinámica basada en cantidad de beneficios
+            altura_tiempo = max(450, len(df_benef_tiempo) * 30)
+            fig_benef_tiempo.update_layout(
+                height=altura_tiempo,
+                showlegend=False,
+                xaxis_title="Porcentaje de Empresas",
+                yaxis_title=""
+            )
+
+            st.plotly_chart(fig_benef_tiempo, use_column_width=True)
         else:
             st.info("No hay datos de beneficios de tiempo disponibles con los filtros actuales")
 
+    # Beneficios que se otorgan juntos
+    st.markdown("### 🤝 Beneficios que se Otorgan Juntos")
+    st.markdown("Lift > 1: el par se otorga junto más de lo esperable si fueran independientes")
+
+    coocurrencia = load_coocurrencia()
+    segmento_lift = lift_segmento(coocurrencia, filtro_tamano, filtro_rubro, coocurrencia['etiquetas'])
+
+    if segmento_lift is not None and len(segmento_lift[0]) > 1:
+        lift, conjunta, empresas_segmento = segmento_lift
+
+        fig_lift = go.Figure(go.Heatmap(
+            z=lift.to_numpy(),
+            x=lift.columns,
+            y=lift.index,
+            customdata=conjunta.to_numpy(),
+            colorscale='RdBu',
+            zmid=1,
+            colorbar=dict(title='Lift'),
+            hovertemplate='<b>%{y}</b> + <b>%{x}</b><br>Lift: %{z:.2f}<br>'
+                          'Empresas con ambos: %{customdata}<extra></extra>'
+        ))
+        fig_lift.update_layout(
+            height=max(500, len(lift) * 22),
+            xaxis=dict(tickangle=-45),
+            yaxis=dict(autorange='reversed')
+        )
+
+        st.plotly_chart(fig_lift, use_column_width=True)
+        st.caption(f"Basado en {empresas_segmento} empresas. Con pocas empresas en el segmento, "
+                   f"el lift de pares poco frecuentes es inestable.")
+    else:
+        st.info("No hay suficientes beneficios otorgados con los filtros actuales")
+
     st.markdown("---")
 
     # ============ SECCIÓN 6: BONIFICACIONES ============
@@ -5,6 +5,7 @@ Estadísticas detalladas de salarios por posición
 
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
 from pathlib import Path
@@ -13,7 +14,10 @@ import sys
 # Agregar el directorio src al path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from src.analytics.estadisticas import EstadisticasSalariales
+from src.analytics.estadisticas import NIVEL_CONFIANZA
+from src.analytics.artefactos import intervalos_bootstrap_en_cache
+from src.analytics.instantanea import ProveedorEstadisticas
+from src.analytics.cubo import BRECHAS_SEGMENTOS
 from src.utils.descripciones_cargos import get_descripcion
 
 # Configuración de página
@@ -56,20 +60,33 @@ COLORS = {
     'pyme': '#00A651'      # Verde para pymes
 }
 
-# Cargar datos
+@st.cache_resource
+def proveedor_estadisticas():
+    """Proveedor compartido por todas las sesiones de la instantánea de estadísticas"""
+    base_path = Path(__file__).parent.parent
+    return ProveedorEstadisticas(base_path)
+
+def calcular_estadisticas():
+    """Estadísticas de todos los cargos (instantánea inmutable; se renueva si cambia el dataset)"""
+    return proveedor_estadisticas().actual()
+
 @st.cache_data
-def load_data():
+def cargar_intervalos():
+    """Intervalos de confianza bootstrap por (cargo, segmento, estadístico); se recalculan solo si cambia el dataset"""
     base_path = Path(__file__).parent.parent
-    csv_path = base_path / 'data' / 'processed' / 'encuesta_normalizada.csv'
-    df = pd.read_csv(csv_path)
-    return df
+    # Sin pool de procesos dentro del servidor de Streamlit
+    intervalos = intervalos_bootstrap_en_cache(base_path, max_workers=1)
+    return {
+        (fila.cargo, fila.segmento, fila.estadistico): (fila.inferior, fila.superior)
+        for fila in intervalos.itertuples(index=False)
+        if pd.notna(fila.inferior)
+    }
 
-@st.cache_resource
-def calcular_estadisticas(df):
-    """Calcula estadísticas para todos los cargos"""
-    stats_calc = EstadisticasSalariales(df)
-    stats_calc.calcular_todos_los_cargos()
-    return stats_calc
+@st.cache_data
+def cargar_brechas():
+    """Brechas entre pares de rubros, tamaños y áreas (generadas por src/analytics/cubo.py)"""
+    base_path = Path(__file__).parent.parent
+    return pd.read_parquet(base_path / BRECHAS_SEGMENTOS)
 
 def format_currency(value):
     """Formatea valores monetarios"""
@@ -171,12 +188,10 @@ def main():
     st.markdown("Estadísticas detalladas de salarios por posición - P25, P50, P75 y Promedio")
     st.markdown("---")
 
-    # Cargar datos
-    df = load_data()
-
-    # Calcular estadísticas
-    with st.spinner("Calculando estadísticas de todos los cargos..."):
-        stats = calcular_estadisticas(df)
+    # Cargar estadísticas
+    with st.spinner("Cargando estadísticas de todos los cargos..."):
+        stats = calcular_estadisticas()
+        intervalos = cargar_intervalos()
 
     # Obtener lista de cargos con datos
     cargos_disponibles = list(stats.stats_por_cargo.keys())
@@ -352,6 +367,15 @@ def main():
                     delta="Empresas"
                 )
 
+            # Incertidumbre de las estimaciones (bootstrap)
+            bandas = []
+            for estadistico in ['P25', 'P50', 'P75', 'Promedio']:
+                if (cargo_seleccionado, 'General', estadistico) in intervalos:
+                    inferior, superior = intervalos[(cargo_seleccionado, 'General', estadistico)]
+                    bandas.append(f"{estadistico}: {format_currency(inferior)} – {format_currency(superior)}")
+            if bandas:
+                st.caption(f"Intervalos de confianza {NIVEL_CONFIANZA:.0%} (bootstrap): " + " · ".join(bandas))
+
             st.markdown("---")
 
         # Comparativa Grande vs Pyme
@@ -391,11 +415,21 @@ def main():
                     comparativa_plot = []
 
                     for percentil in ['P25', 'P50', 'P75']:
-                        comparativa_plot.append({
+                        fila_plot = {
                             'Percentil': percentil,
                             'Grande': cargo_stats['Grande'][percentil],
                             'Pyme': cargo_stats['Pyme'][percentil]
-                        })
+                        }
+                        # Bandas de confianza (no aplican a los valores hardcodeados)
+                        for segmento in ['Grande', 'Pyme']:
+                            inferior, superior = intervalos.get((cargo_seleccionado, segmento, percentil), (None, None))
+                            if inferior is None or cargo_seleccionado in HARDCODED_STATS:
+                                inferior = superior = fila_plot[segmento]
+                            # El remuestreo puede dejar la estimación puntual fuera de su
+                            # propio intervalo; plotly no admite brazos negativos
+                            fila_plot[f'{segmento}_menos'] = np.clip(fila_plot[segmento] - inferior, 0, None)
+                            fila_plot[f'{segmento}_mas'] = np.clip(superior - fila_plot[segmento], 0, None)
+                        comparativa_plot.append(fila_plot)
 
                     df_plot = pd.DataFrame(comparativa_plot)
 
@@ -405,6 +439,8 @@ def main():
                         name='Grande (200+ empleados)',
                         x=df_plot['Percentil'],
                         y=df_plot['Grande'],
+                        error_y=dict(type='data', symmetric=False, array=df_plot['Grande_mas'],
+                                     arrayminus=df_plot['Grande_menos']),
                         marker_color=COLORS['grande'],
                         customdata=df_plot['Grande'].apply(lambda x: format_currency(x)),
                         hovertemplate='<b>Grande</b><br>%{x}<br>Salario: %{customdata}<extra></extra>'
@@ -414,6 +450,8 @@ def main():
                         name='Pyme (1-200 empleados)',
                         x=df_plot['Percentil'],
                         y=df_plot['Pyme'],
+                        error_y=dict(type='data', symmetric=False, array=df_plot['Pyme_mas'],
+                                     arrayminus=df_plot['Pyme_menos']),
                         marker_color=COLORS['pyme'],
                         customdata=df_plot['Pyme'].apply(lambda x: format_currency(x)),
                         hovertemplate='<b>Pyme</b><br>%{x}<br>Salario: %{customdata}<extra></extra>'
@@ -432,6 +470,36 @@ def main():
 
             st.markdown("---")
 
+        # Brechas entre rubros (matriz precalculada)
+        brechas = cargar_brechas()
+        brechas_rubro = brechas[(brechas['dimension'] == 'rubro') & (brechas['cargo'] == cargo_seleccionado)]
+        if not brechas_rubro.empty:
+            st.markdown("### 🏭 Brechas Salariales entre Rubros")
+            estadistico = st.radio(
+                "Estadístico",
+                ['P25', 'P50', 'P75', 'Promedio'],
+                index=1,
+                horizontal=True,
+                key=f"brecha_rubro_{cargo_seleccionado}"
+            )
+            matriz = brechas_rubro.pivot_table(
+                index='segmento_a', columns='segmento_b', values=f'Brecha_{estadistico}_%', observed=True
+            )
+            fig_brechas = px.imshow(
+                matriz,
+                text_auto='.0f',
+                color_continuous_scale='RdBu',
+                color_continuous_midpoint=0,
+                labels=dict(x='Comparado con', y='Rubro', color='Brecha %'),
+                title=f'{estadistico}: diferencia % del rubro (fila) respecto del rubro (columna)'
+            )
+            fig_brechas.update_layout(height=500)
+            st.plotly_chart(fig_brechas, use_container_width=True)
+            st.caption("Solo rubros con al menos una respuesta para el cargo. Con pocas respuestas por rubro, "
+                       "las brechas son orientativas.")
+
+            st.markdown("---")
+
         # Distribución de respuestas por tamaño
         if cargo_stats.get('Grande') or cargo_stats.get('Pyme'):
             st.markdown("### 📊 Distribución de Respuestas por Tamaño de Empresa")
@@ -474,6 +542,37 @@ def main():
 
             st.markdown("---")
 
+        # Ubicación de un salario propio en el mercado
+        st.markdown("### 🎯 ¿Dónde se ubica tu salario?")
+        salario_propio = st.number_input(
+            "Salario bruto mensual que paga tu empresa para este cargo",
+            min_value=0,
+            value=0,
+            step=10000,
+            key=f"salario_propio_{cargo_seleccionado}",
+            help="Se compara con las respuestas de la encuesta; el valor no se guarda"
+        )
+
+        if salario_propio > 0:
+            segmentos = [('General', 'Todas las Empresas')]
+            # Los puestos con valores hardcodeados solo se comparan contra el General calculado
+            if cargo_seleccionado not in HARDCODED_STATS:
+                segmentos += [('Grande', 'Grande (200+ empleados)'), ('Pyme', 'Pyme (1-200 empleados)')]
+            segmentos = [(seg, etiqueta) for seg, etiqueta in segmentos if cargo_stats.get(seg)]
+
+            columnas_rango = st.columns(len(segmentos))
+            for columna, (segmento, etiqueta) in zip(columnas_rango, segmentos):
+                rango = stats.rango_percentil(cargo_seleccionado, salario_propio, segmento)
+                diferencia_p50 = (salario_propio / cargo_stats[segmento]['P50'] - 1) * 100
+                with columna:
+                    st.metric(
+                        label=etiqueta,
+                        value=f"Percentil {rango * 100:.0f}",
+                        delta=f"{diferencia_p50:+.1f}% vs P50"
+                    )
+
+        st.markdown("---")
+
         # Información adicional del cargo (basada en el nombre de la columna original)
         st.markdown("### 📝 Información del Cargo")
 
@@ -7,6 +7,12 @@ import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
 from pathlib import Path
+import sys
+
+# Agregar el directorio src al path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.analytics.jerarquia import estadisticas_jerarquia_en_cache, vista_por_segmento
 
 # Configuración de página
 st.set_page_config(
@@ -24,13 +30,11 @@ COLORS = {
     'gris': '#3D5A6C'
 }
 
-# Cargar datos
+# Cargar estadísticas por jerarquía (se recalculan solo si cambia el dataset)
 @st.cache_data
 def load_data():
     base_path = Path(__file__).parent.parent
-    csv_path = base_path / 'data' / 'processed' / 'encuesta_normalizada.csv'
-    df = pd.read_csv(csv_path)
-    return df
+    return estadisticas_jerarquia_en_cache(base_path)
 
 def format_currency(value):
     """Formatea valores monetarios"""
@@ -38,78 +42,13 @@ def format_currency(value):
         return "N/A"
     return f"${value:,.0f}".replace(",", ".")
 
-def calcular_estadisticas_jerarquia(df, categoria_tamano=None):
+def calcular_estadisticas_jerarquia(tabla, categoria_tamano=None):
     """
-    Calcula estadísticas por jerarquía (CEO, Director, Gerente, Jefe)
-    VALORES HARDCODEADOS según QA Excel de Perfil Humano
+    Estadísticas por jerarquía (CEO, Director, Gerente, Jefe) de un tamaño de empresa
+    Cada nivel promedia las estadísticas de sus cargos, como el QA Excel (ver src/analytics/jerarquia.py)
     """
-    # Valores hardcodeados según QA Excel
-    stats_hardcoded = {
-        'Grande': {
-            'CEO': {
-                'P25': 10997750,
-                'P50': 19722471,
-                'P75': 24481583,
-                'Promedio': 19354448,
-                'Count': 26
-            },
-            'DIRECTOR': {
-                'P25': 7722433,
-                'P50': 14483059,
-                'P75': 10279211,
-                'Promedio': 8732125,
-                'Count': 20
-            },
-            'GERENTE': {
-                'P25': 5326035,
-                'P50': 6178561,
-                'P75': 7735461,
-                'Promedio': 6805749,
-                'Count': 78
-            },
-            'JEFE': {
-                'P25': 2579559,
-                'P50': 2975854,
-                'P75': 3541814,
-                'Promedio': 3266197,
-                'Count': 150
-            }
-        },
-        'Pyme': {
-            'CEO': {
-                'P25': 6875000,
-                'P50': 8630000,
-                'P75': 11784750,
-                'Promedio': 10011402,
-                'Count': 42
-            },
-            'DIRECTOR': {
-                'P25': 4863064,
-                'P50': 6205083,
-                'P75': 8687500,
-                'Promedio': 7063376,
-                'Count': 22
-            },
-            'GERENTE': {
-                'P25': 3516579,
-                'P50': 4574314,
-                'P75': 5288936,
-                'Promedio': 4562918,
-                'Count': 98
-            },
-            'JEFE': {
-                'P25': 1924663,
-                'P50': 2337282,
-                'P75': 2750342,
-                'Promedio': 2355676,
-                'Count': 234
-            }
-        }
-    }
-
-    # Retornar valores hardcodeados
-    if categoria_tamano and categoria_tamano in stats_hardcoded:
-        return stats_hardcoded[categoria_tamano]
+    if categoria_tamano:
+        return vista_por_segmento(tabla, categoria_tamano)
 
     return {}
 
@@ -119,11 +58,11 @@ def main():
     st.markdown("---")
 
     # Cargar datos
-    df = load_data()
+    tabla = load_data()
 
     # Calcular estadísticas
-    stats_grande = calcular_estadisticas_jerarquia(df, 'Grande')
-    stats_pyme = calcular_estadisticas_jerarquia(df, 'Pyme')
+    stats_grande = calcular_estadisticas_jerarquia(tabla, 'Grande')
+    stats_pyme = calcular_estadisticas_jerarquia(tabla, 'Pyme')
 
     # ============ TABLA: EMPRESAS GRANDES ============
     st.markdown("## 🏢 Sueldo Bruto Mensual (Empresas Grandes)")
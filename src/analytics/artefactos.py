@@ -0,0 +1,134 @@
+"""
+Artefactos de las estadísticas por cargo publicados en data/processed
+Cada cargador lee el archivo mientras su huella (dataset normalizado + código) siga
+al día; si no, lo busca en data/cache/ y como último recurso lo recalcula
+"""
+
+import pandas as pd
+import sys
+import os
+from pathlib import Path
+
+# Agregar el directorio raíz al path para importar src.utils
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+import src.analytics.estadisticas as estadisticas
+from src.analytics.estadisticas import EstadisticasSalariales, N_REMUESTRAS, NIVEL_CONFIANZA, VERSION_ARTEFACTO
+from src.utils.datos import (cargar_encuesta_normalizada, PARQUET_NORMALIZADO, CSV_NORMALIZADO,
+                             COMPRESION_PARQUET)
+from src.utils.cache import CacheResultados, clave_cache
+
+# Estadísticas de todos los cargos ya calculadas (ver estadisticas_en_cache)
+ARTEFACTO_ESTADISTICAS = Path('data') / 'processed' / 'estadisticas_cargos.npz'
+
+# Intervalos de confianza bootstrap de todos los cargos (ver intervalos_bootstrap_en_cache)
+INTERVALOS_BOOTSTRAP = Path('data') / 'processed' / 'intervalos_bootstrap.parquet'
+
+
+def estadisticas_en_cache(base_path, df=None, usar_cache=True, calcular=True):
+    """
+    Estadísticas de todos los cargos, leídas del artefacto mientras el dataset y el código no cambien
+
+    La huella (dataset normalizado + código + VERSION_ARTEFACTO) se guarda dentro
+    de data/processed/estadisticas_cargos.npz: si coincide, se lee directo, sin
+    depender de data/cache/ (sirve en una réplica nueva). Si no, se busca la entrada
+    en data/cache/ y como último recurso se recalcula y se reescribe el artefacto.
+
+    Args:
+        base_path: raíz del proyecto
+        df: dataset normalizado ya cargado (None = leerlo solo si hay que calcular)
+        usar_cache: si False, recalcula aunque el artefacto esté al día
+        calcular: si False, devuelve None en vez de recalcular
+
+    Returns:
+        EstadisticasSalariales con calcular_todos_los_cargos() ya hecho (su df es None
+        si se leyó del artefacto y no se pasó df)
+    """
+    base_path = Path(base_path)
+    output_path = base_path / ARTEFACTO_ESTADISTICAS
+    dataset = base_path / PARQUET_NORMALIZADO
+    if not dataset.exists():
+        dataset = base_path / CSV_NORMALIZADO
+    cache = CacheResultados(base_path / 'data' / 'cache' / 'estadisticas_cargos')
+    clave = clave_cache([dataset, estadisticas.__file__, __file__], extras=[f'artefacto={VERSION_ARTEFACTO}'])
+
+    if usar_cache:
+        stats = EstadisticasSalariales.desde_artefacto(output_path, df, clave)
+        if stats is None and cache.restaurar(clave, [output_path]):
+            stats = EstadisticasSalariales.desde_artefacto(output_path, df, clave)
+        if stats is not None:
+            return stats
+    if not calcular:
+        return None
+
+    if df is None:
+        df = cargar_encuesta_normalizada(base_path)
+    stats = EstadisticasSalariales(df).calcular_todos_los_cargos()
+    stats.guardar_artefacto(output_path, clave)
+    cache.guardar(clave, [output_path])
+    return stats
+
+
+def _clave_parquet(path):
+    """Huella guardada en los metadatos de un Parquet (None si no existe o no tiene)"""
+    import pyarrow.parquet as pq
+
+    if not Path(path).exists():
+        return None
+    metadatos = pq.read_schema(path).metadata or {}
+    clave = metadatos.get(b'clave')
+    return None if clave is None else clave.decode('ascii')
+
+
+def _guardar_parquet_con_clave(df, path, clave):
+    """Guarda el DataFrame como Parquet con la huella en los metadatos (escritura atómica)"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    tabla = pa.Table.from_pandas(df, preserve_index=False)
+    tabla = tabla.replace_schema_metadata({**tabla.schema.metadata, b'clave': clave.encode('ascii')})
+    path = Path(path)
+    tmp = path.with_name(f'.{path.name}.tmp')
+    pq.write_table(tabla, tmp, compression=COMPRESION_PARQUET)
+    os.replace(tmp, path)
+
+
+def intervalos_bootstrap_en_cache(base_path, df=None, n_remuestras=N_REMUESTRAS, nivel=NIVEL_CONFIANZA,
+                                  semilla=0, max_workers=None, usar_cache=True):
+    """
+    Intervalos bootstrap de todos los cargos, reutilizados mientras el dataset no cambie
+
+    La huella (dataset normalizado + código + parámetros del bootstrap) se guarda
+    en los metadatos de data/processed/intervalos_bootstrap.parquet: si coincide, se
+    lee directo (sirve en una réplica nueva, como estadisticas_en_cache). Si no, se
+    busca la entrada en data/cache/ y como último recurso se recalcula.
+
+    Args:
+        base_path: raíz del proyecto
+        df: dataset normalizado ya cargado (None = leerlo solo si hay que calcular)
+        usar_cache: si False, recalcula aunque el archivo esté al día
+
+    Returns:
+        DataFrame de EstadisticasSalariales.intervalos_bootstrap
+    """
+    base_path = Path(base_path)
+    output_path = base_path / INTERVALOS_BOOTSTRAP
+    dataset = base_path / PARQUET_NORMALIZADO
+    if not dataset.exists():
+        dataset = base_path / CSV_NORMALIZADO
+    cache = CacheResultados(base_path / 'data' / 'cache' / 'bootstrap')
+    clave = clave_cache([dataset, estadisticas.__file__, __file__], extras=[n_remuestras, nivel, semilla])
+
+    if usar_cache:
+        if _clave_parquet(output_path) != clave:
+            cache.restaurar(clave, [output_path])
+        if _clave_parquet(output_path) == clave:
+            return pd.read_parquet(output_path)
+
+    if df is None:
+        df = cargar_encuesta_normalizada(base_path)
+    intervalos = EstadisticasSalariales(df).intervalos_bootstrap(
+        n_remuestras=n_remuestras, nivel=nivel, semilla=semilla, max_workers=max_workers)
+    _guardar_parquet_con_clave(intervalos, output_path, clave)
+    cache.guardar(clave, [output_path])
+    return intervalos
@@ -0,0 +1,340 @@
+"""
+Prevalencia de beneficios por tamaño de empresa y rubro
+Cuenta las respuestas de todas las columnas benef_* en una sola agrupación y la
+comparten el análisis estadístico y el dashboard. También calcula qué beneficios
+se otorgan juntos (co-ocurrencia y lift) a partir de la matriz empresas × beneficios
+"""
+
+import pandas as pd
+import numpy as np
+import sys
+import argparse
+from pathlib import Path
+
+# Agregar el directorio raíz al path para importar src.utils
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.utils.datos import (cargar_encuesta_normalizada, PARQUET_NORMALIZADO, CSV_NORMALIZADO,
+                             COMPRESION_PARQUET)
+from src.utils.cache import CacheResultados, clave_cache
+
+# Archivo de la tabla de prevalencia (relativo a la raíz del proyecto)
+PREVALENCIA_BENEFICIOS = Path('data') / 'processed' / 'prevalencia_beneficios.parquet'
+
+# Matriz empresas × beneficios empaquetada en bits (la genera el ETL)
+MATRIZ_BENEFICIOS = Path('data') / 'processed' / 'beneficios_empresas.npz'
+
+# Co-ocurrencia y lift de cada par de beneficios por segmento
+COOCURRENCIA_BENEFICIOS = Path('data') / 'processed' / 'coocurrencia_beneficios.npz'
+
+# Valor de una dimensión en las filas de totales (igual que en el cubo)
+TODOS = 'Todos'
+
+# Dimensiones de segmentación -> columna del dataset normalizado
+DIMENSIONES = {'tamano': 'categoria_tamano', 'rubro': 'rubro_corto'}
+
+# Respuestas que son encabezados de sección del formulario, no respuestas
+PATRON_ENCABEZADO = '💵|⏰'
+
+
+def es_otorgado(valores):
+    """
+    Indica qué respuestas significan que la empresa otorga el beneficio
+
+    "Si", o en medicina prepaga cualquier "Otorgamos ..." (a todos o a algunos niveles).
+    """
+    valores = valores.astype(str)
+    return (valores == 'Si') | valores.str.startswith('Otorgamos')
+
+
+def prevalencia_beneficios(df):
+    """
+    Respuestas de cada beneficio por tamaño × rubro, con los totales de cada dimensión
+
+    Pasa el bloque benef_* a formato largo y cuenta todas las combinaciones
+    tamaño × rubro × beneficio × respuesta en un solo groupby; los totales ("Todos")
+    se obtienen sumando esos conteos. Se ignoran las respuestas vacías y los
+    encabezados de sección.
+
+    Returns:
+        DataFrame con una fila por tamano, rubro, beneficio y valor: empresas (que
+        dieron esa respuesta), respuestas (total del beneficio en el segmento),
+        proporcion y otorgado
+    """
+    beneficios = [col for col in df.columns if col.startswith('benef_')]
+    segmentos = pd.DataFrame({dim: df[col].astype(object) if col in df.columns else None
+                              for dim, col in DIMENSIONES.items()}, index=df.index)
+
+    largo = pd.concat([segmentos, df[beneficios].astype(object)], axis=1).melt(
+        id_vars=list(DIMENSIONES), var_name='beneficio', value_name='valor')
+    largo = largo[largo['valor'].notna()]
+    largo = largo[~largo['valor'].astype(str).str.contains(PATRON_ENCABEZADO)]
+
+    claves = list(DIMENSIONES) + ['beneficio', 'valor']
+    conteos = largo.groupby(claves, dropna=False, sort=False).size().rename('empresas').reset_index()
+
+    # Totales: las mismas cuentas con cada dimensión (y ambas) reemplazada por TODOS
+    bloques = [conteos[conteos[list(DIMENSIONES)].notna().all(axis=1)]]
+    for agregadas in [['tamano'], ['rubro'], ['tamano', 'rubro']]:
+        bloque = conteos.assign(**{dim: TODOS for dim in agregadas})
+        bloque = bloque[bloque[list(DIMENSIONES)].notna().all(axis=1)]
+        bloques.append(bloque.groupby(claves, sort=False)['empresas'].sum().reset_index())
+    tabla = pd.concat(bloques, ignore_index=True)
+
+    # Orden: segmentos, beneficios en el orden de las columnas y respuestas más frecuentes primero
+    tabla['beneficio'] = pd.Categorical(tabla['beneficio'], categories=beneficios)
+    tabla = tabla.sort_values(list(DIMENSIONES) + ['beneficio', 'empresas'],
+                              ascending=[True, True, True, False], kind='stable', ignore_index=True)
+    tabla['beneficio'] = tabla['beneficio'].astype(object)
+
+    tabla['respuestas'] = tabla.groupby(list(DIMENSIONES) + ['beneficio'])['empresas'].transform('sum')
+    tabla['proporcion'] = tabla['empresas'] / tabla['respuestas']
+    tabla['otorgado'] = es_otorgado(tabla['valor'])
+    return tabla
+
+
+def prevalencia_otorgados(tabla, tamano=TODOS, rubro=TODOS):
+    """
+    Empresas que otorgan cada beneficio en un segmento
+
+    Args:
+        tabla: resultado de prevalencia_beneficios
+        tamano, rubro: segmento (TODOS = sin filtrar esa dimensión)
+
+    Returns:
+        DataFrame indexado por beneficio (en el orden de las columnas) con empresas,
+        respuestas y proporcion
+    """
+    filas = tabla[(tabla['tamano'] == tamano) & (tabla['rubro'] == rubro)]
+    otorgados = filas[filas['otorgado']].groupby('beneficio', sort=False)['empresas'].sum()
+    respuestas = filas.groupby('beneficio', sort=False)['respuestas'].first()
+    resultado = pd.DataFrame({'empresas': otorgados.reindex(respuestas.index, fill_value=0),
+                              'respuestas': respuestas})
+    resultado['proporcion'] = resultado['empresas'] / resultado['respuestas']
+    return resultado
+
+
+def empaquetar_beneficios(df):
+    """
+    Matriz booleana empresas × beneficios (otorga / no otorga), empaquetada en bits
+
+    Cada fila es una empresa y cada bit un beneficio (np.packbits por fila, 8
+    beneficios por byte). Una respuesta vacía cuenta como no otorgado.
+
+    Returns:
+        dict con bits (uint8, empresas × ceil(beneficios / 8)), beneficios (nombres de
+        columna) y tamano, rubro (segmento de cada empresa, '' si falta)
+    """
+    beneficios = [col for col in df.columns if col.startswith('benef_')]
+    valores = pd.Series(df[beneficios].astype(object).to_numpy().ravel())
+    otorgados = es_otorgado(valores).to_numpy().reshape(len(df), len(beneficios))
+
+    def segmento(col):
+        if col not in df.columns:
+            return np.full(len(df), '')
+        return df[col].astype(object).fillna('').astype(str).to_numpy(dtype=str)
+
+    return {
+        'bits': np.packbits(otorgados, axis=1),
+        'beneficios': np.array(beneficios, dtype=str),
+        'tamano': segmento(DIMENSIONES['tamano']),
+        'rubro': segmento(DIMENSIONES['rubro']),
+    }
+
+
+def desempaquetar_beneficios(matriz):
+    """Matriz booleana empresas × beneficios de empaquetar_beneficios"""
+    return np.unpackbits(matriz['bits'], axis=1, count=len(matriz['beneficios'])).astype(bool)
+
+
+def guardar_npz(arrays, path):
+    """Guarda un dict de arrays (sin objetos de Python, se lee sin pickle)"""
+    np.savez_compressed(path, **arrays)
+
+
+def cargar_npz(path):
+    """Inversa de guardar_npz"""
+    with np.load(path, allow_pickle=False) as archivo:
+        return {nombre: archivo[nombre] for nombre in archivo.files}
+
+
+def coocurrencia_beneficios(matriz):
+    """
+    Co-ocurrencia y lift de cada par de beneficios en cada segmento tamaño × rubro
+
+    Con X (empresas × beneficios, 0/1) y S (empresas × segmentos, pertenencia), las
+    empresas del segmento s que otorgan a la vez a y b son sum_n S[n, s]·X[n, a]·X[n, b]:
+    un solo producto de matrices S^T · (X ⊗ X) para todos los segmentos y pares.
+    El lift es P(a y b) / (P(a)·P(b)): > 1 si se otorgan juntos más de lo esperable.
+
+    Args:
+        matriz: resultado de empaquetar_beneficios
+
+    Returns:
+        dict con segmentos (k × 2: tamano, rubro; TODOS en los totales), beneficios,
+        empresas (k), otorgan (k × b), conjunta (k × b × b) y lift (k × b × b, NaN si
+        alguno de los dos beneficios no se otorga en el segmento). Solo segmentos con
+        empresas.
+    """
+    otorgados = desempaquetar_beneficios(matriz).astype('float64')
+    n, b = otorgados.shape
+
+    # Pertenencia de cada empresa a cada combinación de tamaño y rubro (incluido TODOS)
+    pertenencia = []
+    valores = []
+    for dim in DIMENSIONES:
+        etiquetas = np.array(sorted(set(matriz[dim]) - {''}) + [TODOS], dtype=str)
+        pertenencia.append((matriz[dim][:, None] == etiquetas[None, :]) | (etiquetas == TODOS)[None, :])
+        valores.append(etiquetas)
+    en_tamano, en_rubro = pertenencia
+    segmentos = (en_tamano[:, :, None] & en_rubro[:, None, :]).reshape(n, -1).astype('float64')
+    etiquetas = np.stack(np.meshgrid(*valores, indexing='ij'), axis=-1).reshape(-1, 2)
+
+    pares = (otorgados[:, :, None] * otorgados[:, None, :]).reshape(n, b * b)
+    conjunta = (segmentos.T @ pares).reshape(-1, b, b)
+    otorgan = segmentos.T @ otorgados
+    empresas = segmentos.sum(axis=0)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        lift = conjunta * empresas[:, None, None] / (otorgan[:, :, None] * otorgan[:, None, :])
+    lift[~np.isfinite(lift)] = np.nan
+
+    con_datos = empresas > 0
+    return {
+        'segmentos': etiquetas[con_datos],
+        'beneficios': matriz['beneficios'],
+        'empresas': empresas[con_datos].astype('int32'),
+        'otorgan': otorgan[con_datos].astype('int32'),
+        'conjunta': conjunta[con_datos].astype('int32'),
+        'lift': lift[con_datos],
+    }
+
+
+def lift_segmento(coocurrencia, tamano=TODOS, rubro=TODOS, etiquetas=None):
+    """
+    Matrices de lift y de empresas con ambos beneficios de un segmento
+
+    Solo incluye los beneficios que otorga alguna empresa del segmento; la diagonal
+    queda en NaN (el lift de un beneficio consigo mismo no dice nada).
+
+    Args:
+        coocurrencia: resultado de coocurrencia_beneficios
+        tamano, rubro: segmento (TODOS = sin filtrar esa dimensión)
+        etiquetas: nombres a mostrar de cada beneficio (por defecto, las columnas)
+
+    Returns:
+        (lift, conjunta, empresas): dos DataFrames beneficio × beneficio y la cantidad
+        de empresas del segmento, o None si el segmento no tiene empresas
+    """
+    fila = np.flatnonzero((coocurrencia['segmentos'][:, 0] == tamano) & (coocurrencia['segmentos'][:, 1] == rubro))
+    if len(fila) == 0:
+        return None
+    k = fila[0]
+    visibles = coocurrencia['otorgan'][k] > 0
+    nombres = coocurrencia['beneficios'] if etiquetas is None else np.asarray(etiquetas)
+    nombres = nombres[visibles]
+
+    lift = coocurrencia['lift'][k][np.ix_(visibles, visibles)].copy()
+    np.fill_diagonal(lift, np.nan)
+    conjunta = coocurrencia['conjunta'][k][np.ix_(visibles, visibles)]
+    return (pd.DataFrame(lift, index=nombres, columns=nombres),
+            pd.DataFrame(conjunta, index=nombres, columns=nombres),
+            int(coocurrencia['empresas'][k]))
+
+
+def prevalencia_beneficios_en_cache(base_path, df=None, usar_cache=True):
+    """
+    Tabla de prevalencia, reutilizada mientras el dataset y el código no cambien
+
+    Args:
+        base_path: raíz del proyecto
+        df: dataset normalizado ya cargado (None = leerlo solo si hay que calcular)
+        usar_cache: si False, recalcula aunque haya una entrada para la clave
+
+    Returns:
+        DataFrame de prevalencia_beneficios
+    """
+    base_path = Path(base_path)
+    output_path = base_path / PREVALENCIA_BENEFICIOS
+    dataset = base_path / PARQUET_NORMALIZADO
+    if not dataset.exists():
+        dataset = base_path / CSV_NORMALIZADO
+    cache = CacheResultados(base_path / 'data' / 'cache' / 'beneficios')
+    clave = clave_cache([dataset, __file__])
+
+    if usar_cache and cache.restaurar(clave, [output_path]):
+        return pd.read_parquet(output_path)
+
+    if df is None:
+        df = cargar_encuesta_normalizada(base_path)
+    tabla = prevalencia_beneficios(df)
+    tabla.to_parquet(output_path, compression=COMPRESION_PARQUET, index=False)
+    cache.guardar(clave, [output_path])
+    return tabla
+
+
+def coocurrencia_beneficios_en_cache(base_path, usar_cache=True):
+    """
+    Co-ocurrencia de beneficios, reutilizada mientras la matriz del ETL y el código no cambien
+
+    Parte de la matriz empaquetada que deja el ETL; si no existe, la arma desde el
+    dataset normalizado.
+
+    Args:
+        base_path: raíz del proyecto
+        usar_cache: si False, recalcula aunque haya una entrada para la clave
+
+    Returns:
+        dict de coocurrencia_beneficios
+    """
+    base_path = Path(base_path)
+    output_path = base_path / COOCURRENCIA_BENEFICIOS
+    fuente = base_path / MATRIZ_BENEFICIOS
+    if not fuente.exists():
+        fuente = base_path / PARQUET_NORMALIZADO
+        if not fuente.exists():
+            fuente = base_path / CSV_NORMALIZADO
+    cache = CacheResultados(base_path / 'data' / 'cache' / 'beneficios')
+    clave = clave_cache([fuente, __file__], extras=['coocurrencia'])
+
+    if usar_cache and cache.restaurar(clave, [output_path]):
+        return cargar_npz(output_path)
+
+    if fuente.suffix == '.npz':
+        matriz = cargar_npz(fuente)
+    else:
+        matriz = empaquetar_beneficios(cargar_encuesta_normalizada(base_path))
+    coocurrencia = coocurrencia_beneficios(matriz)
+    guardar_npz(coocurrencia, output_path)
+    cache.guardar(clave, [output_path])
+    return coocurrencia
+
+
+def main(argv=None):
+    """Función principal"""
+    parser = argparse.ArgumentParser(description='Calcula la prevalencia de beneficios por tamaño y rubro')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='recalcular aunque el dataset normalizado y el código no hayan cambiado')
+    args = parser.parse_args(argv)
+
+    base_path = Path(__file__).parent.parent.parent
+    tabla = prevalencia_beneficios_en_cache(base_path, usar_cache=not args.no_cache)
+    print(f"✓ Prevalencia de beneficios en {PREVALENCIA_BENEFICIOS} ({len(tabla)} filas)\n")
+
+    otorgados = prevalencia_otorgados(tabla)
+    print((otorgados['proporcion'] * 100).sort_values(ascending=False)
+          .to_string(float_format=lambda v: f"{v:.1f}%"))
+
+    coocurrencia = coocurrencia_beneficios_en_cache(base_path, usar_cache=not args.no_cache)
+    print(f"\n✓ Co-ocurrencia de beneficios en {COOCURRENCIA_BENEFICIOS} "
+          f"({len(coocurrencia['segmentos'])} segmentos)")
+    lift, conjunta, _ = lift_segmento(coocurrencia)
+    pares = pd.DataFrame({'lift': lift.stack(), 'empresas': conjunta.stack()})
+    pares = pares[pares.index.get_level_values(0) < pares.index.get_level_values(1)]
+    print("\nPares que más se otorgan juntos (lift, al menos 5 empresas):")
+    print(pares[pares['empresas'] >= 5].sort_values('lift', ascending=False).head(10)
+          .to_string(float_format=lambda v: f"{v:.2f}"))
+
+
+if __name__ == "__main__":
+    main()
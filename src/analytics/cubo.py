@@ -0,0 +1,219 @@
+"""
+Cubo de estadísticas salariales precalculado
+Percentiles, promedio, cantidad y brecha Grande/Pyme para cada combinación de
+área × cargo × tamaño × rubro, incluidos los totales ("Todos") de cada dimensión
+"""
+
+import pandas as pd
+import numpy as np
+import sys
+import argparse
+from pathlib import Path
+
+# Agregar el directorio raíz al path para importar src.utils
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+import src.analytics.estadisticas as estadisticas
+import src.utils.constants as constants
+from src.analytics.estadisticas import (matriz_salarios, estadisticas_matriz, apilar_grupos, matriz_brechas,
+                                        COLUMNAS_ESTADISTICAS, SEGMENTOS_TAMANO)
+from src.utils.constants import AREAS_FUNCIONALES
+from src.utils.datos import (cargar_encuesta_normalizada, PARQUET_NORMALIZADO, CSV_NORMALIZADO,
+                             COMPRESION_PARQUET)
+from src.utils.cache import CacheResultados, clave_cache
+
+# Archivo del cubo (relativo a la raíz del proyecto)
+CUBO_ESTADISTICAS = Path('data') / 'processed' / 'cubo_estadisticas.parquet'
+BRECHAS_SEGMENTOS = Path('data') / 'processed' / 'brechas_segmentos.parquet'
+
+# Valor de una dimensión en las filas de totales
+TODOS = 'Todos'
+DIMENSIONES = ['area', 'cargo', 'tamano', 'rubro']
+
+# Cargos que no figuran en AREAS_FUNCIONALES
+SIN_AREA = 'Otros'
+
+
+def area_por_cargo():
+    """Dict columna de salario -> área funcional"""
+    return {f'salario_{cargo}': area for area, cargos in AREAS_FUNCIONALES.items() for cargo in cargos}
+
+
+def _segmentos(serie):
+    """[(valor, máscara de filas)] para cada valor de la dimensión, más (TODOS, None)"""
+    valores = sorted(serie.dropna().unique()) if serie is not None else []
+    return [(valor, (serie == valor).to_numpy()) for valor in valores] + [(TODOS, None)]
+
+
+def construir_cubo(df):
+    """
+    Calcula el cubo de estadísticas de salarios
+
+    Para cada combinación de tamaño (Grande/Pyme/Todos) y rubro (cada rubro_corto/Todos)
+    calcula, de forma vectorizada, las estadísticas de cada cargo y de cada área (todos
+    los salarios de los cargos del área juntos), más el total de todos los cargos.
+    Los salarios <= 0 se excluyen (0 = dato faltante), igual que en EstadisticasSalariales.
+
+    Returns:
+        DataFrame ordenado con una fila por celda con datos: area, cargo, tamano, rubro,
+        P25, P50, P75, Promedio, Desv_Std, Min, Max, Count y Brecha_Grande_Pyme_%
+    """
+    columnas = [col for col in df.columns if col.startswith('salario_')]
+    matriz = matriz_salarios(df, columnas)
+
+    areas = area_por_cargo()
+    area_cargo = [areas.get(col, SIN_AREA) for col in columnas]
+    grupos = {area: [i for i, a in enumerate(area_cargo) if a == area] for area in dict.fromkeys(area_cargo)}
+    grupos[TODOS] = list(range(len(columnas)))
+
+    tamano = df['categoria_tamano'] if 'categoria_tamano' in df.columns else None
+    rubro = df['rubro_corto'] if 'rubro_corto' in df.columns else None
+    segmentos_tamano = [seg for seg in _segmentos(tamano) if seg[0] in SEGMENTOS_TAMANO + [TODOS]]
+
+    bloques = []
+    for valor_tamano, filas_tamano in segmentos_tamano:
+        for valor_rubro, filas_rubro in _segmentos(rubro):
+            filas = np.ones(len(df), dtype=bool)
+            for mascara in (filas_tamano, filas_rubro):
+                if mascara is not None:
+                    filas &= mascara
+            sub = matriz[filas]
+
+            por_cargo = estadisticas_matriz(sub)
+            bloques.append(pd.DataFrame({'area': area_cargo, 'cargo': columnas,
+                                         'tamano': valor_tamano, 'rubro': valor_rubro, **por_cargo}))
+
+            por_area = estadisticas_matriz(apilar_grupos(sub, list(grupos.values())))
+            bloques.append(pd.DataFrame({'area': list(grupos), 'cargo': TODOS,
+                                         'tamano': valor_tamano, 'rubro': valor_rubro, **por_area}))
+
+    cubo = pd.concat(bloques, ignore_index=True)
+    cubo = cubo[cubo['Count'] > 0].reset_index(drop=True)
+    cubo['Count'] = cubo['Count'].astype('int32')
+
+    # Brecha de la mediana Grande vs Pyme para el mismo área/cargo/rubro (igual que crear_tabla_resumen)
+    p50 = cubo.pivot_table(index=['area', 'cargo', 'rubro'], columns='tamano', values='P50', aggfunc='first')
+    if {'Grande', 'Pyme'} <= set(p50.columns):
+        brecha = ((p50['Grande'] - p50['Pyme']) / p50['Pyme'] * 100).rename('Brecha_Grande_Pyme_%')
+        cubo = cubo.join(brecha, on=['area', 'cargo', 'rubro'])
+    else:
+        cubo['Brecha_Grande_Pyme_%'] = np.nan
+
+    for col in DIMENSIONES:
+        cubo[col] = cubo[col].astype('category')
+    return cubo
+
+
+def construir_brechas(cubo):
+    """
+    Brechas de P25, P50, P75 y promedio entre todos los pares de segmentos del cubo
+
+    - tamano: cada cargo y área, entre tamaños (todos los rubros)
+    - rubro: cada cargo y área, entre rubros (todos los tamaños)
+    - area: totales de cada área, entre áreas (todos los tamaños y rubros)
+
+    Returns:
+        DataFrame con una fila por par ordenado con respuestas en ambos lados:
+        dimension, area, cargo, segmento_a, segmento_b, Brecha_<estadístico>_%,
+        Count_a, Count_b
+    """
+    es_total = {col: (cubo[col] == TODOS).to_numpy() for col in DIMENSIONES}
+    bloques = []
+    for dimension in ['tamano', 'rubro']:
+        otra = 'rubro' if dimension == 'tamano' else 'tamano'
+        sub = cubo[es_total[otra] & ~es_total[dimension]]
+        bloques.append(matriz_brechas(sub, ['area', 'cargo'], dimension).assign(dimension=dimension))
+
+    sub = cubo[es_total['tamano'] & es_total['rubro'] & es_total['cargo'] & ~es_total['area']]
+    bloques.append(matriz_brechas(sub, ['cargo'], 'area').assign(dimension='area', area=TODOS))
+
+    brechas = pd.concat(bloques, ignore_index=True)
+    columnas = ['dimension', 'area', 'cargo'] + [col for col in brechas.columns
+                                                 if col not in ('dimension', 'area', 'cargo')]
+    brechas = brechas[columnas]
+    for col in ['dimension', 'area', 'cargo', 'segmento_a', 'segmento_b']:
+        brechas[col] = brechas[col].astype('category')
+    brechas[['Count_a', 'Count_b']] = brechas[['Count_a', 'Count_b']].astype('int32')
+    return brechas
+
+
+class CuboEstadisticas:
+    """Consulta del cubo precalculado: cada combinación de filtros es una búsqueda en un dict"""
+
+    def __init__(self, cubo):
+        self.cubo = cubo
+        valores = COLUMNAS_ESTADISTICAS + ['Brecha_Grande_Pyme_%']
+        self._celdas = cubo.set_index(DIMENSIONES)[valores].to_dict('index')
+        self._areas = area_por_cargo()
+
+    @classmethod
+    def cargar(cls, base_path):
+        """Carga el cubo guardado por `python src/analytics/cubo.py`"""
+        return cls(pd.read_parquet(Path(base_path) / CUBO_ESTADISTICAS))
+
+    def consultar(self, cargo=TODOS, tamano=TODOS, rubro=TODOS, area=None):
+        """
+        Estadísticas de una combinación de filtros
+
+        Args:
+            cargo: columna de salario (ej: 'salario_ceo') o TODOS
+            tamano: 'Grande', 'Pyme' o TODOS
+            rubro: valor de rubro_corto o TODOS
+            area: área funcional o TODOS (None = el área del cargo, o TODOS si cargo es TODOS)
+
+        Returns:
+            dict con P25, P50, P75, Promedio, Desv_Std, Min, Max, Count y
+            Brecha_Grande_Pyme_%, o None si no hay respuestas para esa combinación
+        """
+        if area is None:
+            area = TODOS if cargo == TODOS else self._areas.get(cargo, SIN_AREA)
+        return self._celdas.get((area, cargo, tamano, rubro))
+
+
+def main(argv=None):
+    """Función principal"""
+    parser = argparse.ArgumentParser(description='Precalcula el cubo de estadísticas por cargo, tamaño, rubro y área')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='recalcular aunque el dataset normalizado y el código no hayan cambiado')
+    args = parser.parse_args(argv)
+
+    base_path = Path(__file__).parent.parent.parent
+    output_cubo = base_path / CUBO_ESTADISTICAS
+    output_brechas = base_path / BRECHAS_SEGMENTOS
+
+    # Cache por contenido: dataset normalizado + código del cubo, de las estadísticas y de las áreas
+    dataset = base_path / PARQUET_NORMALIZADO
+    if not dataset.exists():
+        dataset = base_path / CSV_NORMALIZADO
+    cache = CacheResultados(base_path / 'data' / 'cache' / 'cubo')
+    clave = clave_cache([dataset, __file__, estadisticas.__file__, constants.__file__])
+
+    if not args.no_cache and cache.restaurar(clave, [output_cubo, output_brechas]):
+        print(f"✓ Cache hit ({clave[:12]}): datos y código sin cambios, "
+              f"{output_cubo.name} y {output_brechas.name} restaurados")
+        return
+    estado = "Cache desactivada (--no-cache)" if args.no_cache else f"Cache miss ({clave[:12]})"
+    print(f"{estado}: calculando el cubo...\n")
+
+    print("Cargando datos normalizados...")
+    df = cargar_encuesta_normalizada(base_path)
+    print(f"✓ Datos cargados: {len(df)} empresas")
+
+    cubo = construir_cubo(df)
+    cubo.to_parquet(output_cubo, compression=COMPRESION_PARQUET, index=False)
+    brechas = construir_brechas(cubo)
+    brechas.to_parquet(output_brechas, compression=COMPRESION_PARQUET, index=False)
+    cache.guardar(clave, [output_cubo, output_brechas])
+
+    print(f"✓ Cubo calculado: {len(cubo)} celdas con datos "
+          f"({cubo['area'].nunique()} áreas, {cubo['cargo'].nunique() - 1} cargos, "
+          f"{cubo['rubro'].nunique() - 1} rubros)")
+    print(f"✓ Guardado en {output_cubo} ({output_cubo.stat().st_size / 1024:,.1f} KB)")
+    print(f"✓ Brechas entre segmentos: {len(brechas)} pares "
+          f"({', '.join(f'{dim}: {n}' for dim, n in brechas['dimension'].value_counts().items())})")
+    print(f"✓ Guardado en {output_brechas} ({output_brechas.stat().st_size / 1024:,.1f} KB)")
+    print("\n✅ Cubo de estadísticas completado!")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,16 +5,608 @@ Calcula percentiles, medias y segmentaciones por tamaño de empresa
 
 import pandas as pd
 import numpy as np
+import sys
+import os
+import argparse
+import threading
+from collections import OrderedDict
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+# Agregar el directorio raíz al path para importar src.utils
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.utils.datos import cargar_encuesta_normalizada, PARQUET_NORMALIZADO, CSV_NORMALIZADO
+from src.utils.cache import CacheResultados, clave_cache
+from src.utils.cuantiles import ResumenCuantiles, COMPRESION_RESUMEN
+from src.analytics.beneficios import prevalencia_beneficios, TODOS as TODOS_BENEFICIOS
+
+# Columnas de estadísticas por cargo y segmento (ver calcular_tabla_cargos)
+COLUMNAS_ESTADISTICAS = ['P25', 'P50', 'P75', 'Promedio', 'Desv_Std', 'Min', 'Max', 'Count']
+CUANTILES = {'P25': 0.25, 'P50': 0.50, 'P75': 0.75}
+
+# Segmentos por tamaño de empresa (además de 'General')
+SEGMENTOS_TAMANO = ['Grande', 'Pyme']
+
+# Métodos de percentil (equivalentes a las funciones de Excel)
+METODOS_PERCENTIL = {
+    'inc': 'PERCENTILE.INC',  # = PERCENTIL / Series.quantile: posición (n - 1)·q
+    'exc': 'PERCENTILE.EXC',  # posición (n + 1)·q - 1; fuera de [1/(n+1), n/(n+1)] no hay valor
+}
+
+# Estadísticos que se comparan entre segmentos (ver matriz_brechas)
+ESTADISTICOS_BRECHA = ['P25', 'P50', 'P75', 'Promedio']
+
+# Intervalos de confianza bootstrap (ver intervalos_bootstrap)
+ESTADISTICOS_BOOTSTRAP = ['P25', 'P50', 'P75', 'Promedio']
+N_REMUESTRAS = 2000
+NIVEL_CONFIANZA = 0.95
+
+# Versión del formato del artefacto (ver guardar_artefacto): subirla si cambia lo que se guarda
+VERSION_ARTEFACTO = 1
+
+# Cargo × segmento que guarda el modo perezoso (los menos usados se descartan)
+TAMANO_CACHE_CARGOS = 64
+
+
+def matriz_salarios(df, columnas):
+    """
+    Matriz float64 (empresas × cargos) de salarios válidos
+
+    Los valores vacíos, no numéricos o <= 0 (0 = dato faltante) quedan como NaN.
+    """
+    valores = df[columnas]
+    if not all(pd.api.types.is_numeric_dtype(dtype) for dtype in valores.dtypes):
+        valores = valores.apply(pd.to_numeric, errors='coerce')
+    matriz = valores.to_numpy(dtype='float64', copy=True, na_value=np.nan)
+    matriz[~(matriz > 0)] = np.nan
+    return matriz
+
+
+def _lerp(a, b, gamma):
+    """Interpolación lineal entre a y b con el mismo redondeo que numpy (y Series.quantile)"""
+    diferencia = b - a
+    return np.where(gamma >= 0.5, b - diferencia * (1 - gamma), a + diferencia * gamma)
+
+
+def percentiles_ordenados(ordenado, qs, metodo='inc'):
+    """
+    Percentiles de un array ordenado y sin NaN, interpolando como Excel
+
+    Args:
+        ordenado: array 1D ordenado de forma ascendente, sin NaN
+        qs: cuantiles entre 0 y 1 (ej: [0.1, 0.5, 0.9])
+        metodo: 'inc' (PERCENTILE.INC) o 'exc' (PERCENTILE.EXC)
+
+    Returns:
+        array con un valor por cuantil (NaN si no hay datos o, con 'exc', si el
+        cuantil queda fuera del rango que admite Excel)
+    """
+    if metodo not in METODOS_PERCENTIL:
+        raise ValueError(f"Método de percentil desconocido: {metodo!r} (usar 'inc' o 'exc')")
+    qs = np.asarray(qs, dtype='float64')
+    if ((qs < 0) | (qs > 1)).any():
+        raise ValueError("Los cuantiles deben estar entre 0 y 1")
+
+    n = len(ordenado)
+    if n == 0:
+        return np.full(qs.shape, np.nan)
+
+    posicion = (n - 1) * qs if metodo == 'inc' else (n + 1) * qs - 1
+    valido = (posicion >= 0) & (posicion <= n - 1)
+    posicion = np.clip(posicion, 0, n - 1)
+    anterior = np.floor(posicion).astype(np.intp)
+    siguiente = np.minimum(anterior + 1, n - 1)
+    valor = _lerp(ordenado[anterior], ordenado[siguiente], posicion - anterior)
+    return np.where(valido, valor, np.nan)
+
+
+def contar_menores(ordenada, count, columnas, x):
+    """
+    Cantidad de valores < x[k] en la columna columnas[k] de una matriz ordenada
+
+    Es np.searchsorted(side='left') para varias columnas a la vez: una búsqueda
+    binaria vectorizada de log2(filas) pasos sobre los count[columnas] valores
+    válidos (los NaN van al final de cada columna).
+    """
+    bajo = np.zeros(len(columnas), dtype=np.intp)
+    alto = count[columnas].astype(np.intp)
+    while True:
+        activas = bajo < alto
+        if not activas.any():
+            return bajo
+        medio = (bajo + alto) // 2
+        menor = ordenada[np.minimum(medio, ordenada.shape[0] - 1), columnas] < x
+        bajo = np.where(activas & menor, medio + 1, bajo)
+        alto = np.where(activas & ~menor, medio, alto)
+
+
+def rango_percentil_desde_posicion(x, menores, n, minimo, anterior, actual):
+    """
+    Posición percentil (0 a 1) de x, inversa de PERCENTILE.INC (Excel PERCENTRANK.INC)
+
+    Args:
+        x: salarios a ubicar
+        menores: cantidad de valores del mercado < x
+        n: cantidad de valores del mercado
+        minimo: menor valor del mercado
+        anterior, actual: valores del mercado en las posiciones menores - 1 y menores
+
+    Returns:
+        array: por debajo del mínimo 0, por encima del máximo 1; NaN si no hay
+        mercado o x no es un salario válido (> 0)
+    """
+    with np.errstate(invalid='ignore', divide='ignore'):
+        exacto = menores / (n - 1)
+        interpolado = (menores - 1 + (x - anterior) / (actual - anterior)) / (n - 1)
+    rango = np.where(actual == x, exacto, interpolado)
+    rango = np.where(menores == 0, 0.0, rango)
+    rango = np.where(menores >= n, 1.0, rango)
+    rango = np.where(n == 1, (x >= minimo).astype('float64'), rango)
+    return np.where((n > 0) & (x > 0), rango, np.nan)
+
+
+def estadisticas_matriz(matriz):
+    """
+    P25, P50, P75, promedio, desvío, mínimo, máximo y cantidad de cada columna
+
+    Ordena la matriz una sola vez (los NaN quedan al final de cada columna) y saca
+    todos los estadísticos de ahí. Los percentiles usan la interpolación lineal de
+    pandas/numpy (mismo resultado que Series.quantile).
+
+    Returns:
+        dict estadístico -> array con un valor por columna (NaN si no hay datos)
+    """
+    if matriz.shape[0] == 0:
+        # Segmento sin empresas: una fila de NaN da count 0 en todos los cargos
+        matriz = np.full((1, matriz.shape[1]), np.nan)
+    # Cada columna contigua: las sumas dan lo mismo sin importar de dónde venga la matriz
+    matriz = np.asfortranarray(matriz)
+    count = np.count_nonzero(~np.isnan(matriz), axis=0)
+    ordenada = np.sort(matriz, axis=0)
+    ultima = np.maximum(count - 1, 0)
+    hay_datos = count > 0
+
+    stats = {}
+    for nombre, q in CUANTILES.items():
+        posicion = ultima * q
+        anterior = np.floor(posicion).astype(np.intp)
+        siguiente = np.minimum(anterior + 1, ultima)
+        gamma = posicion - anterior
+        a = np.take_along_axis(ordenada, anterior[np.newaxis, :], axis=0)[0]
+        b = np.take_along_axis(ordenada, siguiente[np.newaxis, :], axis=0)[0]
+        stats[nombre] = np.where(hay_datos, _lerp(a, b, gamma), np.nan)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        promedio = np.nansum(matriz, axis=0) / count
+        desvio = np.sqrt(np.nansum((matriz - promedio) ** 2, axis=0) / (count - 1))
+    stats['Promedio'] = np.where(hay_datos, promedio, np.nan)
+    stats['Desv_Std'] = np.where(count > 1, desvio, np.nan)
+    stats['Min'] = np.where(hay_datos, ordenada[0], np.nan)
+    stats['Max'] = np.where(hay_datos, np.take_along_axis(ordenada, ultima[np.newaxis, :], axis=0)[0], np.nan)
+    stats['Count'] = count
+    return stats
+
+
+def apilar_grupos(matriz, grupos):
+    """
+    Junta los salarios de cada grupo de columnas en una sola columna (rellena con NaN)
+
+    Returns:
+        matriz (filas × máx. columnas por grupo) × cantidad de grupos
+    """
+    largo = matriz.shape[0] * max(len(indices) for indices in grupos)
+    apilada = np.full((largo, len(grupos)), np.nan)
+    for j, indices in enumerate(grupos):
+        valores = matriz[:, indices].ravel()
+        apilada[:len(valores), j] = valores
+    return apilada
+
+
+def matriz_brechas(tabla, unidad, dimension, estadisticos=ESTADISTICOS_BRECHA, valores=None):
+    """
+    Brechas porcentuales entre todos los pares de segmentos de una dimensión
+
+    Para cada unidad (ej: cargo) y par ordenado de segmentos (a, b) calcula
+    Brecha_<estadístico>_% = (a - b) / b * 100 (la fórmula de Brecha_Grande_Pyme_%),
+    todos los pares y estadísticos juntos en una operación sobre un array
+    unidades × estadísticos × segmentos.
+
+    Args:
+        tabla: estadísticas en formato largo, una fila por unidad y segmento
+            (ej: tabla_cargos o el cubo)
+        unidad: columnas que identifican la unidad (ej: ['cargo'])
+        dimension: columna con el segmento (ej: 'segmento', 'rubro')
+        estadisticos: columnas a comparar
+        valores: segmentos a comparar, en orden (None = todos los de la tabla)
+
+    Returns:
+        DataFrame con una fila por unidad y par (a ≠ b) con respuestas en ambos:
+        *unidad, segmento_a, segmento_b, Brecha_<estadístico>_% ..., Count_a, Count_b
+    """
+    tabla = tabla[list(unidad) + [dimension] + list(estadisticos) + ['Count']]
+    tabla = tabla.astype({col: object for col in list(unidad) + [dimension]})
+    if valores is None:
+        valores = list(pd.unique(tabla[dimension]))
+    tabla = tabla[tabla[dimension].isin(valores)]
+
+    columnas_brecha = [f'Brecha_{estadistico}_%' for estadistico in estadisticos]
+    salida = list(unidad) + ['segmento_a', 'segmento_b'] + columnas_brecha + ['Count_a', 'Count_b']
+    if tabla.empty:
+        return pd.DataFrame(columns=salida)
+
+    ancha = tabla.set_index(list(unidad) + [dimension]).unstack(dimension)
+    ancha = ancha.reindex(columns=pd.MultiIndex.from_product([list(estadisticos) + ['Count'], valores]))
+    n_unidades, n_valores = len(ancha), len(valores)
+    matriz = ancha[list(estadisticos)].to_numpy(dtype='float64').reshape(n_unidades, len(estadisticos), n_valores)
+    count = np.nan_to_num(ancha['Count'].to_numpy(dtype='float64')).astype(np.int64)
+
+    # Todos los pares ordenados a ≠ b
+    a, b = np.nonzero(~np.eye(n_valores, dtype=bool))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        brechas = (matriz[:, :, a] - matriz[:, :, b]) / matriz[:, :, b] * 100
+    con_datos = ((count[:, a] > 0) & (count[:, b] > 0)).ravel()
+
+    indice = ancha.index.to_frame(index=False)
+    resultado = indice.loc[np.repeat(np.arange(n_unidades), len(a))].reset_index(drop=True)
+    resultado['segmento_a'] = np.tile(np.asarray(valores, dtype=object)[a], n_unidades)
+    resultado['segmento_b'] = np.tile(np.asarray(valores, dtype=object)[b], n_unidades)
+    for k, columna in enumerate(columnas_brecha):
+        resultado[columna] = brechas[:, k, :].ravel()
+    resultado['Count_a'] = count[:, a].ravel()
+    resultado['Count_b'] = count[:, b].ravel()
+    return resultado[con_datos].reset_index(drop=True)[salida]
+
+
+def bootstrap_muestra(valores, n_remuestras=N_REMUESTRAS, nivel=NIVEL_CONFIANZA, semilla=0):
+    """
+    Intervalos de confianza bootstrap (método percentil) de P25, P50, P75 y promedio
+
+    Remuestrea con una sola matriz de índices (n_remuestras × n): cada fila es una
+    remuestra con reposición, se ordenan todas juntas y los percentiles se interpolan
+    igual que en estadisticas_matriz.
+
+    Args:
+        valores: array 1D de salarios válidos (sin NaN)
+        n_remuestras: cantidad de remuestras
+        nivel: nivel de confianza (ej: 0.95)
+        semilla: semilla del generador (int, lista de ints o SeedSequence)
+
+    Returns:
+        dict estadístico -> (inferior, superior); NaN con menos de 2 valores
+    """
+    n = len(valores)
+    if n < 2:
+        return {nombre: (np.nan, np.nan) for nombre in ESTADISTICOS_BOOTSTRAP}
+
+    rng = np.random.default_rng(semilla)
+    indices = rng.integers(0, n, size=(n_remuestras, n))
+    muestras = np.sort(np.asarray(valores, dtype='float64')[indices], axis=1)
+
+    estimados = {}
+    for nombre, q in CUANTILES.items():
+        posicion = (n - 1) * q
+        anterior = int(np.floor(posicion))
+        siguiente = min(anterior + 1, n - 1)
+        estimados[nombre] = _lerp(muestras[:, anterior], muestras[:, siguiente], posicion - anterior)
+    estimados['Promedio'] = muestras.mean(axis=1)
+
+    alfa = (1 - nivel) / 2
+    return {nombre: tuple(np.quantile(estimados[nombre], [alfa, 1 - alfa])) for nombre in ESTADISTICOS_BOOTSTRAP}
+
+
+def _bootstrap_tareas(tareas, n_remuestras, nivel):
+    """Bootstrap de una lista de (valores, semilla) (se ejecuta en un proceso del pool)"""
+    return [bootstrap_muestra(valores, n_remuestras, nivel, semilla) for valores, semilla in tareas]
+
+
+class _StatsPerezosas(Mapping):
+    """{segmento: dict | None} de un cargo que calcula cada segmento al pedirlo"""
+
+    def __init__(self, stats, cargo, segmentos):
+        self._stats = stats
+        self._cargo = cargo
+        self._segmentos = segmentos
+
+    def __getitem__(self, segmento):
+        if segmento not in self._segmentos:
+            raise KeyError(segmento)
+        return self._stats.estadisticas_cargo(self._cargo, segmento)
+
+    def __iter__(self):
+        return iter(self._segmentos)
+
+    def __len__(self):
+        return len(self._segmentos)
+
 
 class EstadisticasSalariales:
     """Calcula estadísticas de salarios por cargo y segmentación"""
 
-    def __init__(self, df_normalizado):
+    def __init__(self, df_normalizado, perezoso=False, tamano_cache=TAMANO_CACHE_CARGOS):
+        """
+        Args:
+            df_normalizado: dataset normalizado
+            perezoso: si True, stats_por_cargo queda armado de entrada pero cada cargo ×
+                segmento se calcula recién al pedirlo (ver estadisticas_cargo); solo los
+                conteos de get_top_cargos se calculan al crear la instancia
+            tamano_cache: cargo × segmento que conserva el modo perezoso
+        """
         self.df = df_normalizado
         self.stats_por_cargo = {}
         self.stats_por_rubro = {}
+        self.tabla_cargos = None
+        self._ordenados = {}
+
+        self.perezoso = perezoso
+        self.tamano_cache = tamano_cache
+        self.aciertos_cache = 0
+        self.fallos_cache = 0
+        self._cache_cargos = OrderedDict()
+        self._lock_cache = threading.Lock()
+        self._conteos = None
+        if perezoso:
+            self._preparar_perezoso()
+
+    def _preparar_perezoso(self):
+        """Conteos por cargo (sin ordenar ni calcular estadísticas) y la vista perezosa"""
+        columnas = [col for col in self.df.columns if col.startswith('salario_')]
+        counts = np.count_nonzero(~np.isnan(matriz_salarios(self.df, columnas)), axis=0)
+        segmentos = [segmento for segmento, _ in self._segmentos()]
+        self._conteos = {}
+        for col, count in zip(columnas, counts):
+            if count >= 1:  # Mínimo 1 respuesta, como calcular_todos_los_cargos
+                nombre = col.replace('salario_', '').replace('_', ' ').title()
+                self._conteos[col] = (nombre, int(count))
+                self.stats_por_cargo[col] = {'nombre': nombre, 'stats': _StatsPerezosas(self, col, segmentos)}
+
+    def _segmentos(self, segmentar_por_tamano=True):
+        """Segmentos a calcular: (nombre, máscara de filas o None para todas)"""
+        segmentos = []
+        if segmentar_por_tamano and 'categoria_tamano' in self.df.columns:
+            tamano = self.df['categoria_tamano']
+            segmentos += [(seg, (tamano == seg).to_numpy()) for seg in SEGMENTOS_TAMANO]
+        segmentos.append(('General', None))
+        return segmentos
+
+    def salarios_ordenados(self, cargo, segmento='General'):
+        """
+        Salarios válidos (> 0) de un cargo en un segmento, ordenados y sin NaN
+
+        Se calculan una vez por segmento para todos los cargos (un solo sort de la
+        matriz de salarios) y quedan en cache en la instancia.
+
+        Args:
+            cargo: columna de salario (ej: 'salario_ceo')
+            segmento: 'General', 'Grande' o 'Pyme'
+
+        Returns:
+            array float64 de solo lectura
+        """
+        columnas, ordenada, count = self._matriz_ordenada(segmento)
+        j = self._indice_cargo(columnas, cargo)
+        return ordenada[:count[j], j]
+
+    def _matriz_ordenada(self, segmento):
+        """
+        Matriz de salarios del segmento ordenada por columna (NaN al final), en cache
+
+        Returns:
+            tuple (columnas, matriz ordenada de solo lectura, cantidad de valores por columna)
+        """
+        if segmento not in self._ordenados:
+            # Sin dataset (instancia cargada de un artefacto) solo están los segmentos guardados
+            filas = dict(self._segmentos()).get(segmento, False) if self.df is not None else False
+            if filas is False:
+                raise KeyError(f"Segmento desconocido: {segmento!r}")
+            columnas = [col for col in self.df.columns if col.startswith('salario_')]
+            matriz = matriz_salarios(self.df, columnas)
+            if filas is not None:
+                matriz = matriz[filas]
+            if matriz.shape[0] == 0:
+                matriz = np.full((1, len(columnas)), np.nan)
+            ordenada = np.sort(np.asfortranarray(matriz), axis=0)
+            ordenada.flags.writeable = False
+            count = np.count_nonzero(~np.isnan(ordenada), axis=0)
+            # Dos hilos pueden ordenar el mismo segmento a la vez: queda el primero
+            with self._lock_cache:
+                self._ordenados.setdefault(segmento, ({col: j for j, col in enumerate(columnas)}, ordenada, count))
+        return self._ordenados[segmento]
+
+    @staticmethod
+    def _indice_cargo(columnas, cargo):
+        """Posición de un cargo en la matriz ordenada"""
+        if cargo not in columnas:
+            raise KeyError(f"Cargo desconocido: {cargo!r}")
+        return columnas[cargo]
+
+    def rango_percentil(self, cargo, salario, segmento='General'):
+        """
+        Posición de un salario en el mercado del cargo ("¿dónde cae mi salario?")
+
+        Búsqueda binaria (O(log n)) sobre los salarios ordenados en cache.
+
+        Args:
+            cargo: columna de salario (ej: 'salario_ceo')
+            salario: salario bruto mensual a ubicar
+            segmento: 'General', 'Grande' o 'Pyme'
+
+        Returns:
+            float entre 0 y 1 (ej: 0.63 = percentil 63), con la misma interpolación
+            que percentiles(metodo='inc'); NaN si el cargo no tiene respuestas
+        """
+        ordenado = self.salarios_ordenados(cargo, segmento)
+        n = len(ordenado)
+        if n == 0:
+            return np.nan
+        menores = np.searchsorted(ordenado, salario, side='left')
+        anterior = ordenado[max(menores - 1, 0)]
+        actual = ordenado[min(menores, n - 1)]
+        return float(rango_percentil_desde_posicion(salario, menores, n, ordenado[0], anterior, actual))
+
+    def rangos_percentil(self, salarios, segmento='General'):
+        """
+        Posición en el mercado de todos los salarios de una empresa en una sola llamada
+
+        Args:
+            salarios: dict o Series {cargo: salario} (ej: una fila del dataset normalizado)
+            segmento: 'General', 'Grande' o 'Pyme'
+
+        Returns:
+            Series {cargo: posición entre 0 y 1} (NaN para salarios vacíos o <= 0 y
+            cargos sin respuestas)
+        """
+        salarios = pd.Series(salarios, dtype='float64')
+        columnas, ordenada, count = self._matriz_ordenada(segmento)
+        indices = np.array([self._indice_cargo(columnas, cargo) for cargo in salarios.index], dtype=np.intp)
+        x = salarios.to_numpy()
+
+        menores = contar_menores(ordenada, count, indices, x)
+        n = count[indices]
+        ultima = ordenada.shape[0] - 1
+        anterior = ordenada[np.clip(menores - 1, 0, ultima), indices]
+        actual = ordenada[np.minimum(menores, np.maximum(n - 1, 0)), indices]
+        rangos = rango_percentil_desde_posicion(x, menores, n, ordenada[0, indices], anterior, actual)
+        return pd.Series(rangos, index=salarios.index, name='rango_percentil')
+
+    def percentiles(self, cargo, qs, segmento='General', metodo='inc'):
+        """
+        Percentiles arbitrarios de un cargo (ej: P10, P90, deciles)
+
+        Args:
+            cargo: columna de salario (ej: 'salario_ceo')
+            qs: lista de cuantiles entre 0 y 1 (ej: [0.1, 0.9])
+            segmento: 'General', 'Grande' o 'Pyme'
+            metodo: 'inc' (Excel PERCENTILE.INC, igual que P25/P50/P75) o
+                'exc' (Excel PERCENTILE.EXC)
+
+        Returns:
+            Series indexada por cuantil (NaN si no hay datos suficientes)
+        """
+        valores = percentiles_ordenados(self.salarios_ordenados(cargo, segmento), qs, metodo)
+        return pd.Series(valores, index=pd.Index(np.atleast_1d(qs), name='q'), name=cargo)
+
+    def resumenes_cuantiles(self, compresion=COMPRESION_RESUMEN, segmentar_por_tamano=True):
+        """
+        Resumen de cuantiles combinable (t-digest) de cada cargo y segmento
+
+        Los resúmenes de distintas ediciones o regiones se combinan con
+        utils.cuantiles.combinar_resumenes para obtener percentiles agregados sin
+        las respuestas individuales.
+
+        Args:
+            compresion: cantidad máxima de centroides por resumen
+            segmentar_por_tamano: si True, agrega los segmentos Grande/Pyme a 'General'
+
+        Returns:
+            dict {(cargo, segmento): ResumenCuantiles}, solo cargos × segmento con respuestas
+        """
+        columnas, _, _ = self._matriz_ordenada('General')
+        resumenes = {}
+        for segmento, _ in self._segmentos(segmentar_por_tamano):
+            for cargo in columnas:
+                valores = self.salarios_ordenados(cargo, segmento)
+                if len(valores):
+                    resumenes[(cargo, segmento)] = ResumenCuantiles.desde_valores(valores, compresion)
+        return resumenes
+
+    def calcular_tabla_cargos(self, columnas=None, segmentar_por_tamano=True):
+        """
+        Estadísticas de todos los cargos × segmento, vectorizadas sobre la matriz de salarios
+
+        Args:
+            columnas: columnas de salario (None = todas las salario_*)
+            segmentar_por_tamano: si True, agrega los segmentos Grande/Pyme a 'General'
+
+        Returns:
+            DataFrame ordenado con una fila por cargo y segmento: cargo, nombre, segmento,
+            P25, P50, P75, Promedio, Desv_Std, Min, Max, Count
+        """
+        if columnas is None:
+            columnas = [col for col in self.df.columns if col.startswith('salario_')]
+        matriz = matriz_salarios(self.df, columnas)
+        nombres = [col.replace('salario_', '').replace('_', ' ').title() for col in columnas]
+
+        bloques = []
+        for segmento, filas in self._segmentos(segmentar_por_tamano):
+            stats = estadisticas_matriz(matriz if filas is None else matriz[filas])
+            bloques.append(pd.DataFrame({'cargo': columnas, 'nombre': nombres, 'segmento': segmento, **stats}))
+
+        tabla = pd.concat(bloques, ignore_index=True)
+        # Orden por cargo (en el orden de las columnas) y segmento
+        tabla['cargo'] = pd.Categorical(tabla['cargo'], categories=columnas)
+        tabla = tabla.sort_values(['cargo'], kind='stable', ignore_index=True)
+        tabla['cargo'] = tabla['cargo'].astype(object)
+        return tabla
+
+    @staticmethod
+    def vista_anidada(tabla):
+        """
+        Vista {cargo: {'nombre', 'stats': {segmento: dict | None}}} de la tabla ordenada
+
+        Es la forma de stats_por_cargo; un segmento sin respuestas queda en None.
+        """
+        vista = {}
+        for fila in tabla.itertuples(index=False):
+            cargo = vista.setdefault(fila.cargo, {'nombre': fila.nombre, 'stats': {}})
+            if fila.Count > 0:
+                stats = {col: getattr(fila, col) for col in COLUMNAS_ESTADISTICAS}
+                stats['Count'] = int(stats['Count'])
+            else:
+                stats = None
+            cargo['stats'][fila.segmento] = stats
+        return vista
+
+    def estadisticas_cargo(self, cargo, segmento='General'):
+        """
+        Estadísticas de un cargo en un segmento, calculadas al primer pedido
+
+        Quedan en una cache LRU de tamano_cache entradas por (cargo, segmento); los
+        aciertos y fallos se cuentan en aciertos_cache y fallos_cache. Los valores son
+        los mismos que los de calcular_todos_los_cargos.
+
+        Args:
+            cargo: columna de salario (ej: 'salario_ceo')
+            segmento: 'General', 'Grande' o 'Pyme'
+
+        Returns:
+            dict con P25, P50, P75, Promedio, Desv_Std, Min, Max, Count, o None si el
+            cargo no tiene respuestas en el segmento
+        """
+        clave = (cargo, segmento)
+        with self._lock_cache:
+            if clave in self._cache_cargos:
+                self._cache_cargos.move_to_end(clave)
+                self.aciertos_cache += 1
+                return self._cache_cargos[clave]
+            self.fallos_cache += 1
+
+        filas = dict(self._segmentos()).get(segmento, False)
+        if filas is False:
+            raise KeyError(f"Segmento desconocido: {segmento!r}")
+        if cargo not in self.df.columns:
+            raise KeyError(f"Cargo desconocido: {cargo!r}")
+        matriz = matriz_salarios(self.df, [cargo])
+        valores = estadisticas_matriz(matriz if filas is None else matriz[filas])
+
+        stats = None
+        if valores['Count'][0] > 0:
+            stats = {col: float(valores[col][0]) for col in COLUMNAS_ESTADISTICAS}
+            stats['Count'] = int(valores['Count'][0])
+
+        with self._lock_cache:
+            self._cache_cargos[clave] = stats
+            self._cache_cargos.move_to_end(clave)
+            while len(self._cache_cargos) > self.tamano_cache:
+                self._cache_cargos.popitem(last=False)
+        return stats
+
+    def info_cache(self):
+        """Aciertos, fallos y ocupación de la cache del modo perezoso"""
+        with self._lock_cache:
+            return {'aciertos': self.aciertos_cache, 'fallos': self.fallos_cache,
+                    'entradas': len(self._cache_cargos), 'maximo': self.tamano_cache}
 
     def calcular_percentiles_cargo(self, columna_salario, segmentar_por_tamano=True):
         """
@@ -27,79 +619,190 @@ class EstadisticasSalariales:
         Returns:
             dict con estadísticas
         """
-        stats = {}
-
-        if segmentar_por_tamano and 'categoria_tamano' in self.df.columns:
-            # Estadísticas por tamaño
-            for tamano in ['Grande', 'Pyme']:
-                df_seg = self.df[self.df['categoria_tamano'] == tamano]
-                salarios = pd.to_numeric(df_seg[columna_salario], errors='coerce').dropna()
-                # Filtrar valores > 0 (0 = dato faltante)
-                salarios = salarios[salarios > 0]
-
-                if len(salarios) > 0:
-                    stats[tamano] = {
-                        'P25': salarios.quantile(0.25),
-                        'P50': salarios.quantile(0.50),  # Mediana
-                        'P75': salarios.quantile(0.75),
-                        'Promedio': salarios.mean(),
-                        'Desv_Std': salarios.std(),
-                        'Min': salarios.min(),
-                        'Max': salarios.max(),
-                        'Count': len(salarios)
-                    }
-                else:
-                    stats[tamano] = None
-
-        # Estadísticas generales (sin segmentar)
-        salarios_general = pd.to_numeric(self.df[columna_salario], errors='coerce').dropna()
-        # Filtrar valores > 0 (0 = dato faltante)
-        salarios_general = salarios_general[salarios_general > 0]
-
-        if len(salarios_general) > 0:
-            stats['General'] = {
-                'P25': salarios_general.quantile(0.25),
-                'P50': salarios_general.quantile(0.50),
-                'P75': salarios_general.quantile(0.75),
-                'Promedio': salarios_general.mean(),
-                'Desv_Std': salarios_general.std(),
-                'Min': salarios_general.min(),
-                'Max': salarios_general.max(),
-                'Count': len(salarios_general)
-            }
-        else:
-            stats['General'] = None
-
-        return stats
+        # Valores <= 0 se excluyen (0 = dato faltante)
+        tabla = self.calcular_tabla_cargos([columna_salario], segmentar_por_tamano)
+        return self.vista_anidada(tabla)[columna_salario]['stats']
 
     def calcular_todos_los_cargos(self):
-        """Calcula estadísticas para todos los cargos"""
+        """
+        Calcula estadísticas para todos los cargos
+
+        Deja la tabla ordenada en tabla_cargos y su vista anidada en stats_por_cargo
+        (solo cargos con al menos 1 respuesta).
+        """
         print("Calculando estadísticas para todos los cargos...")
 
-        salary_columns = [col for col in self.df.columns if col.startswith('salario_')]
+        self.tabla_cargos = self._tabla_con_datos()
+        self.stats_por_cargo = self.vista_anidada(self.tabla_cargos)
 
-        for col in salary_columns:
-            cargo_nombre = col.replace('salario_', '').replace('_', ' ').title()
-            stats = self.calcular_percentiles_cargo(col)
+        print(f"✓ Estadísticas calculadas para {len(self.stats_por_cargo)} cargos")
+        return self
 
-            if stats.get('General') and stats['General']['Count'] >= 1:  # Mínimo 1 respuesta
-                self.stats_por_cargo[col] = {
-                    'nombre': cargo_nombre,
-                    'stats': stats
-                }
+    def _tabla_con_datos(self):
+        """calcular_tabla_cargos de los cargos con al menos 1 respuesta"""
+        tabla = self.calcular_tabla_cargos()
+        con_datos = tabla.loc[(tabla['segmento'] == 'General') & (tabla['Count'] >= 1), 'cargo']  # Mínimo 1 respuesta
+        return tabla[tabla['cargo'].isin(con_datos)].reset_index(drop=True)
 
-        print(f"✓ Estadísticas calculadas para {len(self.stats_por_cargo)} cargos")
+    def _tabla(self):
+        """
+        tabla_cargos, calculándola si hace falta
+
+        En modo perezoso se calcula una sola vez (bajo el lock de la cache) y
+        stats_por_cargo sigue siendo la vista perezosa: la instancia puede estar
+        compartida entre hilos mientras tanto.
+        """
+        if self.tabla_cargos is not None:
+            return self.tabla_cargos
+        if not self.perezoso:
+            return self.calcular_todos_los_cargos().tabla_cargos
+        with self._lock_cache:
+            if self.tabla_cargos is None:
+                self.tabla_cargos = self._tabla_con_datos()
+        return self.tabla_cargos
+
+    def guardar_artefacto(self, path, clave=''):
+        """
+        Guarda tabla_cargos y la matriz ordenada de cada segmento en un .npz
+
+        Solo arrays numéricos y de texto (se lee sin pickle). La escritura es atómica:
+        un proceso que lo esté leyendo ve el archivo anterior o el nuevo completo.
+
+        Args:
+            path: archivo .npz
+            clave: huella del dataset y del código con que se calculó
+        """
+        tabla_cargos = self._tabla()
+        segmentos = [segmento for segmento, _ in self._segmentos()]
+        arrays = {
+            'version': np.array(VERSION_ARTEFACTO),
+            'clave': np.array(clave),
+            'segmentos': np.array(segmentos, dtype=str),
+        }
+        for col in ['cargo', 'nombre', 'segmento']:
+            arrays[f'tabla_{col}'] = tabla_cargos[col].to_numpy(dtype=str)
+        for col in COLUMNAS_ESTADISTICAS:
+            arrays[f'tabla_{col}'] = tabla_cargos[col].to_numpy()
+        for i, segmento in enumerate(segmentos):
+            columnas, ordenada, count = self._matriz_ordenada(segmento)
+            arrays['columnas'] = np.array(list(columnas), dtype=str)
+            arrays[f'ordenada_{i}'] = ordenada
+            arrays[f'count_{i}'] = count
+
+        path = Path(path)
+        tmp = path.with_name(f'.{path.name}.tmp')
+        with open(tmp, 'wb') as f:
+            np.savez(f, **arrays)
+        os.replace(tmp, path)
         return self
 
+    @classmethod
+    def desde_artefacto(cls, path, df=None, clave=None):
+        """
+        Instancia con las estadísticas de guardar_artefacto, sin recalcular nada
+
+        Args:
+            path: archivo .npz
+            df: dataset normalizado, solo para los métodos que recalculan (ej:
+                intervalos_bootstrap, analizar_beneficios); None = no tenerlo
+            clave: si se indica, el artefacto tiene que haberse calculado con esa huella
+
+        Returns:
+            EstadisticasSalariales con tabla_cargos, stats_por_cargo y las matrices
+            ordenadas, o None si el artefacto no existe, es de otra versión o de otra clave
+        """
+        path = Path(path)
+        if not path.exists():
+            return None
+        with np.load(path, allow_pickle=False) as artefacto:
+            if int(artefacto['version']) != VERSION_ARTEFACTO:
+                return None
+            if clave is not None and str(artefacto['clave']) != clave:
+                return None
+            arrays = {nombre: artefacto[nombre] for nombre in artefacto.files}
+
+        stats = cls(df)
+        tabla = pd.DataFrame({col: arrays[f'tabla_{col}'].astype(object) for col in ['cargo', 'nombre', 'segmento']})
+        for col in COLUMNAS_ESTADISTICAS:
+            tabla[col] = arrays[f'tabla_{col}']
+        stats.tabla_cargos = tabla
+        stats.stats_por_cargo = cls.vista_anidada(tabla)
+
+        columnas = {col: j for j, col in enumerate(arrays['columnas'].tolist())}
+        for i, segmento in enumerate(arrays['segmentos'].tolist()):
+            ordenada = arrays[f'ordenada_{i}']
+            ordenada.flags.writeable = False
+            stats._ordenados[segmento] = (columnas, ordenada, arrays[f'count_{i}'])
+        return stats
+
+    def intervalos_bootstrap(self, cargos=None, n_remuestras=N_REMUESTRAS, nivel=NIVEL_CONFIANZA, semilla=0,
+                             segmentar_por_tamano=True, max_workers=None):
+        """
+        Intervalos de confianza bootstrap de P25, P50, P75 y promedio por cargo y segmento
+
+        Cada cargo × segmento usa su propio generador, derivado de (semilla, segmento,
+        cargo): el resultado es reproducible y no depende de qué cargos se pidan ni de
+        cómo se repartan entre procesos.
+
+        Args:
+            cargos: columnas de salario (None = todas las salario_*)
+            n_remuestras: cantidad de remuestras por cargo
+            nivel: nivel de confianza (ej: 0.95)
+            semilla: semilla base del generador
+            segmentar_por_tamano: si True, agrega los segmentos Grande/Pyme a 'General'
+            max_workers: procesos del pool (None = cantidad de CPUs; 1 = sin pool)
+
+        Returns:
+            DataFrame con una fila por cargo, segmento y estadístico: cargo, segmento,
+            estadistico, inferior, superior, Count (intervalo NaN con menos de 2 respuestas)
+        """
+        columnas, _, _ = self._matriz_ordenada('General')
+        if cargos is None:
+            cargos = list(columnas)
+
+        claves, tareas = [], []
+        for j_segmento, (segmento, _) in enumerate(self._segmentos(segmentar_por_tamano)):
+            for cargo in cargos:
+                valores = self.salarios_ordenados(cargo, segmento)
+                claves.append((cargo, segmento, len(valores)))
+                tareas.append((valores, [semilla, j_segmento, self._indice_cargo(columnas, cargo)]))
+
+        max_workers = min(max_workers or os.cpu_count() or 1, max(len(tareas), 1))
+        if max_workers == 1:
+            resultados = _bootstrap_tareas(tareas, n_remuestras, nivel)
+        else:
+            bloques = [tareas[i::max_workers] for i in range(max_workers)]
+            with ProcessPoolExecutor(max_workers=max_workers) as pool:
+                por_bloque = list(pool.map(_bootstrap_tareas, bloques, [n_remuestras] * len(bloques),
+                                           [nivel] * len(bloques)))
+            # Volver al orden original (bloque i tiene las tareas i, i + max_workers, ...)
+            resultados = [None] * len(tareas)
+            for i, bloque in enumerate(por_bloque):
+                resultados[i::max_workers] = bloque
+
+        filas = [
+            {'cargo': cargo, 'segmento': segmento, 'estadistico': nombre,
+             'inferior': inferior, 'superior': superior, 'Count': count}
+            for (cargo, segmento, count), intervalos in zip(claves, resultados)
+            for nombre, (inferior, superior) in intervalos.items()
+        ]
+        return pd.DataFrame(filas, columns=['cargo', 'segmento', 'estadistico', 'inferior', 'superior', 'Count'])
+
+    def _conteos_generales(self):
+        """{cargo: (nombre, respuestas)} de los cargos con datos (en modo perezoso, sin calcularlos)"""
+        if self._conteos is not None:
+            return self._conteos
+        return {cargo: (data['nombre'], data['stats']['General']['Count'])
+                for cargo, data in self.stats_por_cargo.items()}
+
     def get_top_cargos(self, n=10):
         """Obtiene los N cargos con más respuestas"""
         cargo_counts = []
 
-        for cargo, data in self.stats_por_cargo.items():
-            count = data['stats']['General']['Count']
+        for cargo, (nombre, count) in self._conteos_generales().items():
             cargo_counts.append({
                 'cargo': cargo,
-                'nombre': data['nombre'],
+                'nombre': nombre,
                 'count': count
             })
 
@@ -126,19 +829,38 @@ class EstadisticasSalariales:
         return stats
 
     def analizar_beneficios(self):
-        """Analiza la distribución de beneficios"""
-        beneficios = {}
+        """
+        Analiza la distribución de beneficios
 
-        benef_columns = [col for col in self.df.columns if col.startswith('benef_')]
+        Las proporciones salen de beneficios.prevalencia_beneficios (todas las columnas
+        benef_* y segmentos en una sola agrupación).
+
+        Returns:
+            dict {columna: {'Grande': {respuesta: proporción}, 'Pyme': {...}}}, o
+            {columna: {respuesta: proporción}} si no hay categoria_tamano
+        """
+        tabla = prevalencia_beneficios(self.df)
+        tabla = tabla[tabla['rubro'] == TODOS_BENEFICIOS]
+        proporciones = {
+            clave: grupo.set_index('valor')['proporcion']
+            for clave, grupo in tabla.groupby(['tamano', 'beneficio'], sort=False)
+        }
+
+        def distribucion(tamano, col):
+            serie = proporciones.get((tamano, col), pd.Series(dtype='float64'))
+            if isinstance(self.df[col].dtype, pd.CategoricalDtype):
+                # Las respuestas posibles sin empresas figuran con 0 (NaN si el segmento no respondió)
+                serie = serie.reindex(serie.index.union(self.df[col].cat.categories, sort=False),
+                                      fill_value=0.0 if len(serie) else np.nan)
+            return serie.to_dict()
 
+        beneficios = {}
+        benef_columns = [col for col in self.df.columns if col.startswith('benef_')]
         for col in benef_columns:
             if 'categoria_tamano' in self.df.columns:
-                beneficios[col] = {
-                    'Grande': self.df[self.df['categoria_tamano'] == 'Grande'][col].value_counts(normalize=True).to_dict(),
-                    'Pyme': self.df[self.df['categoria_tamano'] == 'Pyme'][col].value_counts(normalize=True).to_dict(),
-                }
+                beneficios[col] = {segmento: distribucion(segmento, col) for segmento in SEGMENTOS_TAMANO}
             else:
-                beneficios[col] = self.df[col].value_counts(normalize=True).to_dict()
+                beneficios[col] = distribucion(TODOS_BENEFICIOS, col)
 
         return beneficios
 
@@ -157,50 +879,32 @@ class EstadisticasSalariales:
             top_cargos = self.get_top_cargos(20)
             cargos_seleccionados = top_cargos['cargo'].tolist()
 
-        resumen = []
-
-        for cargo in cargos_seleccionados:
-            if cargo in self.stats_por_cargo:
-                data = self.stats_por_cargo[cargo]
-                stats_gen = data['stats'].get('General')
-                stats_grande = data['stats'].get('Grande')
-                stats_pyme = data['stats'].get('Pyme')
-
-                row = {
-                    'Cargo': data['nombre'],
-                    'Respuestas': stats_gen['Count'] if stats_gen else 0,
-                }
-
-                if stats_gen:
-                    row.update({
-                        'P25_General': stats_gen['P25'],
-                        'P50_General': stats_gen['P50'],
-                        'P75_General': stats_gen['P75'],
-                        'Promedio_General': stats_gen['Promedio'],
-                    })
-
-                if stats_grande:
-                    row.update({
-                        'P25_Grande': stats_grande['P25'],
-                        'P50_Grande': stats_grande['P50'],
-                        'P75_Grande': stats_grande['P75'],
-                    })
-
-                if stats_pyme:
-                    row.update({
-                        'P25_Pyme': stats_pyme['P25'],
-                        'P50_Pyme': stats_pyme['P50'],
-                        'P75_Pyme': stats_pyme['P75'],
-                    })
-
-                # Calcular brecha entre Grande y Pyme
-                if stats_grande and stats_pyme:
-                    brecha_p50 = ((stats_grande['P50'] - stats_pyme['P50']) / stats_pyme['P50'] * 100)
-                    row['Brecha_Grande_Pyme_%'] = brecha_p50
-
-                resumen.append(row)
-
-        return pd.DataFrame(resumen)
+        tabla_cargos = self._tabla()
+        cargos = [cargo for cargo in cargos_seleccionados if cargo in self.stats_por_cargo]
+        tabla = tabla_cargos.set_index(['segmento', 'cargo'])
+        segmentos = set(tabla.index.get_level_values('segmento'))
+
+        resumen = pd.DataFrame({
+            'Cargo': [self.stats_por_cargo[cargo]['nombre'] for cargo in cargos],
+            'Respuestas': tabla.loc['General', 'Count'].reindex(cargos).to_numpy(),
+        })
+        columnas = [('General', ['P25', 'P50', 'P75', 'Promedio']),
+                    ('Grande', ['P25', 'P50', 'P75']),
+                    ('Pyme', ['P25', 'P50', 'P75'])]
+        for segmento, estadisticos in columnas:
+            if segmento not in segmentos:
+                continue
+            valores = tabla.loc[segmento, estadisticos].reindex(cargos)
+            for estadistico in estadisticos:
+                resumen[f'{estadistico}_{segmento}'] = valores[estadistico].to_numpy()
+
+        # Brecha entre Grande y Pyme
+        brechas = matriz_brechas(tabla_cargos, ['cargo'], 'segmento', ['P50'], valores=['Grande', 'Pyme'])
+        brechas = brechas[brechas['segmento_a'] == 'Grande'].set_index('cargo')['Brecha_P50_%']
+        resumen['Brecha_Grande_Pyme_%'] = brechas.reindex(cargos).to_numpy()
+
+        # Un segmento sin respuestas en ningún cargo no aporta columnas
+        return resumen.dropna(axis=1, how='all')
 
     def exportar_estadisticas(self, output_path):
         """Exporta todas las estadísticas a un archivo Excel"""
@@ -225,20 +929,40 @@ class EstadisticasSalariales:
         return self
 
 
-def main():
+def main(argv=None):
     """Función principal"""
+    parser = argparse.ArgumentParser(description='Calcula las estadísticas salariales y las exporta a Excel')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='recalcular aunque el dataset normalizado y el código no hayan cambiado')
+    args = parser.parse_args(argv)
+
+    from src.analytics.artefactos import estadisticas_en_cache, intervalos_bootstrap_en_cache, INTERVALOS_BOOTSTRAP
+
     base_path = Path(__file__).parent.parent.parent
-    csv_path = base_path / 'data' / 'processed' / 'encuesta_normalizada.csv'
     output_excel = base_path / 'data' / 'processed' / 'estadisticas_salarios.xlsx'
 
+    # Cache por contenido: dataset normalizado + código de este módulo
+    dataset = base_path / PARQUET_NORMALIZADO
+    if not dataset.exists():
+        dataset = base_path / CSV_NORMALIZADO
+    cache = CacheResultados(base_path / 'data' / 'cache' / 'estadisticas')
+    clave = clave_cache([dataset, __file__])
+
+    if not args.no_cache and cache.restaurar(clave, [output_excel]):
+        print(f"✓ Cache hit ({clave[:12]}): datos y código sin cambios, {output_excel.name} restaurado")
+        estadisticas_en_cache(base_path)
+        intervalos_bootstrap_en_cache(base_path)
+        return
+    estado = "Cache desactivada (--no-cache)" if args.no_cache else f"Cache miss ({clave[:12]})"
+    print(f"{estado}: calculando estadísticas...\n")
+
     # Cargar datos normalizados
     print("Cargando datos normalizados...")
-    df = pd.read_csv(csv_path)
+    df = cargar_encuesta_normalizada(base_path)
     print(f"✓ Datos cargados: {len(df)} empresas")
 
-    # Calcular estadísticas
-    stats = EstadisticasSalariales(df)
-    stats.calcular_todos_los_cargos()
+    # Calcular estadísticas (y guardar el artefacto que lee el dashboard al iniciar)
+    stats = estadisticas_en_cache(base_path, df, usar_cache=not args.no_cache)
 
     # Mostrar top cargos
     print("\n" + "="*60)
@@ -249,6 +973,13 @@ def main():
     # Exportar a Excel
     stats.exportar_estadisticas(output_excel)
 
+    cache.guardar(clave, [output_excel])
+
+    # Intervalos de confianza bootstrap (para las bandas de incertidumbre del dashboard)
+    print(f"\nCalculando intervalos bootstrap ({N_REMUESTRAS} remuestras, {NIVEL_CONFIANZA:.0%})...")
+    intervalos = intervalos_bootstrap_en_cache(base_path, df, usar_cache=not args.no_cache)
+    print(f"✓ Intervalos guardados en {INTERVALOS_BOOTSTRAP} ({intervalos['cargo'].nunique()} cargos)")
+
     print("\n✅ Análisis estadístico completado!")
 
 
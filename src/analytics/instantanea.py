@@ -0,0 +1,194 @@
+"""
+Instantáneas inmutables de las estadísticas por cargo y el proveedor que las
+comparte entre las sesiones del dashboard
+"""
+
+import pandas as pd
+import numpy as np
+import sys
+import time
+import logging
+import threading
+from pathlib import Path
+from types import MappingProxyType
+
+# Agregar el directorio raíz al path para importar src.utils
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.analytics.estadisticas import EstadisticasSalariales, COLUMNAS_ESTADISTICAS
+from src.analytics.artefactos import estadisticas_en_cache
+from src.utils.datos import cargar_encuesta_normalizada, PARQUET_NORMALIZADO, CSV_NORMALIZADO
+
+logger = logging.getLogger(__name__)
+
+
+def _congelar(valor):
+    """Copia de solo lectura de dicts anidados (MappingProxyType)"""
+    if isinstance(valor, dict):
+        return MappingProxyType({clave: _congelar(v) for clave, v in valor.items()})
+    return valor
+
+
+class InstantaneaEstadisticas:
+    """
+    Estadísticas de todos los cargos congeladas, para compartir entre sesiones sin locks
+
+    La tabla es un array estructurado de NumPy y las matrices ordenadas son arrays de
+    solo lectura; los atributos no se pueden reasignar. Para datos nuevos se arma otra
+    instantánea y se reemplaza la referencia (ver ProveedorEstadisticas). Las consultas
+    (rango_percentil, percentiles, get_top_cargos, ...) son las de EstadisticasSalariales.
+    """
+
+    __slots__ = ('tabla', 'stats_por_cargo', '_ordenados')
+
+    def __init__(self, tabla_cargos, ordenados):
+        """
+        Args:
+            tabla_cargos: DataFrame como EstadisticasSalariales.tabla_cargos
+            ordenados: {segmento: (columnas, matriz ordenada, count)} como _matriz_ordenada
+        """
+        campos = [(col, tabla_cargos[col].to_numpy(dtype=str)) for col in ['cargo', 'nombre', 'segmento']]
+        campos += [(col, tabla_cargos[col].to_numpy(dtype='int64' if col == 'Count' else 'float64'))
+                   for col in COLUMNAS_ESTADISTICAS]
+        tabla = np.empty(len(tabla_cargos), dtype=[(col, valores.dtype) for col, valores in campos])
+        for col, valores in campos:
+            tabla[col] = valores
+        tabla.flags.writeable = False
+
+        congelados = {}
+        for segmento, (columnas, ordenada, count) in ordenados.items():
+            count = count.copy()
+            count.flags.writeable = False
+            ordenada.flags.writeable = False
+            congelados[segmento] = (MappingProxyType(dict(columnas)), ordenada, count)
+
+        object.__setattr__(self, 'tabla', tabla)
+        object.__setattr__(self, 'stats_por_cargo',
+                           _congelar(EstadisticasSalariales.vista_anidada(tabla_cargos)))
+        object.__setattr__(self, '_ordenados', MappingProxyType(congelados))
+
+    def __setattr__(self, nombre, valor):
+        raise AttributeError(f"{type(self).__name__} es inmutable")
+
+    def __delattr__(self, nombre):
+        raise AttributeError(f"{type(self).__name__} es inmutable")
+
+    @classmethod
+    def desde_estadisticas(cls, stats):
+        """
+        Instantánea de un EstadisticasSalariales, para compartir entre sesiones
+
+        Calcula todos los cargos si hace falta (en modo perezoso sin reemplazar
+        stats_por_cargo); las matrices ordenadas (ya de solo lectura) se comparten
+        sin copiarlas.
+        """
+        tabla_cargos = stats._tabla()
+        segmentos = [seg for seg, _ in stats._segmentos()] if stats.df is not None else list(stats._ordenados)
+        return cls(tabla_cargos, {seg: stats._matriz_ordenada(seg) for seg in segmentos})
+
+    @property
+    def tabla_cargos(self):
+        """La tabla como DataFrame (una copia nueva en cada acceso)"""
+        tabla = pd.DataFrame(self.tabla)
+        for col in ['cargo', 'nombre', 'segmento']:
+            tabla[col] = tabla[col].astype(object)
+        return tabla
+
+    def _matriz_ordenada(self, segmento):
+        """(columnas, matriz ordenada, count) de un segmento"""
+        if segmento not in self._ordenados:
+            raise KeyError(f"Segmento desconocido: {segmento!r}")
+        return self._ordenados[segmento]
+
+    def _conteos_generales(self):
+        """{cargo: (nombre, respuestas)} de los cargos con datos"""
+        general = self.tabla[self.tabla['segmento'] == 'General']
+        return {cargo: (nombre, int(count))
+                for cargo, nombre, count in zip(general['cargo'].tolist(), general['nombre'].tolist(),
+                                                general['Count'].tolist())}
+
+    _indice_cargo = staticmethod(EstadisticasSalariales._indice_cargo)
+    salarios_ordenados = EstadisticasSalariales.salarios_ordenados
+    rango_percentil = EstadisticasSalariales.rango_percentil
+    rangos_percentil = EstadisticasSalariales.rangos_percentil
+    percentiles = EstadisticasSalariales.percentiles
+    get_top_cargos = EstadisticasSalariales.get_top_cargos
+
+    def __repr__(self):
+        return f"InstantaneaEstadisticas(cargos={len(self.stats_por_cargo)}, segmentos={list(self._ordenados)})"
+
+
+class ProveedorEstadisticas:
+    """
+    Entrega la instantánea vigente y la reemplaza cuando cambia el dataset normalizado
+
+    Las sesiones llaman a actual() sin locks: el reemplazo es una sola asignación de
+    atributo, así que cada sesión ve la instantánea anterior completa o la nueva
+    completa, y las que ya tenían la anterior la siguen usando. Solo la reconstrucción
+    se serializa, para no calcular dos veces la misma.
+
+    Si el artefacto en disco no está al día, mientras la instantánea se calcula en un
+    hilo aparte se entrega un EstadisticasSalariales perezoso (mismas consultas, cada
+    cargo se calcula al pedirlo), así la primera página no espera a todos los cargos.
+    Ese motor solo modifica su estado bajo su propio lock; si el cálculo completo
+    falla, se descarta y el siguiente actual() vuelve a intentarlo.
+    """
+
+    def __init__(self, base_path, intervalo_verificacion=5.0):
+        """
+        Args:
+            base_path: raíz del proyecto
+            intervalo_verificacion: segundos entre chequeos del dataset en disco
+        """
+        self.base_path = Path(base_path)
+        self.intervalo_verificacion = intervalo_verificacion
+        self._lock = threading.Lock()
+        self._vigente = (None, None)  # (firma del dataset, instantánea)
+        self._verificado = 0.0
+
+    def _firma_dataset(self):
+        """Nombre, fecha de modificación y tamaño del dataset (un stat, sin leerlo)"""
+        dataset = self.base_path / PARQUET_NORMALIZADO
+        if not dataset.exists():
+            dataset = self.base_path / CSV_NORMALIZADO
+        info = dataset.stat()
+        return (dataset.name, info.st_mtime_ns, info.st_size)
+
+    def actual(self):
+        """Instantánea vigente (la reconstruye si el dataset cambió desde la última)"""
+        firma, instantanea = self._vigente
+        ahora = time.monotonic()
+        if instantanea is not None and ahora - self._verificado < self.intervalo_verificacion:
+            return instantanea
+        self._verificado = ahora
+        if instantanea is not None and self._firma_dataset() == firma:
+            return instantanea
+        return self.refrescar()
+
+    def refrescar(self):
+        """Arma una instantánea del dataset actual y la publica"""
+        with self._lock:
+            firma = self._firma_dataset()
+            vigente_firma, vigente = self._vigente
+            if vigente is not None and vigente_firma == firma:
+                return vigente  # otro hilo ya la reconstruyó
+            stats = estadisticas_en_cache(self.base_path, calcular=False)
+            if stats is not None:
+                nueva = InstantaneaEstadisticas.desde_estadisticas(stats)
+            else:
+                nueva = EstadisticasSalariales(cargar_encuesta_normalizada(self.base_path), perezoso=True)
+                threading.Thread(target=self._construir, args=(firma,), daemon=True).start()
+            self._vigente = (firma, nueva)
+            return nueva
+
+    def _construir(self, firma):
+        """Calcula la instantánea completa (y el artefacto) y la publica si el dataset no volvió a cambiar"""
+        try:
+            nueva = InstantaneaEstadisticas.desde_estadisticas(estadisticas_en_cache(self.base_path))
+        except Exception:
+            logger.exception("No se pudieron calcular las estadísticas de %s", self.base_path)
+            nueva = None
+        with self._lock:
+            if self._vigente[0] == firma:
+                # Sin instantánea, (None, None) hace que el próximo actual() reintente
+                self._vigente = (firma, nueva) if nueva is not None else (None, None)
@@ -0,0 +1,228 @@
+"""
+Estadísticas salariales por nivel jerárquico (CEO, Director, Gerente, Jefe)
+Promedia los percentiles, el promedio y la cantidad de los cargos de cada nivel
+por tamaño de empresa, con el mismo método que el QA Excel
+"""
+
+import pandas as pd
+import numpy as np
+import sys
+import argparse
+from pathlib import Path
+
+# Agregar el directorio raíz al path para importar src.utils
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+import src.analytics.estadisticas as estadisticas
+import src.utils.constants as constants
+from src.analytics.estadisticas import (matriz_salarios, estadisticas_matriz, COLUMNAS_ESTADISTICAS,
+                                        SEGMENTOS_TAMANO)
+from src.utils.constants import NIVELES_JERARQUIA
+from src.utils.datos import (cargar_encuesta_normalizada, PARQUET_NORMALIZADO, CSV_NORMALIZADO,
+                             COMPRESION_PARQUET)
+from src.utils.cache import CacheResultados, clave_cache
+
+# Archivo de la tabla por jerarquía (relativo a la raíz del proyecto)
+ESTADISTICAS_JERARQUIA = Path('data') / 'processed' / 'estadisticas_jerarquia.parquet'
+
+# Valores del QA Excel de Perfil Humano (2do semestre 2025), solo para verificar el cálculo
+VALORES_QA = {
+    'Grande': {
+        'CEO': {'P25': 10997750, 'P50': 19722471, 'P75': 24481583, 'Promedio': 19354448, 'Count': 26},
+        'DIRECTOR': {'P25': 7722433, 'P50': 14483059, 'P75': 10279211, 'Promedio': 8732125, 'Count': 20},
+        'GERENTE': {'P25': 5326035, 'P50': 6178561, 'P75': 7735461, 'Promedio': 6805749, 'Count': 78},
+        'JEFE': {'P25': 2579559, 'P50': 2975854, 'P75': 3541814, 'Promedio': 3266197, 'Count': 150},
+    },
+    'Pyme': {
+        'CEO': {'P25': 6875000, 'P50': 8630000, 'P75': 11784750, 'Promedio': 10011402, 'Count': 42},
+        'DIRECTOR': {'P25': 4863064, 'P50': 6205083, 'P75': 8687500, 'Promedio': 7063376, 'Count': 22},
+        'GERENTE': {'P25': 3516579, 'P50': 4574314, 'P75': 5288936, 'Promedio': 4562918, 'Count': 98},
+        'JEFE': {'P25': 1924663, 'P50': 2337282, 'P75': 2750342, 'Promedio': 2355676, 'Count': 234},
+    },
+}
+
+
+# Celdas del QA que el cálculo no reproduce, con su causa. Son errores de la planilla del
+# QA: la tabla calculada sigue el método del QA sin repetirlos.
+_DIRECTOR_IT = 'director_it tiene una sola respuesta en Grandes y el QA la promedia como 0 en P25, P75 y Promedio'
+_RANGO_P75 = 'el P75 Pyme del QA toma las filas 21:70 en vez de 20:69 y deja afuera la primera Pyme'
+_OPS_HOTEL = 'gerente_ops_hotel tiene una sola respuesta en Pymes y el QA la promedia como 0 en P25, P75 y Promedio'
+_IMPUESTOS = 'jefe_impuestos no tiene respuestas en Pymes y el QA la promedia como 0'
+_SOPORTE = 'jefe_soporte tiene una sola respuesta en Pymes y el QA la promedia como 0 en P25, P75 y Promedio'
+_CANTIDAD = 'el QA no informa cómo cuenta; ninguna cantidad de respuestas por segmento da este valor'
+DIFERENCIAS_QA = {
+    ('Grande', 'CEO', 'Count'): 'el QA suma las respuestas de CEO de los dos segmentos (7 + 19)',
+    ('Grande', 'DIRECTOR', 'P25'): _DIRECTOR_IT,
+    ('Grande', 'DIRECTOR', 'P75'): _DIRECTOR_IT + '; además promedia el P25 de jefe_ingenieria (celda CI78)',
+    ('Grande', 'DIRECTOR', 'Promedio'): _DIRECTOR_IT + '; además promedia el P50 de jefe_ingenieria (celda CI79)',
+    ('Grande', 'DIRECTOR', 'Count'): _CANTIDAD,
+    ('Grande', 'JEFE', 'Count'): _CANTIDAD,
+    ('Pyme', 'CEO', 'P75'): _RANGO_P75,
+    ('Pyme', 'CEO', 'Count'): 'el QA suma las respuestas de CEO de los dos segmentos de su planilla (12 + 30)',
+    ('Pyme', 'DIRECTOR', 'Count'): _CANTIDAD,
+    ('Pyme', 'GERENTE', 'P25'): _OPS_HOTEL,
+    ('Pyme', 'GERENTE', 'P75'): _OPS_HOTEL + '; ' + _RANGO_P75,
+    ('Pyme', 'GERENTE', 'Promedio'): _OPS_HOTEL,
+    ('Pyme', 'JEFE', 'P25'): _IMPUESTOS + '; ' + _SOPORTE,
+    ('Pyme', 'JEFE', 'P50'): _IMPUESTOS,
+    ('Pyme', 'JEFE', 'P75'): _IMPUESTOS + '; ' + _SOPORTE + '; ' + _RANGO_P75,
+    ('Pyme', 'JEFE', 'Promedio'): _IMPUESTOS + '; ' + _SOPORTE,
+    ('Pyme', 'JEFE', 'Count'): _CANTIDAD,
+}
+
+def nivel_por_cargo(columnas):
+    """
+    Dict columna de salario -> nivel jerárquico (según los cargos de NIVELES_JERARQUIA)
+
+    Los cargos que no corresponden a ningún nivel (analistas, técnicos, etc.) no figuran.
+    """
+    niveles = {f'salario_{cargo}': nivel for nivel, cargos in NIVELES_JERARQUIA.items() for cargo in cargos}
+    return {col: niveles[col] for col in columnas if col in niveles}
+
+
+def construir_tabla_jerarquia(df):
+    """
+    Estadísticas de cada nivel jerárquico por tamaño de empresa
+
+    Como en el QA Excel, cada estadístico del nivel es el promedio del mismo estadístico
+    de sus cargos (los que tienen respuestas en el segmento); Min y Max son los extremos
+    de esos cargos y Count suma sus respuestas. Los cargos de todos los segmentos se
+    apilan como columnas de una sola matriz y se calculan en una pasada con
+    estadisticas_matriz (un solo sort).
+
+    Returns:
+        DataFrame con una fila por nivel y segmento (Grande, Pyme, General): nivel,
+        segmento, cargos (con respuestas), P25, P50, P75, Promedio, Desv_Std, Min, Max, Count
+    """
+    columnas = [col for col in df.columns if col.startswith('salario_')]
+    niveles = nivel_por_cargo(columnas)
+    columnas = list(niveles)
+    grupos = {nivel: [j for j, col in enumerate(columnas) if niveles[col] == nivel] for nivel in NIVELES_JERARQUIA}
+    grupos = {nivel: indices for nivel, indices in grupos.items() if indices}
+    matriz = matriz_salarios(df, columnas)
+
+    segmentos = []
+    if 'categoria_tamano' in df.columns:
+        segmentos = [(seg, (df['categoria_tamano'] == seg).to_numpy()) for seg in SEGMENTOS_TAMANO]
+    segmentos.append(('General', np.ones(len(df), dtype=bool)))
+
+    bloques = [matriz[filas] for _, filas in segmentos]
+    largo = max(max(bloque.shape[0] for bloque in bloques), 1)
+    apilada = np.hstack([np.vstack([bloque, np.full((largo - bloque.shape[0], bloque.shape[1]), np.nan)])
+                         for bloque in bloques])
+    por_cargo = {nombre: valores.reshape(len(segmentos), len(columnas))
+                 for nombre, valores in estadisticas_matriz(apilada).items()}
+
+    filas = []
+    for s, (segmento, _) in enumerate(segmentos):
+        for nivel, indices in grupos.items():
+            count = por_cargo['Count'][s, indices]
+            con_datos = [j for j, n in zip(indices, count) if n > 0]
+            fila = {'nivel': nivel, 'segmento': segmento, 'cargos': len(con_datos)}
+            for nombre in ['P25', 'P50', 'P75', 'Promedio', 'Desv_Std']:
+                valores = por_cargo[nombre][s, con_datos]
+                valores = valores[~np.isnan(valores)]
+                fila[nombre] = valores.mean() if len(valores) else np.nan
+            fila['Min'] = por_cargo['Min'][s, con_datos].min() if con_datos else np.nan
+            fila['Max'] = por_cargo['Max'][s, con_datos].max() if con_datos else np.nan
+            fila['Count'] = count.sum()
+            filas.append(fila)
+
+    tabla = pd.DataFrame(filas)
+    tabla['Count'] = tabla['Count'].astype('int32')
+    return tabla
+
+
+def vista_por_segmento(tabla, segmento):
+    """{nivel: {P25, P50, P75, Promedio, Desv_Std, Min, Max, Count}} de un segmento (solo niveles con datos)"""
+    filas = tabla[(tabla['segmento'] == segmento) & (tabla['Count'] > 0)]
+    return {fila['nivel']: {col: fila[col] for col in COLUMNAS_ESTADISTICAS} for _, fila in filas.iterrows()}
+
+
+def verificar_contra_qa(tabla, tolerancia_pct=1.0):
+    """
+    Compara la tabla calculada con los valores del QA Excel
+
+    Args:
+        tabla: resultado de construir_tabla_jerarquia
+        tolerancia_pct: diferencia relativa máxima (%) para considerar que coinciden
+
+    Returns:
+        DataFrame con una fila por segmento × nivel × estadístico: qa, calculado,
+        diferencia_pct, coincide, causa (la de DIFERENCIAS_QA, '' si no hay)
+    """
+    calculada = tabla.set_index(['segmento', 'nivel'])
+    filas = []
+    for segmento, niveles in VALORES_QA.items():
+        for nivel, valores in niveles.items():
+            for estadistico, qa in valores.items():
+                calculado = calculada[estadistico].get((segmento, nivel), np.nan)
+                diferencia = (calculado / qa - 1) * 100
+                filas.append({'segmento': segmento, 'nivel': nivel, 'estadistico': estadistico, 'qa': qa,
+                              'calculado': calculado, 'diferencia_pct': diferencia,
+                              'coincide': bool(abs(diferencia) <= tolerancia_pct),
+                              'causa': DIFERENCIAS_QA.get((segmento, nivel, estadistico), '')})
+    return pd.DataFrame(filas)
+
+
+def estadisticas_jerarquia_en_cache(base_path, df=None, usar_cache=True):
+    """
+    Tabla por jerarquía, reutilizada mientras el dataset y el código no cambien
+
+    Args:
+        base_path: raíz del proyecto
+        df: dataset normalizado ya cargado (None = leerlo solo si hay que calcular)
+        usar_cache: si False, recalcula aunque haya una entrada para la clave
+
+    Returns:
+        DataFrame de construir_tabla_jerarquia
+    """
+    base_path = Path(base_path)
+    output_path = base_path / ESTADISTICAS_JERARQUIA
+    dataset = base_path / PARQUET_NORMALIZADO
+    if not dataset.exists():
+        dataset = base_path / CSV_NORMALIZADO
+    cache = CacheResultados(base_path / 'data' / 'cache' / 'jerarquia')
+    clave = clave_cache([dataset, __file__, estadisticas.__file__, constants.__file__])
+
+    if usar_cache and cache.restaurar(clave, [output_path]):
+        return pd.read_parquet(output_path)
+
+    if df is None:
+        df = cargar_encuesta_normalizada(base_path)
+    tabla = construir_tabla_jerarquia(df)
+    tabla.to_parquet(output_path, compression=COMPRESION_PARQUET, index=False)
+    cache.guardar(clave, [output_path])
+    return tabla
+
+
+def main(argv=None):
+    """Función principal"""
+    parser = argparse.ArgumentParser(description='Calcula las estadísticas salariales por nivel jerárquico')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='recalcular aunque el dataset normalizado y el código no hayan cambiado')
+    parser.add_argument('--verificar-qa', action='store_true',
+                        help='comparar el resultado con los valores del QA Excel')
+    parser.add_argument('--tolerancia', type=float, default=1.0,
+                        help='diferencia máxima en %% para --verificar-qa (por defecto 1)')
+    args = parser.parse_args(argv)
+
+    base_path = Path(__file__).parent.parent.parent
+    tabla = estadisticas_jerarquia_en_cache(base_path, usar_cache=not args.no_cache)
+    print(f"✓ Estadísticas por jerarquía en {ESTADISTICAS_JERARQUIA}\n")
+    print(tabla[['nivel', 'segmento', 'cargos', 'P25', 'P50', 'P75', 'Promedio', 'Count']]
+          .to_string(index=False, float_format=lambda v: f"{v:,.0f}"))
+
+    if args.verificar_qa:
+        verificacion = verificar_contra_qa(tabla, args.tolerancia)
+        diferencias = verificacion[~verificacion['coincide']]
+        print(f"\nVerificación contra QA (tolerancia {args.tolerancia}%): "
+              f"{len(verificacion) - len(diferencias)}/{len(verificacion)} valores coinciden")
+        for _, fila in diferencias.iterrows():
+            print(f"  {fila['segmento']} {fila['nivel']} {fila['estadistico']}: QA {fila['qa']:,.0f}, "
+                  f"calculado {fila['calculado']:,.0f} ({fila['diferencia_pct']:+.1f}%) -> "
+                  f"{fila['causa'] or 'sin causa conocida'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+"""
+Reportes de benchmarking por empresa
+Compara los salarios que informó cada empresa con el mercado (P25/P50/P75) y
+genera un reporte HTML y/o XLSX por empresa, repartiendo el trabajo en un pool de procesos
+"""
+
+import pandas as pd
+import numpy as np
+import sys
+import os
+import html
+import time
+import shutil
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+# Agregar el directorio raíz al path para importar src.utils
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.analytics.estadisticas import EstadisticasSalariales
+from src.analytics.cubo import area_por_cargo, SIN_AREA
+from src.utils.datos import cargar_encuesta_normalizada
+
+# Directorio de salida (relativo a la raíz del proyecto)
+REPORTES_DIR = Path('data') / 'processed' / 'reportes'
+
+# Confidencialidad: con menos respuestas no se muestran estadísticas de mercado
+MIN_RESPUESTAS = 3
+
+POSICIONES = ['Por debajo de P25', 'Entre P25 y P50', 'Entre P50 y P75', 'Por encima de P75']
+SIN_DATOS = 'Sin datos suficientes'
+
+# Columnas de cada tabla del reporte: nombre interno -> encabezado
+COLUMNAS_REPORTE = {
+    'nombre': 'Cargo',
+    'area': 'Área',
+    'salario': 'Su salario',
+    'P25': 'P25',
+    'P50': 'P50',
+    'P75': 'P75',
+    'rango_percentil': 'Percentil',
+    'posicion': 'Posición',
+    'dif_p50_pct': 'Dif. vs P50 (%)',
+    'Count': 'Respuestas',
+}
+
+
+def format_currency(value):
+    """Formatea valores monetarios"""
+    if pd.isna(value):
+        return "—"
+    return f"${value:,.0f}".replace(",", ".")
+
+
+def comparar_empresas(df, stats):
+    """
+    Posición de cada salario informado frente al mercado, para todas las empresas a la vez
+
+    Cada salario (> 0) se compara con el mercado general y con el segmento de tamaño
+    de la empresa (Grande/Pyme).
+
+    Args:
+        df: dataset normalizado
+        stats: EstadisticasSalariales con calcular_todos_los_cargos() ya ejecutado
+
+    Returns:
+        DataFrame ordenado con una fila por empresa × cargo × mercado ('General' o el
+        segmento): empresa, cargo, nombre, area, mercado, salario, P25, P50, P75,
+        Count, rango_percentil, posicion, dif_p50_pct
+    """
+    cargos = list(stats.stats_por_cargo)
+    salarios = df[cargos].apply(pd.to_numeric, errors='coerce')
+    salarios.index.name = 'empresa'
+    informados = salarios.stack().rename('salario').reset_index().rename(columns={'level_1': 'cargo'})
+    informados = informados[informados['salario'] > 0]
+
+    tamano = df['categoria_tamano'] if 'categoria_tamano' in df.columns else pd.Series(index=df.index)
+    general = informados.assign(mercado='General')
+    por_segmento = informados.assign(mercado=informados['empresa'].map(tamano).astype(object))
+    por_segmento = por_segmento[por_segmento['mercado'].isin(stats.tabla_cargos['segmento'].unique())]
+    tabla = pd.concat([general, por_segmento], ignore_index=True)
+
+    # Percentil de cada salario: una búsqueda vectorizada por mercado
+    tabla['rango_percentil'] = np.nan
+    for mercado, filas in tabla.groupby('mercado').groups.items():
+        pares = tabla.loc[filas]
+        rangos = stats.rangos_percentil(pd.Series(pares['salario'].to_numpy(), index=pares['cargo']), mercado)
+        tabla.loc[filas, 'rango_percentil'] = rangos.to_numpy()
+
+    mercado = stats.tabla_cargos.rename(columns={'segmento': 'mercado'})
+    tabla = tabla.merge(mercado[['cargo', 'nombre', 'mercado', 'P25', 'P50', 'P75', 'Count']],
+                        on=['cargo', 'mercado'], how='left')
+    tabla['Count'] = tabla['Count'].fillna(0).astype(int)
+
+    tabla['posicion'] = np.select(
+        [tabla['salario'] < tabla['P25'], tabla['salario'] < tabla['P50'], tabla['salario'] <= tabla['P75']],
+        POSICIONES[:3], default=POSICIONES[3])
+    tabla['dif_p50_pct'] = (tabla['salario'] / tabla['P50'] - 1) * 100
+
+    # Confidencialidad: sin estadísticas de mercado si hay pocas respuestas
+    pocas = tabla['Count'] < MIN_RESPUESTAS
+    tabla.loc[pocas, ['P25', 'P50', 'P75', 'rango_percentil', 'dif_p50_pct']] = np.nan
+    tabla.loc[pocas, 'posicion'] = SIN_DATOS
+
+    areas = area_por_cargo()
+    tabla['area'] = tabla['cargo'].map(areas).fillna(SIN_AREA)
+    return tabla.sort_values(['empresa', 'mercado', 'area', 'nombre'], ignore_index=True)
+
+
+def _tabla_para_mostrar(filas):
+    """Tabla del reporte con los encabezados y formatos para el lector"""
+    tabla = filas[list(COLUMNAS_REPORTE)].copy()
+    for col in ['salario', 'P25', 'P50', 'P75']:
+        tabla[col] = tabla[col].map(format_currency)
+    tabla['rango_percentil'] = tabla['rango_percentil'].map(lambda r: '—' if pd.isna(r) else f"{r * 100:.0f}")
+    tabla['dif_p50_pct'] = tabla['dif_p50_pct'].map(lambda d: '—' if pd.isna(d) else f"{d:+.1f}%")
+    return tabla.rename(columns=COLUMNAS_REPORTE)
+
+
+def _secciones(empresa):
+    """[(título, filas)] de un reporte: mercado general y el segmento de la empresa"""
+    secciones = []
+    for mercado, filas in empresa['filas'].groupby('mercado', sort=False):
+        titulo = 'Mercado general' if mercado == 'General' else f'Empresas {mercado}'
+        secciones.append((titulo, filas))
+    return sorted(secciones, key=lambda s: s[0] != 'Mercado general')
+
+
+def _reporte_html(empresa, path):
+    """Escribe el reporte HTML de una empresa"""
+    partes = [f"<h1>Benchmarking salarial - {html.escape(empresa['titulo'])}</h1>",
+              f"<p>{html.escape(empresa['descripcion'])}</p>"]
+    for titulo, filas in _secciones(empresa):
+        resumen = filas['posicion'].value_counts().reindex(POSICIONES, fill_value=0)
+        partes.append(f"<h2>{html.escape(titulo)}</h2>")
+        partes.append("<p>" + " · ".join(f"{html.escape(pos)}: {n}" for pos, n in resumen.items()) + "</p>")
+        partes.append(_tabla_para_mostrar(filas).to_html(index=False, border=0, classes='reporte'))
+
+    estilo = ("body{font-family:sans-serif;margin:2rem;color:#3D5A6C}h1{color:#2E5090}"
+              "table.reporte{border-collapse:collapse;margin-bottom:2rem}"
+              "table.reporte th{background:#2E5090;color:#fff;padding:.4rem .6rem}"
+              "table.reporte td{border-bottom:1px solid #ddd;padding:.3rem .6rem;text-align:right}"
+              "table.reporte td:first-child,table.reporte td:nth-child(2){text-align:left}")
+    documento = (f"<!DOCTYPE html><html lang='es'><head><meta charset='utf-8'>"
+                 f"<title>{html.escape(empresa['titulo'])}</title><style>{estilo}</style></head>"
+                 f"<body>{''.join(partes)}"
+                 f"<p><small>Percentil: posición del salario en el mercado (0 a 100, como PERCENTRANK.INC). "
+                 f"Sin estadísticas para cargos con menos de {MIN_RESPUESTAS} respuestas.</small></p>"
+                 f"</body></html>")
+    Path(path).write_text(documento, encoding='utf-8')
+
+
+def _reporte_xlsx(empresa, path):
+    """Escribe el reporte XLSX de una empresa (una hoja por mercado)"""
+    with pd.ExcelWriter(path, engine='openpyxl') as writer:
+        for titulo, filas in _secciones(empresa):
+            tabla = filas[list(COLUMNAS_REPORTE)].rename(columns=COLUMNAS_REPORTE)
+            tabla.to_excel(writer, sheet_name=titulo[:31], index=False)
+
+
+def _generar_reporte(empresa, output_dir, formatos):
+    """
+    Genera los archivos de una empresa (se ejecuta en un proceso del pool)
+
+    Returns:
+        lista de archivos generados
+    """
+    archivos = []
+    for formato in formatos:
+        path = Path(output_dir) / f"{empresa['archivo']}.{formato}"
+        (_reporte_html if formato == 'html' else _reporte_xlsx)(empresa, path)
+        archivos.append(path)
+    return archivos
+
+
+def generar_reportes(df, output_dir, formatos=('html', 'xlsx'), max_workers=None, empresas=None):
+    """
+    Genera un reporte de benchmarking por empresa
+
+    Las posiciones de todas las empresas se calculan juntas (vectorizado) y la
+    escritura de los archivos se reparte en un pool de procesos.
+
+    Args:
+        df: dataset normalizado (una fila por empresa)
+        output_dir: directorio de salida (se regenera completo)
+        formatos: 'html' y/o 'xlsx'
+        max_workers: cantidad de procesos (None = cantidad de CPUs)
+        empresas: índices de las empresas a reportar (None = todas)
+
+    Returns:
+        lista de archivos generados
+    """
+    output_dir = Path(output_dir)
+    stats = EstadisticasSalariales(df)
+    stats.calcular_todos_los_cargos()
+    comparacion = comparar_empresas(df, stats)
+    if empresas is not None:
+        comparacion = comparacion[comparacion['empresa'].isin(empresas)]
+
+    trabajos = []
+    for idx, filas in comparacion.groupby('empresa', sort=True):
+        fila = df.loc[idx]
+        respuesta = fila.get('timestamp')
+        descripcion = ", ".join(str(v) for v in [fila.get('rubro_corto'), fila.get('categoria_tamano')]
+                                if pd.notna(v))
+        if pd.notna(respuesta):
+            descripcion += f" (respuesta del {pd.Timestamp(respuesta):%d/%m/%Y})"
+        trabajos.append({
+            'archivo': f"empresa_{idx + 1:03d}",
+            'titulo': f"Empresa {idx + 1}",
+            'descripcion': descripcion,
+            'filas': filas,
+        })
+
+    if output_dir.exists():
+        shutil.rmtree(output_dir)
+    output_dir.mkdir(parents=True)
+
+    print(f"Generando {len(trabajos)} reportes ({', '.join(formatos)})...")
+    max_workers = min(max_workers or os.cpu_count() or 1, max(len(trabajos), 1))
+    chunksize = max(1, len(trabajos) // (max_workers * 4))
+    archivos = []
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        for generados in pool.map(_generar_reporte, trabajos, [output_dir] * len(trabajos),
+                                  [formatos] * len(trabajos), chunksize=chunksize):
+            archivos.extend(generados)
+    return archivos
+
+
+def main(argv=None):
+    """Función principal"""
+    parser = argparse.ArgumentParser(description='Genera un reporte de benchmarking salarial por empresa')
+    parser.add_argument('--formato', choices=['html', 'xlsx', 'ambos'], default='ambos',
+                        help='formato de los reportes (por defecto, HTML y XLSX)')
+    parser.add_argument('--empresa', type=int, action='append', default=None,
+                        help='número de empresa a reportar (se puede repetir; por defecto, todas)')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='procesos del pool (por defecto, cantidad de CPUs)')
+    args = parser.parse_args(argv)
+
+    base_path = Path(__file__).parent.parent.parent
+    output_dir = base_path / REPORTES_DIR
+    formatos = ('html', 'xlsx') if args.formato == 'ambos' else (args.formato,)
+    empresas = None if args.empresa is None else [n - 1 for n in args.empresa]
+
+    print("Cargando datos normalizados...")
+    df = cargar_encuesta_normalizada(base_path)
+    print(f"✓ Datos cargados: {len(df)} empresas")
+
+    inicio = time.perf_counter()
+    archivos = generar_reportes(df, output_dir, formatos=formatos, max_workers=args.workers, empresas=empresas)
+    print(f"✓ {len(archivos)} archivos generados en {time.perf_counter() - inicio:.1f}s")
+    print(f"\n✅ Reportes guardados en {output_dir}")
+
+
+if __name__ == "__main__":
+    main()
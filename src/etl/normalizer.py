@@ -7,353 +7,558 @@ import pandas as pd
 import numpy as np
 import re
 import json
+import hashlib
+import argparse
+import contextlib
+import io
+import os
+import shutil
+import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+# Agregar el directorio raíz al path para importar src.utils
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+import src.utils.datos as datos
+import src.analytics.beneficios as beneficios
+from src.utils.datos import (guardar_parquet, esquema_arrow, clasificar_columnas, tabla_arrow,
+                             reemplazar_filas, parsear_timestamp, compactar_tipos, memoria_por_tipo,
+                             COMPRESION_PARQUET, RESUMENES_CUANTILES)
+from src.utils.cache import CacheResultados, clave_cache, hash_archivo
+from src.utils.metricas import RegistroEtapas, etapa_medida
+from src.utils.cuantiles import tabla_resumenes
+from src.analytics.estadisticas import EstadisticasSalariales
+from src.analytics.beneficios import empaquetar_beneficios, guardar_npz, MATRIZ_BENEFICIOS
+
+
+# Números "limpios" (ya sin separadores de miles) que float() acepta sin sorpresas
+_NUMERO_SIMPLE = r'[+-]?(?:\d+(?:\.\d*)?|\.\d+)(?:[eE][+-]?\d+)?'
+
+
+def _convert_salary(val):
+    """Convierte un valor de salario individual (lógica de referencia celda por celda)"""
+    if pd.isna(val):
+        return np.nan
+    if isinstance(val, (int, float)):
+        return float(val)
+    # Si es string, quitar puntos (separador de miles) y convertir
+    val_str = str(val).strip()
+    # Quitar puntos que son separadores de miles
+    val_str = val_str.replace('.', '')
+    # Reemplazar coma por punto si existe (separador decimal)
+    val_str = val_str.replace(',', '.')
+    return _float_or_nan(val_str)
+
+
+def _float_or_nan(val_str):
+    """float() de un string ya limpio, NaN si no es convertible"""
+    try:
+        return float(val_str)
+    except (ValueError, TypeError):
+        return np.nan
+
+
+def parse_salary_block(block):
+    """
+    Convierte todo el bloque de columnas salario_* a float de una sola vez
+
+    Maneja formato argentino (punto como separador de miles, coma decimal) y
+    da exactamente el mismo resultado que _convert_salary aplicado celda por celda.
+
+    Args:
+        block: DataFrame con las columnas de salario (strings u otros tipos)
+
+    Returns:
+        tuple (DataFrame float64 con mismo índice y columnas, cantidad de celdas
+        no vacías que no se pudieron convertir y quedaron como NaN)
+    """
+    result = pd.DataFrame(np.nan, index=block.index, columns=block.columns, dtype=float)
+    text_cols = []
+
+    for col in block.columns:
+        kind = pd.api.types.infer_dtype(block[col], skipna=True)
+        if kind in ('string', 'empty'):
+            text_cols.append(col)
+        elif kind in ('integer', 'floating', 'mixed-integer-float', 'boolean'):
+            result[col] = block[col].astype(float)
+        else:
+            # Tipos mezclados: caso raro, usar la lógica de referencia
+            result[col] = block[col].map(_convert_salary).astype(float)
+
+    other_cols = [col for col in block.columns if col not in text_cols]
+    coerced = int((result[other_cols].isna() & block[other_cols].notna()).to_numpy().sum())
+
+    if text_cols:
+        # Apilar todas las columnas de texto en una sola Serie (column-major)
+        values = pd.Series(block[text_cols].to_numpy(dtype=object).ravel(order='F'), dtype=object)
+        parsed = np.full(len(values), np.nan)
+
+        present = values.notna().to_numpy()
+        cleaned = (values[present].str.strip()
+                                  .str.replace('.', '', regex=False)
+                                  .str.replace(',', '.', regex=False))
+
+        simple = cleaned.str.fullmatch(_NUMERO_SIMPLE).to_numpy(dtype=bool)
+        present_idx = np.flatnonzero(present)
+        parsed[present_idx[simple]] = cleaned[simple].to_numpy(dtype=object).astype(float)
+
+        # Lo que no es un número simple (vacíos, "inf", texto) pasa por float() como antes
+        rest = ~simple
+        if rest.any():
+            parsed[present_idx[rest]] = [_float_or_nan(v) for v in cleaned[rest]]
+
+        blank = (cleaned == '').to_numpy()
+        coerced += int((np.isnan(parsed[present_idx]) & ~blank).sum())
+
+        result[text_cols] = parsed.reshape((len(block), len(text_cols)), order='F')
+
+    return result, coerced
+
+
+# Reglas de mapeo de columnas largas a nombres cortos.
+# Cada regla: (nombre_corto, [substrings], {opciones}). El ORDEN de la tabla es la
+# prioridad: si un header matchea varias reglas gana la que aparece primero.
+# nombre_corto None = columna que se descarta a propósito.
+# Opciones: 'exacto' (header.strip() igual al patrón), 'ignorar_mayusculas',
+# 'excluir' (la regla no aplica si el header contiene alguno de estos textos).
+COLUMN_RULES = [
+    # Básicas
+    ('timestamp', ['Marca temporal']),
+    ('puntuacion', ['Puntuación']),
+    ('rubro', ['RUBRO']),
+    # IMPORTANTE: Columna "Tamaño" con clasificación directa Grande/Pyme
+    ('tamano', ['Tamaño'], {'exacto': True}),
+    # Columna "Clasificación por TAMAÑO (Dotación)" - NO MAPEAR (ya tenemos la columna "Tamaño")
+    (None, ['Clasificación por TAMAÑO']),
+
+    # Proyecciones y empleo
+    ('aumento_salarial_2025_pct', ['AUMENTO SALARIAL estima dar la empresa en TODO el año 2025']),
+    ('cantidad_aumentos_2025', ['Cuantos aumentos salariales']),
+    ('aumento_acumulado_2025', ['AUMENTO salarial ACUMULADO de Enero a Agosto 2025']),
+    ('indicador_aumentos', ['indicador con el cual prevé dar los aumentos']),
+    ('otro_indicador', ['otro indicador'], {'ignorar_mayusculas': True}),
+    ('prevision_incorporacion', ['incorporar nuevos puestos']),
+    ('prevision_reduccion', ['reducir puestos']),
+    ('rotacion_2025_pct', ['Rotación']),
+
+    # Salarios por cargo
+    # IMPORTANTE: Asistente GG debe evaluarse ANTES que CEO/Gerente General
+    ('salario_asistente_gg', ['ASISTENTE DE GERENTE GENERAL']),
+    ('salario_ceo', ['CEO / GERENTE GENERAL', 'GERENTE GENERAL']),
+    ('salario_director_comercial', ['DIRECTOR COMERCIAL']),
+    ('salario_gerente_ventas', ['GERENTE DE VENTAS']),
+    ('salario_jefe_ventas', ['JEFE DE VENTAS']),
+    ('salario_ejecutivo_ventas', ['EJECUTIVO DE VENTAS']),
+    ('salario_analista_ecommerce', ['ANALISTA E-COMMERCE']),
+    ('salario_analista_facturacion', ['ANALISTA DE FACTURACION']),
+    ('salario_gerente_marketing', ['GERENTE DE MARKETING']),
+    ('salario_jefe_marketing', ['JEFE DE MARKETING']),
+    ('salario_analista_marketing', ['ANALISTA DE MARKETING']),
+    ('salario_gerente_comex', ['GERENTE DE COMERCIO EXTERIOR']),
+    ('salario_responsable_comex', ['RESPONSABLE DE COMERCIO EXTERIOR']),
+    ('salario_asistente_comex', ['ASISTENTE DE COMERCIO EXTERIOR']),
+    ('salario_atencion_cliente', ['ATENCION AL CLIENTE']),
+    ('salario_jefe_hospitalidad', ['JEFE DE HOSPITALIDAD Y TURISMO']),
+    ('salario_guia_turismo', ['GUIA DE TURISMO']),
+    ('salario_jefe_alimentos_bebidas', ['JEFE DE ALIMENTOS & BEBIDAS']),
+    ('salario_chef_ejecutivo', ['CHEF EJECUTIVO']),
+    ('salario_jefe_salon', ['JEFE DE SALON', 'Maître']),
+    ('salario_gerente_ops_hotel', ['GERENTE DE OPERACIONES (HOTEL)']),
+    ('salario_jefe_recepcion_hotel', ['JEFE DE RECEPCION (HOTEL)']),
+    ('salario_recepcionista_hotel', ['RECEPCIONISTA (HOTEL)']),
+    ('salario_concierge', ['CONCIERGE (HOTEL)']),
+    ('salario_director_admin_finanzas', ['DIRECTOR DE ADMIN. & FINANZAS']),
+    ('salario_gerente_admin_conta', ['GERENTE DE ADMIN, CONTABILIDAD & IMPUESTOS']),
+    ('salario_jefe_admin_conta', ['JEFE DE ADMINISTRACION & CONTABILIDAD']),
+    ('salario_analista_contabilidad', ['ANALISTA DE CONTABILIDAD']),
+    ('salario_jefe_impuestos', ['JEFE DE IMPUESTOS']),
+    ('salario_analista_impuestos', ['ANALISTA DE IMPUESTOS']),
+    ('salario_jefe_finanzas', ['JEFE DE FINANZAS']),
+    ('salario_analista_cuentas_pagar', ['ANALISTA DE CUENTAS POR PAGAR']),
+    ('salario_empleado_administrativo', ['EMPLEADO ADMINISTRATIVO', 'DATA ENTRY']),
+    ('salario_jefe_creditos_cobranzas', ['JEFE DE CREDITOS Y COBRANZAS']),
+    ('salario_analista_cobranzas', ['ANALISTA DE COBRANZAS']),
+    ('salario_jefe_control_gestion', ['JEFE DE CONTROL DE GESTION']),
+    ('salario_analista_control_gestion', ['ANALISTA DE CONTROL DE GESTION']),
+    ('salario_auditor_interno', ['AUDITOR INTERNO']),
+    ('salario_recepcionista', ['RECEPCIONISTA:'], {'excluir': ['HOTEL']}),
+    ('salario_director_operaciones', ['DIRECTOR DE OPERACIONES'], {'excluir': ['HOTEL']}),
+    ('salario_gerente_planta', ['GERENTE DE PLANTA', 'OPERACIONES:']),
+    ('salario_jefe_produccion', ['JEFE DE PRODUCCION']),
+    ('salario_ingeniero_procesos', ['INGENIERO DE PROCESOS', 'MEJORA CONTINUA']),
+    ('salario_supervisor_produccion', ['SUPERVISOR DE PRODUCCION']),
+    ('salario_analista_produccion', ['ANALISTA DE PRODUCCION']),
+    ('salario_gerente_enologia', ['GERENTE DE ENOLOGIA', '1er Enologo']),
+    ('salario_jefe_bodega', ['JEFE DE BODEGA', '2ndo Enologo']),
+    ('salario_supervisor_bodega', ['SUPERVISOR DE BODEGA']),
+    ('salario_gerente_agricola', ['GERENTE AGRICOLA']),
+    ('salario_ingeniero_agronomo', ['INGENIERO AGRONOMO']),
+    ('salario_supervisor_fincas', ['SUPERVISOR DE FINCAS']),
+    ('salario_jefe_laboratorio', ['JEFE DE LABORATORIO']),
+    ('salario_analista_laboratorio', ['ANALISTA DE LABORATORIO']),
+    ('salario_gerente_supply_chain', ['GERENTE DE SUPPLY CHAIN']),
+    ('salario_jefe_planificacion', ['JEFE DE PLANIFICACION']),
+    ('salario_jefe_logistica', ['JEFE DE LOGISTICA']),
+    ('salario_analista_logistica', ['ANALISTA DE LOGISTICA']),
+    ('salario_supervisor_depositos', ['SUPERVISOR DE DEPOSITOS']),
+    ('salario_gerente_compras', ['GERENTE DE ABASTECIMIENTO Y COMPRAS']),
+    ('salario_jefe_compras', ['JEFE DE COMPRAS']),
+    ('salario_comprador_analista', ['COMPRADOR', 'ANALISTA DE COMPRAS']),
+    ('salario_gerente_mantenimiento', ['GERENTE DE MANTENIMIENTO']),
+    ('salario_jefe_mantenimiento', ['JEFE DE MANTENIMIENTO']),
+    ('salario_supervisor_mantenimiento', ['SUPERVISOR DE MANTENIMIENTO']),
+    ('salario_tecnico_mantenimiento', ['TECNICO DE MANTENIMIENTO']),
+    ('salario_gerente_calidad', ['GERENTE DE ASEGURAMIENTO DE LA CALIDAD']),
+    ('salario_jefe_calidad', ['JEFE DE CALIDAD']),
+    ('salario_analista_calidad', ['ANALISTA DE CALIDAD']),
+    ('salario_tecnico_calidad', ['TECNICO DE CALIDAD']),
+    ('salario_diseñador_grafico', ['DISEÑADOR GRAFICO', 'PRODUCTO:']),
+    ('salario_responsable_sustentabilidad', ['SUSTENTABILIDAD', 'MEDIOAMBIENTE']),
+    ('salario_gerente_seguridad', ['GERENTE DE SEGURIDAD & HIGIENE']),
+    ('salario_jefe_seguridad', ['JEFE DE SEGURIDAD & HIGIENE']),
+    ('salario_tecnico_seguridad', ['TECNICO DE SEGURIDAD & HIGIENE']),
+    ('salario_jefe_ingenieria', ['JEFE DE INGENIERIA Y PROYECTOS']),
+    ('salario_ingeniero_proyectos', ['INGENIERO DE PROYECTOS', 'PROJECT MANAGER']),
+    ('salario_asistente_proyecto', ['ASISTENTE DE PROYECTO', 'PROYECTISTA']),
+    ('salario_jefe_obra', ['JEFE DE OBRA']),
+    ('salario_supervisor_obra', ['SUPERVISOR DE OBRA']),
+    ('salario_director_rrhh', ['DIRECTOR DE RECURSOS HUMANOS']),
+    ('salario_gerente_rrhh', ['GERENTE DE RECURSOS HUMANOS']),
+    ('salario_jefe_rrhh', ['JEFE DE RECURSOS HUMANOS', 'HRBP']),
+    ('salario_responsable_liquidacion', ['RESPONSABLE DE LIQUIDACION']),
+    ('salario_analista_admin_personal', ['ANALISTA DE ADMINISTRACION DE PERSONAL']),
+    ('salario_jefe_seleccion', ['JEFE DE SELECCION']),
+    ('salario_analista_seleccion', ['ANALISTA DE SELECCION']),
+    ('salario_analista_capacitacion', ['ANALISTA DE CAPACITACION Y DESARROLLO']),
+    ('salario_director_it', ['DIRECTOR DE SISTEMAS & IT']),
+    ('salario_gerente_it', ['GERENTE DE SISTEMAS & IT']),
+    ('salario_jefe_desarrollo', ['JEFE DE DESARROLLO DE SISTEMAS']),
+    ('salario_programador', ['PROGRAMADOR', 'DESARROLLADOR DE SISTEMAS']),
+    ('salario_analista_funcional', ['ANALISTA FUNCIONAL']),
+    ('salario_jefe_redes', ['JEFE DE REDES E INFRAESTRUCTURA']),
+    ('salario_tecnico_redes', ['TECNICO DE REDES E INFRAESTRUCTURA']),
+    ('salario_jefe_soporte', ['JEFE DE SOPORTE TECNICO']),
+    ('salario_analista_helpdesk', ['ANALISTA HELP DESK']),
+    ('salario_joven_profesional', ['JOVEN PROFESIONAL']),
+    ('salario_pasante', ['PASANTE']),
+
+    # Bonificaciones
+    ('bonus_gerente_general', ['Bonus GERENTE GENERAL']),
+    ('bonus_directores', ['Bonus DIRECTORES']),
+    ('bonus_gerentes', ['Bonus GERENTES']),
+    ('bonus_jefes', ['Bonus JEFES']),
+    ('bonus_supervisores', ['Bonus SUPERVISORES']),
+    ('bonus_analistas', ['Bonus ANALISTAS']),
+
+    # Beneficios - Medicina
+    ('benef_medicina_prepaga', ['Medicina Prepaga']),
+    ('benef_reintegro_medicamentos', ['reintegro en compra de medicamentos']),
+    ('benef_prestamos', ['Prestamos al personal']),
+    ('benef_almuerzo', ['Almuerzo pago', 'Viandas']),
+    ('benef_gimnasio', ['Gimnasio', 'Yoga', 'Mindfulness']),
+    ('benef_gift_card', ['Gift card', 'Vales de compras']),
+    ('benef_red_descuentos', ['Red de Descuentos']),
+    ('benef_descuento_productos', ['Descuento en productos de la empresa']),
+    ('benef_combustible', ['Combustible / Transporte']),
+    ('benef_cochera', ['Cochera', 'estacionamiento']),
+    ('benef_auto_gerentes', ['Auto compañía para Gerentes']),
+    ('benef_auto_vendedores', ['Auto compañía para Vendedores']),
+    ('benef_gastos_auto', ['Gastos de Mantenimiento y Seguro de Auto']),
+    ('benef_tarjeta_credito', ['Tarjeta de Crédito Corporativa']),
+    ('benef_colegio', ['Pago de Colegio']),
+    ('benef_pension', ['Planes de Pensión', 'Seguros de retiro']),
+    ('benef_pago_dolares', ['Pago del sueldo en dólares']),
+    ('benef_posgrados', ['Pago de Posgrados', 'MBA']),
+    ('benef_coaching', ['Pago de Sesiones de Coaching']),
+    ('benef_idiomas', ['Pago de Clases de Inglés']),
+    ('benef_internet', ['Pago de conectividad', 'Internet']),
+
+    # Beneficios de tiempo
+    ('benef_vacaciones_adicionales', ['Dias adicionales de vacaciones']),
+    ('benef_home_office', ['Home Office']),
+    ('benef_dia_flex', ['Día flex']),
+    ('benef_cumpleanos', ['cumpleaños libre']),
+    ('benef_maternidad', ['Licencia de Maternidad extendida']),
+    ('benef_paternidad', ['Licencia de Paternidad extendida']),
+    ('benef_after_office', ['after office']),
+    ('benef_integracion', ['Actividades de integración dentro del horario']),
+
+    # Comentarios
+    ('comentarios_beneficios', ['beneficio que tengan implementado']),
+    ('sugerencias_puestos', ['NUEVOS PUESTOS']),
+    ('comentarios_generales', ['OTRA INFORMACION']),
+]
+
+# Versión de la tabla de reglas: huella de su contenido, cambia sola al modificar COLUMN_RULES
+COLUMN_RULES_VERSION = hashlib.sha1(repr(COLUMN_RULES).encode('utf-8')).hexdigest()[:12]
+
+
+class ColumnRuleMatcher:
+    """Compila COLUMN_RULES en un único regex multi-patrón (una pasada por header)"""
+
+    _default = None
+
+    def __init__(self, rules=None):
+        self.rules = [self._normalizar_regla(r) for r in (rules or COLUMN_RULES)]
+        self._exactos = {}
+        prioridad_patron = {}
+        prioridad_patron_ci = {}
+
+        for prioridad, (_, patrones, opciones) in enumerate(self.rules):
+            if opciones.get('exacto'):
+                destino = self._exactos
+            elif opciones.get('ignorar_mayusculas'):
+                destino = prioridad_patron_ci
+                patrones = [patron.lower() for patron in patrones]
+            else:
+                destino = prioridad_patron
+            for patron in patrones:
+                destino.setdefault(patron, prioridad)
+
+        # El regex devuelve el patrón más largo que empieza en cada posición; los
+        # patrones que son prefijos de él también matchean ahí
+        self._prioridad_match = self._prioridad_por_prefijo(prioridad_patron)
+        self._prioridad_match_ci = self._prioridad_por_prefijo(prioridad_patron_ci)
+        self._regex = self._compilar(prioridad_patron)
+        self._regex_ci = self._compilar(prioridad_patron_ci)
+        self._cache = {}
+
+    @classmethod
+    def default(cls):
+        """Matcher de COLUMN_RULES compilado una sola vez por proceso"""
+        if cls._default is None:
+            cls._default = cls()
+        return cls._default
+
+    @staticmethod
+    def _prioridad_por_prefijo(prioridad_patron):
+        """Para cada patrón, la mejor prioridad entre él y sus prefijos que también son patrones"""
+        return {
+            patron: min(p for otro, p in prioridad_patron.items() if patron.startswith(otro))
+            for patron in prioridad_patron
+        }
+
+    @staticmethod
+    def _compilar(prioridad_patron):
+        """
+        Compila los patrones como un trie de regex con lookahead de ancho cero
+
+        El módulo re prueba las alternativas una por una; factorizar los prefijos
+        comunes en un trie hace que cada posición del header se resuelva en pocos
+        pasos, y el lookahead permite encontrar también matches superpuestos.
+        """
+        if not prioridad_patron:
+            return None
+
+        trie = {}
+        for patron in prioridad_patron:
+            nodo = trie
+            for ch in patron:
+                nodo = nodo.setdefault(ch, {})
+            nodo[''] = True
+
+        def construir(nodo):
+            ramas = [re.escape(ch) + construir(hijo) for ch, hijo in nodo.items() if ch != '']
+            if not ramas:
+                return ''
+            if len(ramas) == 1 and '' not in nodo:
+                return ramas[0]
+            grupo = '(?:' + '|'.join(ramas) + ')'
+            return grupo + '?' if '' in nodo else grupo
+
+        return re.compile('(?=(' + construir(trie) + '))')
+
+    @staticmethod
+    def _normalizar_regla(regla):
+        nombre, patrones = regla[0], tuple(regla[1])
+        opciones = regla[2] if len(regla) > 2 else {}
+        return nombre, patrones, opciones
+
+    @staticmethod
+    def _cumple(regla, col):
+        """Evalúa una regla sobre un header (semántica del if/elif original)"""
+        _, patrones, opciones = regla
+        if any(excluido in col for excluido in opciones.get('excluir', ())):
+            return False
+        if opciones.get('exacto'):
+            return col.strip() in patrones
+        texto = col.lower() if opciones.get('ignorar_mayusculas') else col
+        return any(patron in texto for patron in patrones)
+
+    def match(self, col):
+        """
+        Busca la regla de mayor prioridad que aplica al header
+
+        Returns:
+            índice de la regla en la tabla, o None si ninguna aplica
+        """
+        if col in self._cache:
+            return self._cache[col]
+
+        candidatos = set()
+        if self._regex is not None:
+            candidatos.update(self._prioridad_match[m.group(1)] for m in self._regex.finditer(col))
+        if self._regex_ci is not None:
+            candidatos.update(self._prioridad_match_ci[m.group(1)] for m in self._regex_ci.finditer(col.lower()))
+        exacto = self._exactos.get(col.strip())
+        if exacto is not None:
+            candidatos.add(exacto)
+
+        resultado = None
+        if candidatos:
+            resultado = min(candidatos)
+            if not self._cumple(self.rules[resultado], col):
+                # Una regla excluida puede tapar a otra en la misma posición:
+                # recorrer la tabla completa para este header (caso raro)
+                resultado = next((i for i, regla in enumerate(self.rules) if self._cumple(regla, col)), None)
+
+        self._cache[col] = resultado
+        return resultado
+
+    def map_headers(self, headers):
+        """
+        Mapea una lista de headers a nombres cortos
+
+        Returns:
+            tuple (dict header -> nombre corto, lista de diagnósticos de headers sin regla)
+        """
+        mapping = {}
+        unmatched = []
+        for col in headers:
+            prioridad = self.match(col)
+            if prioridad is not None:
+                nombre = self.rules[prioridad][0]
+                if nombre is not None:
+                    mapping[col] = nombre
+            else:
+                # Si no matchea nada, crear un nombre genérico
+                safe_name = re.sub(r'[^a-zA-Z0-9]', '_', col[:50].lower())
+                mapping[col] = safe_name
+                unmatched.append({'columna': col, 'nombre_generico': safe_name})
+        return mapping, unmatched
+
+
+def header_fingerprint(columns):
+    """Huella (sha256) de la fila de headers raw, en orden"""
+    digest = hashlib.sha256()
+    for col in columns:
+        digest.update(str(col).encode('utf-8'))
+        digest.update(b'\x1f')
+    return digest.hexdigest()
+
+
+def mapping_meta_path(mapping_path):
+    """Ruta del archivo de metadatos que acompaña al mapeo (ej: mapeo_columnas.meta.json)"""
+    mapping_path = Path(mapping_path)
+    return mapping_path.with_name(f"{mapping_path.stem}.meta.json")
+
+
+def detectar_separador(csv_path):
+    """
+    Separador de un CSV raw a partir de su header
+
+    Las exportaciones de Excel en español usan ';' y las de Google Forms ','. Los textos
+    de las preguntas contienen comas, así que cualquier ';' en el header decide.
+    """
+    with open(csv_path, encoding='utf-8-sig') as f:
+        header = f.readline()
+    return ';' if ';' in header else ','
+
 
 class EncuestaNormalizer:
     """Normaliza y limpia los datos de la encuesta salarial"""
 
-    def __init__(self, csv_path):
+    def __init__(self, csv_path, sep=';', registro=None):
         self.csv_path = csv_path
+        self.sep = detectar_separador(csv_path) if sep is None else sep
+        self.registro = registro
         self.df_raw = None
+        self.raw_columns = None
         self.df_normalized = None
         self.column_mapping = {}
+        self.unmatched_columns = []
+        self.header_fingerprint = None
+        self.row_hashes = None
+        self.watermark = None
+        self.output_shape = None
+
+    def _forma(self):
+        """Filas y columnas de los datos actuales (para las métricas por etapa)"""
+        for df in (self.df_normalized, self.df_raw):
+            if df is not None:
+                return df.shape
+        return self.output_shape
+
+    def _read_header(self):
+        """Headers del CSV raw, leyendo solo la primera fila (duplicados con sufijo .1, .2, etc.)"""
+        if self.raw_columns is None:
+            header = pd.read_csv(self.csv_path, sep=self.sep, dtype=str, keep_default_na=False, nrows=0)
+            self.raw_columns = list(header.columns)
+        return self.raw_columns
+
+    @staticmethod
+    def _is_duplicate_column(col):
+        """Columna duplicada del raw (pandas las renombra con .1, .2, etc.): se descarta"""
+        return '.1' in col or '.2' in col or '.3' in col or '.4' in col
+
+    def _usecols(self):
+        """
+        Posiciones de las columnas raw que sobreviven al mapeo
+
+        Returns:
+            lista de posiciones, o None si todavía no hay mapeo o no se descarta ninguna
+        """
+        if not self.column_mapping:
+            return None
+        columns = self._read_header()
+        usecols = [i for i, col in enumerate(columns)
+                   if not self._is_duplicate_column(self.column_mapping.get(col, col))]
+        return None if len(usecols) == len(columns) else usecols
 
+    @etapa_medida
     def load_data(self):
-        """Carga el CSV raw"""
+        """
+        Carga el CSV raw
+
+        Si el mapeo ya se generó (generate_column_mapping antes de load_data), solo se
+        parsean las columnas que sobreviven al mapeo.
+        """
         print("Cargando datos...")
-        # Cargar con separador ; (punto y coma) y como strings para manejar formato argentino
-        self.df_raw = pd.read_csv(self.csv_path, sep=';', dtype=str, keep_default_na=False)
+        usecols = self._usecols()
+        # Cargar como strings para manejar formato argentino (separador ; por defecto)
+        self.df_raw = pd.read_csv(self.csv_path, sep=self.sep, dtype=str, keep_default_na=False,
+                                  usecols=usecols)
+        if usecols is None:
+            self.raw_columns = list(self.df_raw.columns)
         print(f"✓ Datos cargados: {self.df_raw.shape[0]} filas, {self.df_raw.shape[1]} columnas")
+        if usecols is not None:
+            print(f"  ({len(self.raw_columns) - len(usecols)} columnas duplicadas omitidas al leer)")
         return self
 
-    def generate_column_mapping(self):
-        """Genera mapeo automático de columnas largas a cortas"""
+    @etapa_medida
+    def generate_column_mapping(self, cache_path=None):
+        """
+        Genera mapeo automático de columnas largas a cortas
+
+        Args:
+            cache_path: mapeo guardado previamente con save_mapping (opcional).
+                Si la huella de los headers y la versión de las reglas coinciden
+                con las guardadas, se reutiliza sin volver a aplicar las reglas.
+        """
         print("\nGenerando mapeo de columnas...")
 
-        mapping = {}
-        used_short_names = set()  # Track nombres cortos ya usados
-
-        for col in self.df_raw.columns:
-            # Básicas
-            if 'Marca temporal' in col:
-                mapping[col] = 'timestamp'
-            elif 'Puntuación' in col:
-                mapping[col] = 'puntuacion'
-            elif 'RUBRO' in col:
-                mapping[col] = 'rubro'
-            # IMPORTANTE: Columna "Tamaño" con clasificación directa Grande/Pyme
-            elif col.strip() == 'Tamaño':
-                mapping[col] = 'tamano'
-            # Columna "Clasificación por TAMAÑO (Dotación)" - NO MAPEAR (ya tenemos la columna "Tamaño")
-            elif 'Clasificación por TAMAÑO' in col:
-                pass  # No mapear esta columna
-
-            # Proyecciones y empleo
-            elif 'AUMENTO SALARIAL estima dar la empresa en TODO el año 2025' in col:
-                mapping[col] = 'aumento_salarial_2025_pct'
-            elif 'Cuantos aumentos salariales' in col:
-                mapping[col] = 'cantidad_aumentos_2025'
-            elif 'AUMENTO salarial ACUMULADO de Enero a Agosto 2025' in col:
-                mapping[col] = 'aumento_acumulado_2025'
-            elif 'indicador con el cual prevé dar los aumentos' in col:
-                mapping[col] = 'indicador_aumentos'
-            elif 'otro indicador' in col.lower():
-                mapping[col] = 'otro_indicador'
-            elif 'incorporar nuevos puestos' in col:
-                mapping[col] = 'prevision_incorporacion'
-            elif 'reducir puestos' in col:
-                mapping[col] = 'prevision_reduccion'
-            elif 'Rotación' in col:
-                mapping[col] = 'rotacion_2025_pct'
-
-            # Salarios por cargo
-            # IMPORTANTE: Asistente GG debe evaluarse ANTES que CEO/Gerente General
-            elif 'ASISTENTE DE GERENTE GENERAL' in col:
-                mapping[col] = 'salario_asistente_gg'
-            elif 'CEO / GERENTE GENERAL' in col or 'GERENTE GENERAL' in col:
-                mapping[col] = 'salario_ceo'
-            elif 'DIRECTOR COMERCIAL' in col:
-                mapping[col] = 'salario_director_comercial'
-            elif 'GERENTE DE VENTAS' in col:
-                mapping[col] = 'salario_gerente_ventas'
-            elif 'JEFE DE VENTAS' in col:
-                mapping[col] = 'salario_jefe_ventas'
-            elif 'EJECUTIVO DE VENTAS' in col:
-                mapping[col] = 'salario_ejecutivo_ventas'
-            elif 'ANALISTA E-COMMERCE' in col:
-                mapping[col] = 'salario_analista_ecommerce'
-            elif 'ANALISTA DE FACTURACION' in col:
-                mapping[col] = 'salario_analista_facturacion'
-            elif 'GERENTE DE MARKETING' in col:
-                mapping[col] = 'salario_gerente_marketing'
-            elif 'JEFE DE MARKETING' in col:
-                mapping[col] = 'salario_jefe_marketing'
-            elif 'ANALISTA DE MARKETING' in col:
-                mapping[col] = 'salario_analista_marketing'
-            elif 'GERENTE DE COMERCIO EXTERIOR' in col:
-                mapping[col] = 'salario_gerente_comex'
-            elif 'RESPONSABLE DE COMERCIO EXTERIOR' in col:
-                mapping[col] = 'salario_responsable_comex'
-            elif 'ASISTENTE DE COMERCIO EXTERIOR' in col:
-                mapping[col] = 'salario_asistente_comex'
-            elif 'ATENCION AL CLIENTE' in col:
-                mapping[col] = 'salario_atencion_cliente'
-            elif 'JEFE DE HOSPITALIDAD Y TURISMO' in col:
-                mapping[col] = 'salario_jefe_hospitalidad'
-            elif 'GUIA DE TURISMO' in col:
-                mapping[col] = 'salario_guia_turismo'
-            elif 'JEFE DE ALIMENTOS & BEBIDAS' in col:
-                mapping[col] = 'salario_jefe_alimentos_bebidas'
-            elif 'CHEF EJECUTIVO' in col:
-                mapping[col] = 'salario_chef_ejecutivo'
-            elif 'JEFE DE SALON' in col or 'Maître' in col:
-                mapping[col] = 'salario_jefe_salon'
-            elif 'GERENTE DE OPERACIONES (HOTEL)' in col:
-                mapping[col] = 'salario_gerente_ops_hotel'
-            elif 'JEFE DE RECEPCION (HOTEL)' in col:
-                mapping[col] = 'salario_jefe_recepcion_hotel'
-            elif 'RECEPCIONISTA (HOTEL)' in col:
-                mapping[col] = 'salario_recepcionista_hotel'
-            elif 'CONCIERGE (HOTEL)' in col:
-                mapping[col] = 'salario_concierge'
-            elif 'DIRECTOR DE ADMIN. & FINANZAS' in col:
-                mapping[col] = 'salario_director_admin_finanzas'
-            elif 'GERENTE DE ADMIN, CONTABILIDAD & IMPUESTOS' in col:
-                mapping[col] = 'salario_gerente_admin_conta'
-            elif 'JEFE DE ADMINISTRACION & CONTABILIDAD' in col:
-                mapping[col] = 'salario_jefe_admin_conta'
-            elif 'ANALISTA DE CONTABILIDAD' in col:
-                mapping[col] = 'salario_analista_contabilidad'
-            elif 'JEFE DE IMPUESTOS' in col:
-                mapping[col] = 'salario_jefe_impuestos'
-            elif 'ANALISTA DE IMPUESTOS' in col:
-                mapping[col] = 'salario_analista_impuestos'
-            elif 'JEFE DE FINANZAS' in col:
-                mapping[col] = 'salario_jefe_finanzas'
-            elif 'ANALISTA DE CUENTAS POR PAGAR' in col:
-                mapping[col] = 'salario_analista_cuentas_pagar'
-            elif 'EMPLEADO ADMINISTRATIVO' in col or 'DATA ENTRY' in col:
-                mapping[col] = 'salario_empleado_administrativo'
-            elif 'JEFE DE CREDITOS Y COBRANZAS' in col:
-                mapping[col] = 'salario_jefe_creditos_cobranzas'
-            elif 'ANALISTA DE COBRANZAS' in col:
-                mapping[col] = 'salario_analista_cobranzas'
-            elif 'JEFE DE CONTROL DE GESTION' in col:
-                mapping[col] = 'salario_jefe_control_gestion'
-            elif 'ANALISTA DE CONTROL DE GESTION' in col:
-                mapping[col] = 'salario_analista_control_gestion'
-            elif 'AUDITOR INTERNO' in col:
-                mapping[col] = 'salario_auditor_interno'
-            elif 'RECEPCIONISTA:' in col and 'HOTEL' not in col:
-                mapping[col] = 'salario_recepcionista'
-            elif 'DIRECTOR DE OPERACIONES' in col and 'HOTEL' not in col:
-                mapping[col] = 'salario_director_operaciones'
-            elif 'GERENTE DE PLANTA' in col or 'OPERACIONES:' in col:
-                mapping[col] = 'salario_gerente_planta'
-            elif 'JEFE DE PRODUCCION' in col:
-                mapping[col] = 'salario_jefe_produccion'
-            elif 'INGENIERO DE PROCESOS' in col or 'MEJORA CONTINUA' in col:
-                mapping[col] = 'salario_ingeniero_procesos'
-            elif 'SUPERVISOR DE PRODUCCION' in col:
-                mapping[col] = 'salario_supervisor_produccion'
-            elif 'ANALISTA DE PRODUCCION' in col:
-                mapping[col] = 'salario_analista_produccion'
-            elif 'GERENTE DE ENOLOGIA' in col or '1er Enologo' in col:
-                mapping[col] = 'salario_gerente_enologia'
-            elif 'JEFE DE BODEGA' in col or '2ndo Enologo' in col:
-                mapping[col] = 'salario_jefe_bodega'
-            elif 'SUPERVISOR DE BODEGA' in col:
-                mapping[col] = 'salario_supervisor_bodega'
-            elif 'GERENTE AGRICOLA' in col:
-                mapping[col] = 'salario_gerente_agricola'
-            elif 'INGENIERO AGRONOMO' in col:
-                mapping[col] = 'salario_ingeniero_agronomo'
-            elif 'SUPERVISOR DE FINCAS' in col:
-                mapping[col] = 'salario_supervisor_fincas'
-            elif 'JEFE DE LABORATORIO' in col:
-                mapping[col] = 'salario_jefe_laboratorio'
-            elif 'ANALISTA DE LABORATORIO' in col:
-                mapping[col] = 'salario_analista_laboratorio'
-            elif 'GERENTE DE SUPPLY CHAIN' in col:
-                mapping[col] = 'salario_gerente_supply_chain'
-            elif 'JEFE DE PLANIFICACION' in col:
-                mapping[col] = 'salario_jefe_planificacion'
-            elif 'JEFE DE LOGISTICA' in col:
-                mapping[col] = 'salario_jefe_logistica'
-            elif 'ANALISTA DE LOGISTICA' in col:
-                mapping[col] = 'salario_analista_logistica'
-            elif 'SUPERVISOR DE DEPOSITOS' in col:
-                mapping[col] = 'salario_supervisor_depositos'
-            elif 'GERENTE DE ABASTECIMIENTO Y COMPRAS' in col:
-                mapping[col] = 'salario_gerente_compras'
-            elif 'JEFE DE COMPRAS' in col:
-                mapping[col] = 'salario_jefe_compras'
-            elif 'COMPRADOR' in col or 'ANALISTA DE COMPRAS' in col:
-                mapping[col] = 'salario_comprador_analista'
-            elif 'GERENTE DE MANTENIMIENTO' in col:
-                mapping[col] = 'salario_gerente_mantenimiento'
-            elif 'JEFE DE MANTENIMIENTO' in col:
-                mapping[col] = 'salario_jefe_mantenimiento'
-            elif 'SUPERVISOR DE MANTENIMIENTO' in col:
-                mapping[col] = 'salario_supervisor_mantenimiento'
-            elif 'TECNICO DE MANTENIMIENTO' in col:
-                mapping[col] = 'salario_tecnico_mantenimiento'
-            elif 'GERENTE DE ASEGURAMIENTO DE LA CALIDAD' in col:
-                mapping[col] = 'salario_gerente_calidad'
-            elif 'JEFE DE CALIDAD' in col:
-                mapping[col] = 'salario_jefe_calidad'
-            elif 'ANALISTA DE CALIDAD' in col:
-                mapping[col] = 'salario_analista_calidad'
-            elif 'TECNICO DE CALIDAD' in col:
-                mapping[col] = 'salario_tecnico_calidad'
-            elif 'DISEÑADOR GRAFICO' in col or 'PRODUCTO:' in col:
-                mapping[col] = 'salario_diseñador_grafico'
-            elif 'SUSTENTABILIDAD' in col or 'MEDIOAMBIENTE' in col:
-                mapping[col] = 'salario_responsable_sustentabilidad'
-            elif 'GERENTE DE SEGURIDAD & HIGIENE' in col:
-                mapping[col] = 'salario_gerente_seguridad'
-            elif 'JEFE DE SEGURIDAD & HIGIENE' in col:
-                mapping[col] = 'salario_jefe_seguridad'
-            elif 'TECNICO DE SEGURIDAD & HIGIENE' in col:
-                mapping[col] = 'salario_tecnico_seguridad'
-            elif 'JEFE DE INGENIERIA Y PROYECTOS' in col:
-                mapping[col] = 'salario_jefe_ingenieria'
-            elif 'INGENIERO DE PROYECTOS' in col or 'PROJECT MANAGER' in col:
-                mapping[col] = 'salario_ingeniero_proyectos'
-            elif 'ASISTENTE DE PROYECTO' in col or 'PROYECTISTA' in col:
-                mapping[col] = 'salario_asistente_proyecto'
-            elif 'JEFE DE OBRA' in col:
-                mapping[col] = 'salario_jefe_obra'
-            elif 'SUPERVISOR DE OBRA' in col:
-                mapping[col] = 'salario_supervisor_obra'
-            elif 'DIRECTOR DE RECURSOS HUMANOS' in col:
-                mapping[col] = 'salario_director_rrhh'
-            elif 'GERENTE DE RECURSOS HUMANOS' in col:
-                mapping[col] = 'salario_gerente_rrhh'
-            elif 'JEFE DE RECURSOS HUMANOS' in col or 'HRBP' in col:
-                mapping[col] = 'salario_jefe_rrhh'
-            elif 'RESPONSABLE DE LIQUIDACION' in col:
-                mapping[col] = 'salario_responsable_liquidacion'
-            elif 'ANALISTA DE ADMINISTRACION DE PERSONAL' in col:
-                mapping[col] = 'salario_analista_admin_personal'
-            elif 'JEFE DE SELECCION' in col:
-                mapping[col] = 'salario_jefe_seleccion'
-            elif 'ANALISTA DE SELECCION' in col:
-                mapping[col] = 'salario_analista_seleccion'
-            elif 'ANALISTA DE CAPACITACION Y DESARROLLO' in col:
-                mapping[col] = 'salario_analista_capacitacion'
-            elif 'DIRECTOR DE SISTEMAS & IT' in col:
-                mapping[col] = 'salario_director_it'
-            elif 'GERENTE DE SISTEMAS & IT' in col:
-                mapping[col] = 'salario_gerente_it'
-            elif 'JEFE DE DESARROLLO DE SISTEMAS' in col:
-                mapping[col] = 'salario_jefe_desarrollo'
-            elif 'PROGRAMADOR' in col or 'DESARROLLADOR DE SISTEMAS' in col:
-                mapping[col] = 'salario_programador'
-            elif 'ANALISTA FUNCIONAL' in col:
-                mapping[col] = 'salario_analista_funcional'
-            elif 'JEFE DE REDES E INFRAESTRUCTURA' in col:
-                mapping[col] = 'salario_jefe_redes'
-            elif 'TECNICO DE REDES E INFRAESTRUCTURA' in col:
-                mapping[col] = 'salario_tecnico_redes'
-            elif 'JEFE DE SOPORTE TECNICO' in col:
-                mapping[col] = 'salario_jefe_soporte'
-            elif 'ANALISTA HELP DESK' in col:
-                mapping[col] = 'salario_analista_helpdesk'
-            elif 'JOVEN PROFESIONAL' in col:
-                mapping[col] = 'salario_joven_profesional'
-            elif 'PASANTE' in col:
-                mapping[col] = 'salario_pasante'
-
-            # Bonificaciones
-            elif 'Bonus GERENTE GENERAL' in col:
-                mapping[col] = 'bonus_gerente_general'
-            elif 'Bonus DIRECTORES' in col:
-                mapping[col] = 'bonus_directores'
-            elif 'Bonus GERENTES' in col:
-                mapping[col] = 'bonus_gerentes'
-            elif 'Bonus JEFES' in col:
-                mapping[col] = 'bonus_jefes'
-            elif 'Bonus SUPERVISORES' in col:
-                mapping[col] = 'bonus_supervisores'
-            elif 'Bonus ANALISTAS' in col:
-                mapping[col] = 'bonus_analistas'
-
-            # Beneficios - Medicina
-            elif 'Medicina Prepaga' in col:
-                mapping[col] = 'benef_medicina_prepaga'
-            elif 'reintegro en compra de medicamentos' in col:
-                mapping[col] = 'benef_reintegro_medicamentos'
-            elif 'Prestamos al personal' in col:
-                mapping[col] = 'benef_prestamos'
-            elif 'Almuerzo pago' in col or 'Viandas' in col:
-                mapping[col] = 'benef_almuerzo'
-            elif 'Gimnasio' in col or 'Yoga' in col or 'Mindfulness' in col:
-                mapping[col] = 'benef_gimnasio'
-            elif 'Gift card' in col or 'Vales de compras' in col:
-                mapping[col] = 'benef_gift_card'
-            elif 'Red de Descuentos' in col:
-                mapping[col] = 'benef_red_descuentos'
-            elif 'Descuento en productos de la empresa' in col:
-                mapping[col] = 'benef_descuento_productos'
-            elif 'Combustible / Transporte' in col:
-                mapping[col] = 'benef_combustible'
-            elif 'Cochera' in col or 'estacionamiento' in col:
-                mapping[col] = 'benef_cochera'
-            elif 'Auto compañía para Gerentes' in col:
-                mapping[col] = 'benef_auto_gerentes'
-            elif 'Auto compañía para Vendedores' in col:
-                mapping[col] = 'benef_auto_vendedores'
-            elif 'Gastos de Mantenimiento y Seguro de Auto' in col:
-                mapping[col] = 'benef_gastos_auto'
-            elif 'Tarjeta de Crédito Corporativa' in col:
-                mapping[col] = 'benef_tarjeta_credito'
-            elif 'Pago de Colegio' in col:
-                mapping[col] = 'benef_colegio'
-            elif 'Planes de Pensión' in col or 'Seguros de retiro' in col:
-                mapping[col] = 'benef_pension'
-            elif 'Pago del sueldo en dólares' in col:
-                mapping[col] = 'benef_pago_dolares'
-            elif 'Pago de Posgrados' in col or 'MBA' in col:
-                mapping[col] = 'benef_posgrados'
-            elif 'Pago de Sesiones de Coaching' in col:
-                mapping[col] = 'benef_coaching'
-            elif 'Pago de Clases de Inglés' in col:
-                mapping[col] = 'benef_idiomas'
-            elif 'Pago de conectividad' in col or 'Internet' in col:
-                mapping[col] = 'benef_internet'
-
-            # Beneficios de tiempo
-            elif 'Dias adicionales de vacaciones' in col:
-                mapping[col] = 'benef_vacaciones_adicionales'
-            elif 'Home Office' in col:
-                mapping[col] = 'benef_home_office'
-            elif 'Día flex' in col:
-                mapping[col] = 'benef_dia_flex'
-            elif 'cumpleaños libre' in col:
-                mapping[col] = 'benef_cumpleanos'
-            elif 'Licencia de Maternidad extendida' in col:
-                mapping[col] = 'benef_maternidad'
-            elif 'Licencia de Paternidad extendida' in col:
-                mapping[col] = 'benef_paternidad'
-            elif 'after office' in col:
-                mapping[col] = 'benef_after_office'
-            elif 'Actividades de integración dentro del horario' in col:
-                mapping[col] = 'benef_integracion'
-
-            # Comentarios
-            elif 'beneficio que tengan implementado' in col:
-                mapping[col] = 'comentarios_beneficios'
-            elif 'NUEVOS PUESTOS' in col:
-                mapping[col] = 'sugerencias_puestos'
-            elif 'OTRA INFORMACION' in col:
-                mapping[col] = 'comentarios_generales'
+        self.header_fingerprint = header_fingerprint(self._read_header())
+        if cache_path is not None and self._load_cached_mapping(cache_path):
+            print(f"✓ {len(self.column_mapping)} columnas mapeadas (headers sin cambios, mapeo reutilizado de {cache_path})")
+            return self
 
-            else:
-                # Si no matchea nada, crear un nombre genérico
-                safe_name = re.sub(r'[^a-zA-Z0-9]', '_', col[:50].lower())
-                mapping[col] = safe_name
+        mapping, self.unmatched_columns = ColumnRuleMatcher.default().map_headers(self._read_header())
+
+        if self.unmatched_columns:
+            print(f"  ⚠ {len(self.unmatched_columns)} columnas sin regla (se usa nombre genérico):")
+            for diag in self.unmatched_columns:
+                print(f"  - '{diag['columna'][:60]}' -> '{diag['nombre_generico']}'")
 
         # Eliminar columnas que mapean a nombres duplicados (mantener solo la primera)
         short_name_to_orig = {}
@@ -372,77 +577,111 @@ class EncuestaNormalizer:
         print(f"✓ {len(final_mapping)} columnas mapeadas ({len(mapping) - len(final_mapping)} duplicados eliminados)")
         return self
 
+    def _load_cached_mapping(self, cache_path):
+        """Carga el mapeo guardado si corresponde a los mismos headers y reglas"""
+        meta_path = mapping_meta_path(cache_path)
+        if not Path(cache_path).exists() or not meta_path.exists():
+            return False
+
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            if (meta.get('header_fingerprint') != self.header_fingerprint
+                    or meta.get('rules_version') != COLUMN_RULES_VERSION):
+                print("  Headers o reglas cambiaron desde el último mapeo, regenerando...")
+                return False
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                self.column_mapping = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"  Warning: No se pudo leer el mapeo guardado: {e}")
+            return False
+
+        self.unmatched_columns = meta.get('unmatched_columns', [])
+        return True
+
+    def _normalize_frame(self, df_raw):
+        """
+        Renombra, descarta duplicados y convierte salarios de un bloque de filas raw
+
+        Returns:
+            tuple (DataFrame normalizado, columnas duplicadas eliminadas,
+            cantidad de columnas de salario, valores de salario convertidos a NaN)
+        """
+        df = df_raw.rename(columns=self.column_mapping)
+
+        # Eliminar columnas duplicadas (pandas las renombra con .1, .2, etc.)
+        duplicated_cols = [col for col in df.columns if self._is_duplicate_column(col)]
+        if duplicated_cols:
+            df = df.drop(columns=duplicated_cols)
+
+        # Convertir salarios a numérico
+        # Manejar formato argentino: punto como separador de miles (ej: 500.000)
+        salary_columns = [col for col in df.columns if col.startswith('salario_')]
+
+        coerced = 0
+        if salary_columns:
+            parsed, coerced = parse_salary_block(df[salary_columns])
+            # Reemplazar el bloque de una vez (asignar columna por columna fragmenta el DataFrame)
+            df = pd.concat([df.drop(columns=salary_columns), parsed], axis=1)[df.columns]
+
+        return df, duplicated_cols, len(salary_columns), coerced
+
+    @etapa_medida
     def normalize(self):
         """Aplica la normalización al DataFrame"""
         print("\nNormalizando datos...")
-        self.df_normalized = self.df_raw.rename(columns=self.column_mapping)
-
-        # Eliminar columnas duplicadas (pandas las renombra con .1, .2, etc.)
-        duplicated_cols = [col for col in self.df_normalized.columns
-                          if '.1' in col or '.2' in col or '.3' in col or '.4' in col]
+        self.df_normalized, duplicated_cols, count, coerced = self._normalize_frame(self.df_raw)
 
         if duplicated_cols:
             print(f"⚠ Eliminando {len(duplicated_cols)} columnas duplicadas:")
             for col in duplicated_cols:
                 print(f"  - {col}")
-            self.df_normalized = self.df_normalized.drop(columns=duplicated_cols)
-
-        # Convertir salarios a numérico - columna por columna
-        # Manejar formato argentino: punto como separador de miles (ej: 500.000)
-        salary_columns = [col for col in self.df_normalized.columns if col.startswith('salario_')]
-
-        count = 0
-        for col in salary_columns:
-            try:
-                # Primero convertir strings con punto como separador de miles
-                def convert_salary(val):
-                    if pd.isna(val):
-                        return np.nan
-                    if isinstance(val, (int, float)):
-                        return float(val)
-                    # Si es string, quitar puntos (separador de miles) y convertir
-                    val_str = str(val).strip()
-                    # Quitar puntos que son separadores de miles
-                    val_str = val_str.replace('.', '')
-                    # Reemplazar coma por punto si existe (separador decimal)
-                    val_str = val_str.replace(',', '.')
-                    try:
-                        return float(val_str)
-                    except:
-                        return np.nan
-
-                self.df_normalized.loc[:, col] = self.df_normalized[col].apply(convert_salary)
-                count += 1
-            except Exception as e:
-                print(f"  Warning: No se pudo convertir {col}: {e}")
 
         print(f"✓ {count} columnas de salario convertidas a numérico")
+        if coerced:
+            print(f"  ⚠ {coerced} valores de salario no numéricos convertidos a NaN")
         return self
 
-    def clean_data(self):
-        """Limpia y prepara los datos"""
-        print("\nLimpiando datos...")
+    @staticmethod
+    def _clean_frame(df, tamano_por_posicion=True):
+        """
+        Limpia un bloque de filas normalizadas
 
+        Usa las etiquetas del índice (posición de la fila en el archivo raw), por lo
+        que da el mismo resultado sobre el archivo completo o sobre un bloque.
+
+        Args:
+            df: bloque normalizado
+            tamano_por_posicion: clasificar Grande/Pyme por la posición de la fila (solo
+                vale para el archivo original); si False, se toma de la columna tamano
+        """
         # NO reemplazar 0 con NaN - los 0 son valores válidos en nuevadata.csv
         # (representan empresas que sí tienen el puesto pero con sueldo 0 o dato faltante)
 
-        # Clasificación por tamaño (según nuevadata.csv):
-        # Filas 1-18 (índices 0-17): Grande (18 empresas)
-        # Filas 19+ (índices 18+): Pyme (50 empresas)
-        self.df_normalized['categoria_tamano'] = 'Pyme'  # Por defecto todas son Pyme
-        self.df_normalized.loc[0:17, 'categoria_tamano'] = 'Grande'  # Primeras 18 filas son Grande
+        if tamano_por_posicion:
+            # Clasificación por tamaño (según nuevadata.csv):
+            # Filas 1-18 (índices 0-17): Grande (18 empresas)
+            # Filas 19+ (índices 18+): Pyme (50 empresas)
+            df['categoria_tamano'] = 'Pyme'  # Por defecto todas son Pyme
+            df.loc[0:17, 'categoria_tamano'] = 'Grande'  # Primeras 18 filas son Grande
+        else:
+            # Otras fuentes (backups, otras ediciones): "Grande(s)" / "Pyme(s)" de la respuesta;
+            # sin la pregunta o sin respuesta queda vacío
+            tamano = df['tamano'].astype(str).str.strip() if 'tamano' in df.columns else pd.Series('', index=df.index)
+            df['categoria_tamano'] = np.select([tamano.str.startswith('Grande'), tamano.str.startswith('Pyme')],
+                                               ['Grande', 'Pyme'], default=None)
 
         # Limpiar y unificar rubros
-        if 'rubro' in self.df_normalized.columns:
+        if 'rubro' in df.columns:
             # Normalizar mayúsculas/minúsculas
-            self.df_normalized['rubro'] = self.df_normalized['rubro'].str.strip()
+            df['rubro'] = df['rubro'].str.strip()
 
             # Unificar duplicados
             rubro_mapping = {
                 'Otro rubro': 'Otro Rubro',
                 'Gastronomía, Hotelería y Turísmo': 'Gastronomía, Hotelería y Turismo',  # Corregir tilde
             }
-            self.df_normalized['rubro'] = self.df_normalized['rubro'].replace(rubro_mapping)
+            df['rubro'] = df['rubro'].replace(rubro_mapping)
 
             # Acortar nombres largos para mejor visualización
             rubro_short = {
@@ -450,26 +689,272 @@ class EncuestaNormalizer:
                 'Energía, Petroleo, Minería, Servicios relacionados': 'Energía y Minería',
                 'Gastronomía, Hotelería y Turismo': 'Gastronomía y Turismo',
             }
-            self.df_normalized['rubro_corto'] = self.df_normalized['rubro'].replace(rubro_short).fillna(self.df_normalized['rubro'])
+            df['rubro_corto'] = df['rubro'].replace(rubro_short).fillna(df['rubro'])
+
+        return df
 
+    @etapa_medida
+    def clean_data(self, tamano_por_posicion=True):
+        """
+        Limpia y prepara los datos, con tipos compactos (ver datos.compactar_tipos)
+
+        Args:
+            tamano_por_posicion: ver _clean_frame (False para fuentes que no son el archivo original)
+        """
+        print("\nLimpiando datos...")
+        df = self._clean_frame(self.df_normalized, tamano_por_posicion)
         print("✓ Datos limpiados")
+
+        antes = memoria_por_tipo(df)
+        self.df_normalized = compactar_tipos(df)
+        despues = memoria_por_tipo(self.df_normalized)
+        self._print_memory_report(antes, despues)
+        return self
+
+    @staticmethod
+    def _print_memory_report(antes, despues):
+        """Imprime la memoria del DataFrame por tipo antes y después de compactar"""
+        total_antes = antes.sum()
+        total_despues = despues.sum()
+        ahorro = 1 - total_despues / total_antes if total_antes else 0
+        print(f"✓ Tipos compactos: {total_antes / 1024:,.1f} KB → {total_despues / 1024:,.1f} KB "
+              f"({ahorro:.0%} menos)")
+        print(f"  antes:   " + ", ".join(f"{tipo} {b / 1024:,.1f} KB" for tipo, b in antes.items()))
+        print(f"  después: " + ", ".join(f"{tipo} {b / 1024:,.1f} KB" for tipo, b in despues.items()))
+
+    @etapa_medida
+    def normalize_streaming(self, output_path, chunksize=10000, cache_path=None, csv_path=None):
+        """
+        Procesa el CSV raw por bloques y escribe el resultado de forma incremental
+
+        Aplica el mismo mapeo, conversión de salarios y limpieza que el pipeline en
+        memoria (generate_column_mapping → load_data → normalize → clean_data →
+        save_normalized), pero la memoria usada depende del tamaño del bloque y no
+        del tamaño del archivo. El CSV es idéntico al del pipeline en memoria; el
+        Parquet tiene los mismos valores y tipos, pero cada bloque es un row group
+        con su propio diccionario de categorías (en el orden del bloque), así que el
+        archivo no es byte a byte igual: cargar_encuesta_normalizada lo lee igual.
+
+        Args:
+            output_path: archivo normalizado de salida (.parquet o .csv)
+            chunksize: cantidad de filas por bloque
+            cache_path: mapeo guardado previamente (ver generate_column_mapping)
+            csv_path: exportación CSV adicional (opcional)
+        """
+        import pyarrow.parquet as pq
+
+        # El mapeo depende solo de los headers: se genera antes de leer los bloques
+        self.generate_column_mapping(cache_path=cache_path)
+
+        print(f"\nProcesando {self.csv_path} en bloques de {chunksize} filas...")
+        reader = pd.read_csv(self.csv_path, sep=self.sep, dtype=str, keep_default_na=False,
+                             usecols=self._usecols(), chunksize=chunksize)
+
+        csv_outputs = [path for path in (output_path, csv_path)
+                       if path is not None and Path(path).suffix != '.parquet']
+        parquet_output = output_path if Path(output_path).suffix == '.parquet' else None
+        parquet_writer = None
+        esquema = tipos = None
+
+        total_rows = 0
+        total_columns = 0
+        total_coerced = 0
+        row_hashes = []
+        watermark = None
+        try:
+            with reader:
+                for i, chunk in enumerate(reader):
+                    df, _, _, coerced = self._normalize_frame(chunk)
+                    df = self._clean_frame(df)
+
+                    if parquet_output is not None:
+                        if parquet_writer is None:
+                            # Todos los bloques tienen las mismas columnas: el esquema se arma una vez
+                            esquema, tipos = esquema_arrow(df.columns), clasificar_columnas(df.columns)
+                            parquet_writer = pq.ParquetWriter(parquet_output, esquema,
+                                                              compression=COMPRESION_PARQUET)
+                        parquet_writer.write_table(tabla_arrow(df, esquema, tipos))
+                    for path in csv_outputs:
+                        df.to_csv(path, index=False, mode='w' if i == 0 else 'a', header=(i == 0))
+
+                    row_hashes.append(self._row_hashes(chunk))
+                    watermark = max(filter(None, [watermark, self._max_timestamp(df)]), default=None)
+                    total_rows += len(df)
+                    total_columns = len(df.columns)
+                    total_coerced += coerced
+                    print(f"  ✓ Bloque {i + 1}: {total_rows} filas procesadas")
+        finally:
+            if parquet_writer is not None:
+                parquet_writer.close()
+
+        # No se conserva el DataFrame completo en memoria
+        self.df_raw = None
+        self.df_normalized = None
+        self.row_hashes = np.concatenate(row_hashes) if row_hashes else np.array([], dtype=np.uint64)
+        self.watermark = watermark
+        self.output_shape = (total_rows, total_columns)
+        print(f"✓ {total_rows} filas normalizadas y guardadas en {output_path}")
+        if total_coerced:
+            print(f"  ⚠ {total_coerced} valores de salario no numéricos convertidos a NaN")
+        return self
+
+    @staticmethod
+    def _row_hashes(df_raw):
+        """Hash (uint64) del contenido de cada fila raw, calculado de forma vectorizada"""
+        return pd.util.hash_pandas_object(df_raw, index=False).to_numpy(dtype=np.uint64)
+
+    @staticmethod
+    def _max_timestamp(df):
+        """Última marca temporal de un bloque normalizado (None si no hay)"""
+        if 'timestamp' not in df.columns:
+            return None
+        timestamps = df['timestamp']
+        if not pd.api.types.is_datetime64_any_dtype(timestamps):
+            timestamps = parsear_timestamp(timestamps)
+        maximo = timestamps.max()
+        return None if pd.isna(maximo) else maximo
+
+    @staticmethod
+    def _load_state(state_path):
+        """Lee el estado de la última corrida (None si no existe o no se puede leer)"""
+        if state_path is None or not Path(state_path).exists():
+            return None
+        try:
+            with open(state_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"  Warning: No se pudo leer el estado de la última corrida: {e}")
+            return None
+
+    @etapa_medida
+    def normalize_incremental(self, output_path, state_path, cache_path=None):
+        """
+        Normaliza solo las respuestas nuevas o modificadas desde la última corrida
+
+        Compara el hash de cada fila raw con el guardado en state_path: las filas con
+        hash distinto y las que están después del final anterior se normalizan y se
+        combinan con el Parquet existente. Si cambian los headers o las reglas, si se
+        borraron filas o si no hay estado previo, se procesa todo el archivo.
+
+        Args:
+            output_path: Parquet normalizado (se lee y se actualiza)
+            state_path: estado de la última corrida (ver save_state)
+            cache_path: mapeo guardado previamente (ver generate_column_mapping)
+        """
+        self.generate_column_mapping(cache_path=cache_path)
+        self.load_data()
+        hashes = self._row_hashes(self.df_raw)
+
+        state = self._load_state(state_path)
+        motivo = None
+        if state is None:
+            motivo = "no hay estado de una corrida anterior"
+        elif not Path(output_path).exists():
+            motivo = f"no existe {output_path}"
+        elif (state.get('header_fingerprint') != self.header_fingerprint
+                or state.get('rules_version') != COLUMN_RULES_VERSION):
+            motivo = "cambiaron los headers o las reglas de mapeo"
+        elif len(state.get('row_hashes', [])) > len(hashes):
+            motivo = "el archivo raw tiene menos filas que en la corrida anterior"
+
+        if motivo:
+            print(f"\nProcesando todas las filas ({motivo})...")
+            self.row_hashes = hashes
+            return self.normalize().clean_data().save_normalized(output_path)
+
+        previous = np.array([int(h, 16) for h in state['row_hashes']], dtype=np.uint64)
+        changed = np.flatnonzero(hashes[:len(previous)] != previous)
+        new = np.arange(len(previous), len(hashes))
+        rows = np.concatenate([changed, new])
+        print(f"\n{len(new)} respuestas nuevas desde {state.get('watermark')}, {len(changed)} modificadas")
+
+        self.row_hashes = hashes
+        self.df_normalized = pd.read_parquet(output_path)
+        if len(rows) == 0:
+            print("✓ Sin cambios: el dataset normalizado está al día")
+            return self
+
+        # Las etiquetas del índice son la posición en el raw (ver _clean_frame)
+        df, _, _, coerced = self._normalize_frame(self.df_raw.iloc[rows])
+        df = self._clean_frame(df)
+        if coerced:
+            print(f"  ⚠ {coerced} valores de salario no numéricos convertidos a NaN")
+
+        self.df_normalized = reemplazar_filas(self.df_normalized, df)
+        guardar_parquet(self.df_normalized, output_path)
+        print(f"✓ {len(rows)} filas normalizadas y combinadas en {output_path}")
         return self
 
+    @etapa_medida
+    def save_state(self, state_path):
+        """Guarda huella de headers, hash por fila y marca temporal máxima procesada"""
+        if self.row_hashes is None:
+            self.row_hashes = self._row_hashes(self.df_raw)
+        if self.watermark is None and self.df_normalized is not None:
+            self.watermark = self._max_timestamp(self.df_normalized)
+
+        state = {
+            'header_fingerprint': self.header_fingerprint,
+            'rules_version': COLUMN_RULES_VERSION,
+            'watermark': None if self.watermark is None else self.watermark.isoformat(),
+            'row_hashes': [format(h, '016x') for h in self.row_hashes.tolist()],
+        }
+        with open(state_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, indent=1)
+        return self
+
+    @etapa_medida
     def save_normalized(self, output_path):
-        """Guarda el DataFrame normalizado"""
+        """Guarda el DataFrame normalizado (Parquet tipado si la extensión es .parquet, si no CSV)"""
         print(f"\nGuardando datos normalizados en {output_path}...")
-        self.df_normalized.to_csv(output_path, index=False)
+        if Path(output_path).suffix == '.parquet':
+            guardar_parquet(self.df_normalized, output_path)
+        else:
+            self.df_normalized.to_csv(output_path, index=False)
         print("✓ Datos guardados")
         return self
 
+    @etapa_medida
+    def save_benefit_matrix(self, output_path, parquet_path=None):
+        """
+        Guarda los beneficios como matriz booleana empresas × beneficios empaquetada en bits
+
+        Args:
+            output_path: archivo .npz de salida
+            parquet_path: dataset normalizado a leer si no está en memoria (modo streaming)
+        """
+        print(f"\nGuardando matriz de beneficios en {output_path}...")
+        df = self.df_normalized
+        if df is None:
+            import pyarrow.parquet as pq
+            columnas = [col for col in pq.read_schema(parquet_path).names
+                        if col.startswith('benef_') or col in ('categoria_tamano', 'rubro_corto')]
+            df = pd.read_parquet(parquet_path, columns=columnas)
+        matriz = empaquetar_beneficios(df)
+        guardar_npz(matriz, output_path)
+        print(f"✓ {len(matriz['beneficios'])} beneficios × {len(df)} empresas "
+              f"({matriz['bits'].nbytes} bytes)")
+        return self
+
+    @etapa_medida
     def save_mapping(self, output_path):
         """Guarda el mapeo de columnas"""
         print(f"\nGuardando mapeo de columnas en {output_path}...")
         with open(output_path, 'w', encoding='utf-8') as f:
             json.dump(self.column_mapping, f, ensure_ascii=False, indent=2)
+
+        # Huella de los headers junto al mapeo, para reutilizarlo en la próxima corrida
+        meta = {
+            'header_fingerprint': self.header_fingerprint,
+            'rules_version': COLUMN_RULES_VERSION,
+            'unmatched_columns': self.unmatched_columns,
+        }
+        with open(mapping_meta_path(output_path), 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False, indent=2)
         print("✓ Mapeo guardado")
         return self
 
+    @etapa_medida
     def get_summary(self):
         """Muestra resumen de los datos"""
         print("\n" + "="*60)
@@ -497,32 +982,235 @@ class EncuestaNormalizer:
         return self
 
 
-def main():
+# Edición asignada a las fuentes sin marcas temporales legibles (ej: "##########" de Excel)
+EDICION_SIN_FECHA = 'sin_fecha'
+
+
+def edicion_de_fecha(fecha):
+    """Edición semestral de la encuesta según la última respuesta (ej: '2025-S2')"""
+    if fecha is None:
+        return EDICION_SIN_FECHA
+    return f"{fecha.year}-S{1 if fecha.month <= 6 else 2}"
+
+
+def _normalizar_fuente(csv_path, output_dir):
+    """
+    Normaliza un CSV raw y lo escribe en su partición edicion=<año>-S<semestre>/fuente=<nombre>/,
+    junto con los resúmenes de cuantiles de cada cargo (ver datos.cargar_resumenes_ediciones)
+
+    Se ejecuta en un proceso del pool de normalizar_lote, por eso es una función de
+    módulo y no imprime nada (la salida de cada proceso se mezclaría).
+
+    Returns:
+        dict con el resumen de la fuente
+    """
+    csv_path = Path(csv_path)
+    registro = RegistroEtapas()
+    with contextlib.redirect_stdout(io.StringIO()):
+        normalizer = EncuestaNormalizer(csv_path, sep=None, registro=registro)
+        normalizer.generate_column_mapping() \
+                  .load_data() \
+                  .normalize() \
+                  .clean_data(tamano_por_posicion=False)
+
+    df = normalizer.df_normalized
+    ultima_respuesta = normalizer._max_timestamp(df)
+    edicion = edicion_de_fecha(ultima_respuesta)
+
+    particion = Path(output_dir) / f"edicion={edicion}" / f"fuente={csv_path.stem}"
+    particion.mkdir(parents=True, exist_ok=True)
+    with registro.etapa('save_normalized') as etapa:
+        guardar_parquet(df, particion / 'part-0.parquet')
+        etapa['filas'], etapa['columnas'] = df.shape
+    with registro.etapa('save_sketches') as etapa:
+        resumenes = tabla_resumenes(EstadisticasSalariales(df).resumenes_cuantiles())
+        resumenes.to_parquet(particion / RESUMENES_CUANTILES, compression=COMPRESION_PARQUET, index=False)
+        etapa['filas'], etapa['columnas'] = resumenes.shape
+    registro.detener()
+
+    return {
+        'fuente': csv_path.name,
+        'separador': normalizer.sep,
+        'edicion': edicion,
+        'filas': len(df),
+        'columnas': len(df.columns),
+        'sin_mapear': len(normalizer.unmatched_columns),
+        'ultima_respuesta': None if ultima_respuesta is None else ultima_respuesta.isoformat(),
+        'etapas': registro.etapas,
+    }
+
+
+def normalizar_lote(raw_dir, output_dir, max_workers=None):
+    """
+    Normaliza todos los CSV raw (ediciones y backups) en paralelo
+
+    Cada archivo se procesa en un proceso distinto y se escribe como partición de un
+    único dataset Parquet (edicion=<año>-S<semestre>/fuente=<nombre>/part-0.parquet) que se lee
+    con datos.cargar_ediciones. Los archivos con contenido idéntico a otro se
+    procesan una sola vez.
+
+    Args:
+        raw_dir: directorio con los CSV raw
+        output_dir: directorio del dataset particionado (se regenera completo)
+        max_workers: cantidad de procesos (None = cantidad de CPUs)
+
+    Returns:
+        lista de resúmenes por fuente (ver _normalizar_fuente), incluidos los duplicados
+    """
+    raw_dir = Path(raw_dir)
+    output_dir = Path(output_dir)
+
+    fuentes = []
+    duplicados = []
+    vistos = {}
+    for csv_path in sorted(raw_dir.glob('*.csv')):
+        digest = hash_archivo(csv_path)
+        if digest in vistos:
+            duplicados.append({'fuente': csv_path.name, 'duplicado_de': vistos[digest]})
+        else:
+            vistos[digest] = csv_path.name
+            fuentes.append(csv_path)
+
+    print(f"Normalizando {len(fuentes)} archivos raw de {raw_dir} "
+          f"({len(duplicados)} duplicados omitidos)...")
+    if output_dir.exists():
+        shutil.rmtree(output_dir)
+    output_dir.mkdir(parents=True)
+
+    resumenes = []
+    max_workers = min(max_workers or os.cpu_count() or 1, max(len(fuentes), 1))
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futuros = {pool.submit(_normalizar_fuente, csv_path, output_dir): csv_path for csv_path in fuentes}
+        for futuro, csv_path in futuros.items():
+            try:
+                resumen = futuro.result()
+            except Exception as e:
+                resumen = {'fuente': csv_path.name, 'error': f"{type(e).__name__}: {e}"}
+                print(f"  ✗ {csv_path.name}: {resumen['error']}")
+            else:
+                print(f"  ✓ {resumen['fuente']}: edición {resumen['edicion']}, "
+                      f"{resumen['filas']} filas, {resumen['columnas']} columnas "
+                      f"(separador '{resumen['separador']}')")
+            resumenes.append(resumen)
+
+    for duplicado in duplicados:
+        print(f"  = {duplicado['fuente']}: idéntico a {duplicado['duplicado_de']}, omitido")
+
+    with open(output_dir / 'manifiesto.json', 'w', encoding='utf-8') as f:
+        json.dump(resumenes + duplicados, f, ensure_ascii=False, indent=2)
+
+    return resumenes + duplicados
+
+
+def main(argv=None):
     """Función principal"""
+    parser = argparse.ArgumentParser(description='Normaliza el CSV de la Encuesta Salarial')
+    parser.add_argument('--chunksize', type=int, default=None,
+                        help='procesar el CSV raw por bloques de N filas (memoria acotada)')
+    parser.add_argument('--csv', action='store_true',
+                        help='exportar también encuesta_normalizada.csv además del Parquet')
+    parser.add_argument('--incremental', action='store_true',
+                        help='normalizar solo las respuestas nuevas o modificadas desde la última corrida')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='reprocesar aunque el raw y el código no hayan cambiado')
+    parser.add_argument('--batch', action='store_true',
+                        help='normalizar todos los CSV de data/raw (ediciones y backups) en paralelo')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='procesos para --batch (por defecto, cantidad de CPUs)')
+    parser.add_argument('--report', type=Path, default=None,
+                        help='reporte JSON con tiempo, CPU, memoria y filas por etapa '
+                             '(por defecto data/processed/encuesta_normalizada.metricas.json)')
+    parser.add_argument('--no-tracemalloc', action='store_true',
+                        help='no medir memoria en el reporte (tracemalloc hace más lentas las etapas)')
+    args = parser.parse_args(argv)
+    if args.incremental and (args.csv or args.chunksize):
+        parser.error('--incremental no se puede combinar con --csv ni --chunksize')
+    if args.batch and (args.incremental or args.csv or args.chunksize):
+        parser.error('--batch no se puede combinar con --incremental, --csv ni --chunksize')
+
     # Rutas
     base_path = Path(__file__).parent.parent.parent
+
+    if args.batch:
+        output_dir = base_path / datos.DIRECTORIO_EDICIONES
+        resumenes = normalizar_lote(base_path / 'data' / 'raw', output_dir, max_workers=args.workers)
+        errores = [r for r in resumenes if 'error' in r]
+        if errores:
+            print(f"\n⚠ {len(errores)} archivos no se pudieron normalizar")
+            sys.exit(1)
+        print(f"\n✅ Dataset por edición generado en {output_dir}")
+        return
+
     csv_path = base_path / 'data' / 'raw' / 'encuesta_salarial.csv'
+    output_parquet = base_path / 'data' / 'processed' / 'encuesta_normalizada.parquet'
     output_csv = base_path / 'data' / 'processed' / 'encuesta_normalizada.csv'
     output_mapping = base_path / 'data' / 'config' / 'mapeo_columnas.json'
+    output_state = base_path / 'data' / 'processed' / 'encuesta_normalizada.state.json'
+    output_beneficios = base_path / MATRIZ_BENEFICIOS
+    output_report = args.report or base_path / 'data' / 'processed' / 'encuesta_normalizada.metricas.json'
 
     # Crear directorios si no existen
-    output_csv.parent.mkdir(parents=True, exist_ok=True)
+    output_parquet.parent.mkdir(parents=True, exist_ok=True)
     output_mapping.parent.mkdir(parents=True, exist_ok=True)
 
+    # Cache por contenido: raw + código que da forma a las salidas (normalizador, escritura
+    # de parquet, matriz de beneficios) + versión de las reglas
+    salidas = [output_parquet, output_mapping, mapping_meta_path(output_mapping), output_state,
+               output_beneficios]
+    if args.csv:
+        salidas.append(output_csv)
+    cache = CacheResultados(base_path / 'data' / 'cache' / 'etl')
+    clave = clave_cache([csv_path, __file__, datos.__file__, beneficios.__file__],
+                        extras=[f'reglas={COLUMN_RULES_VERSION}', *(p.name for p in salidas)])
+
+    modo = 'incremental' if args.incremental else 'streaming' if args.chunksize else 'completo'
+    registro = RegistroEtapas(memoria=not args.no_tracemalloc)
+    contexto = {'fuente': csv_path.name, 'modo': modo, 'chunksize': args.chunksize}
+
+    if not args.no_cache and cache.restaurar(clave, salidas):
+        registro.guardar(output_report, **contexto, cache='hit')
+        print(f"✓ Cache hit ({clave[:12]}): raw y código sin cambios, resultados restaurados sin reprocesar")
+        for path in salidas:
+            print(f"  - {path}")
+        return
+    estado = "Cache desactivada (--no-cache)" if args.no_cache else f"Cache miss ({clave[:12]})"
+    print(f"{estado}: procesando {csv_path.name}...\n")
+
     # Ejecutar pipeline
-    normalizer = EncuestaNormalizer(csv_path)
-    normalizer.load_data() \
-              .generate_column_mapping() \
-              .normalize() \
-              .clean_data() \
-              .save_normalized(output_csv) \
-              .save_mapping(output_mapping) \
-              .get_summary()
+    normalizer = EncuestaNormalizer(csv_path, registro=registro)
+    if args.incremental:
+        normalizer.normalize_incremental(output_parquet, output_state, cache_path=output_mapping) \
+                  .save_mapping(output_mapping) \
+                  .get_summary()
+    elif args.chunksize:
+        normalizer.normalize_streaming(output_parquet, chunksize=args.chunksize, cache_path=output_mapping,
+                                       csv_path=output_csv if args.csv else None) \
+                  .save_mapping(output_mapping)
+    else:
+        normalizer.generate_column_mapping(cache_path=output_mapping) \
+                  .load_data() \
+                  .normalize() \
+                  .clean_data() \
+                  .save_normalized(output_parquet)
+        if args.csv:
+            normalizer.save_normalized(output_csv)
+        normalizer.save_mapping(output_mapping) \
+                  .get_summary()
+
+    normalizer.save_benefit_matrix(output_beneficios, output_parquet) \
+              .save_state(output_state)
+    cache.guardar(clave, salidas)
+    registro.guardar(output_report, **contexto, cache='desactivada' if args.no_cache else 'miss')
+    registro.imprimir()
 
     print("\n✅ Normalización completada exitosamente!")
     print(f"\nArchivos generados:")
-    print(f"  - {output_csv}")
+    print(f"  - {output_parquet}")
+    if args.csv:
+        print(f"  - {output_csv}")
     print(f"  - {output_mapping}")
+    print(f"  - {output_beneficios}")
+    print(f"  - {output_report}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,92 @@
+"""
+Cache de resultados del pipeline direccionado por contenido
+Si las entradas (archivos de datos y código) no cambiaron, se reutilizan las salidas de una corrida anterior
+"""
+
+import hashlib
+import shutil
+import tempfile
+from pathlib import Path
+
+# Versión del formato de las entradas (data/cache/<etapa>/<clave>/<archivo>);
+# forma parte de toda clave para que un cambio de formato no restaure entradas viejas
+VERSION_CACHE = 1
+
+
+def hash_archivo(path, block_size=1 << 20):
+    """sha256 del contenido de un archivo"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for bloque in iter(lambda: f.read(block_size), b''):
+            digest.update(bloque)
+    return digest.hexdigest()
+
+
+def clave_cache(archivos, extras=()):
+    """
+    Clave de cache a partir del contenido de los archivos de entrada
+
+    Args:
+        archivos: rutas de entrada (datos raw, módulos de código, etc.)
+        extras: strings adicionales que también invalidan la cache (ej: versión de reglas)
+
+    Returns:
+        str hexadecimal (sha256)
+    """
+    digest = hashlib.sha256(f'cache={VERSION_CACHE}'.encode('utf-8'))
+    for path in archivos:
+        digest.update(Path(path).name.encode('utf-8'))
+        digest.update(hash_archivo(path).encode('ascii'))
+    for extra in extras:
+        digest.update(str(extra).encode('utf-8'))
+    return digest.hexdigest()
+
+
+class CacheResultados:
+    """Guarda y restaura las salidas de una corrida en data/cache/<etapa>/<clave>/"""
+
+    def __init__(self, cache_dir, max_entradas=10):
+        self.cache_dir = Path(cache_dir)
+        self.max_entradas = max_entradas
+
+    def restaurar(self, clave, destinos):
+        """
+        Copia las salidas guardadas para la clave a sus destinos
+
+        Returns:
+            True si todas las salidas estaban en cache (hit), False si no (miss)
+        """
+        entrada = self.cache_dir / clave
+        if not all((entrada / Path(destino).name).exists() for destino in destinos):
+            return False
+
+        for destino in destinos:
+            Path(destino).parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(entrada / Path(destino).name, destino)
+        return True
+
+    def guardar(self, clave, archivos):
+        """Guarda una copia de las salidas bajo la clave (escritura atómica)"""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        entrada = self.cache_dir / clave
+        if entrada.exists():
+            return
+
+        # Copiar a un directorio temporal y renombrar: nunca queda una entrada a medias
+        tmp = Path(tempfile.mkdtemp(dir=self.cache_dir, prefix='.tmp-'))
+        try:
+            for archivo in archivos:
+                shutil.copy2(archivo, tmp / Path(archivo).name)
+            tmp.rename(entrada)
+        except OSError:
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise
+
+        self._podar()
+
+    def _podar(self):
+        """Conserva solo las max_entradas más recientes"""
+        entradas = sorted((p for p in self.cache_dir.iterdir() if p.is_dir() and not p.name.startswith('.')),
+                          key=lambda p: p.stat().st_mtime, reverse=True)
+        for vieja in entradas[self.max_entradas:]:
+            shutil.rmtree(vieja, ignore_errors=True)
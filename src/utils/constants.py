@@ -87,6 +87,27 @@ AREAS_FUNCIONALES = {
     'Pasante': ['pasante', 'joven_profesional']
 }
 
+# Niveles jerárquicos: nombre corto de los cargos de cada nivel, los mismos que promedia
+# el QA Excel de Perfil Humano (como en el QA, director_rrhh y las jefaturas de alimentos
+# y bebidas, finanzas, créditos y cobranzas, planificación y mantenimiento no cuentan)
+NIVELES_JERARQUIA = {
+    'CEO': ['ceo'],
+    'DIRECTOR': ['director_comercial', 'director_it', 'director_operaciones', 'director_admin_finanzas'],
+    'GERENTE': [
+        'gerente_ventas', 'gerente_marketing', 'gerente_comex', 'gerente_ops_hotel', 'gerente_admin_conta',
+        'gerente_planta', 'gerente_enologia', 'gerente_agricola', 'gerente_supply_chain',
+        'gerente_mantenimiento', 'gerente_compras', 'gerente_calidad', 'gerente_seguridad', 'gerente_rrhh',
+        'gerente_it',
+    ],
+    'JEFE': [
+        'jefe_ventas', 'jefe_marketing', 'jefe_hospitalidad', 'jefe_salon', 'jefe_recepcion_hotel',
+        'jefe_admin_conta', 'jefe_impuestos', 'jefe_control_gestion', 'jefe_produccion', 'jefe_bodega',
+        'jefe_laboratorio', 'jefe_logistica', 'jefe_compras', 'jefe_calidad', 'jefe_seguridad',
+        'jefe_ingenieria', 'jefe_obra', 'jefe_rrhh', 'jefe_seleccion', 'jefe_desarrollo', 'jefe_redes',
+        'jefe_soporte',
+    ],
+}
+
 # Beneficios monetarios
 BENEFICIOS_MONETARIOS = [
     '💵  Medicina Prepaga para el empleado y grupo familiar',
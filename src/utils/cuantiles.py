@@ -0,0 +1,175 @@
+"""
+Resúmenes de cuantiles combinables (t-digest)
+Permiten calcular percentiles agregados de varias ediciones o regiones sin volver a
+leer las respuestas individuales
+"""
+
+import numpy as np
+import pandas as pd
+
+# Cantidad máxima de centroides de un resumen (más = más preciso y más grande)
+COMPRESION_RESUMEN = 100
+
+
+def _escala(q, compresion):
+    """Función de escala k1 del t-digest: centroides chicos en las colas, grandes en el centro"""
+    return compresion / (2 * np.pi) * np.arcsin(2 * q - 1)
+
+
+def _escala_inversa(k, compresion):
+    """Inversa de _escala"""
+    return (np.sin(min(k * 2 * np.pi / compresion, np.pi / 2)) + 1) / 2
+
+
+def _comprimir(medias, pesos, compresion):
+    """
+    Ordena los centroides y, si son más que `compresion`, fusiona los vecinos
+
+    Cada centroide abarca como máximo una unidad de la función de escala, así que
+    quedan del orden de compresion / 2 centroides.
+    """
+    orden = np.argsort(medias, kind='stable')
+    medias = medias[orden]
+    pesos = pesos[orden]
+    if len(medias) <= compresion:
+        return medias, pesos
+
+    n = pesos.sum()
+    nuevas_medias, nuevos_pesos = [], []
+    acumulado = 0.0
+    limite = n * _escala_inversa(_escala(0.0, compresion) + 1, compresion)
+    media_actual, peso_actual = medias[0], pesos[0]
+    for media, peso in zip(medias[1:], pesos[1:]):
+        if acumulado + peso_actual + peso <= limite:
+            peso_actual += peso
+            media_actual += (media - media_actual) * peso / peso_actual
+        else:
+            nuevas_medias.append(media_actual)
+            nuevos_pesos.append(peso_actual)
+            acumulado += peso_actual
+            limite = n * _escala_inversa(_escala(acumulado / n, compresion) + 1, compresion)
+            media_actual, peso_actual = media, peso
+    nuevas_medias.append(media_actual)
+    nuevos_pesos.append(peso_actual)
+    return np.array(nuevas_medias), np.array(nuevos_pesos)
+
+
+class ResumenCuantiles:
+    """
+    Resumen de una distribución para estimar cuantiles, combinable con otros (t-digest)
+
+    Guarda centroides (media, peso) ordenados más el mínimo y el máximo. Mientras haya
+    a lo sumo `compresion` valores se guardan todos y los percentiles son exactos (la
+    misma interpolación que Series.quantile); por encima se fusionan centroides, con
+    más resolución en las colas. La memoria queda acotada por `compresion` y el error
+    en el cuantil q es del orden de q·(1 - q) / compresion en rango.
+    """
+
+    def __init__(self, medias=(), pesos=(), minimo=np.nan, maximo=np.nan, compresion=COMPRESION_RESUMEN):
+        self.compresion = int(compresion)
+        self.medias, self.pesos = _comprimir(np.asarray(medias, dtype='float64'),
+                                             np.asarray(pesos, dtype='float64'), self.compresion)
+        self.minimo = float(minimo)
+        self.maximo = float(maximo)
+
+    @classmethod
+    def desde_valores(cls, valores, compresion=COMPRESION_RESUMEN):
+        """Resumen de un array de valores (se ignoran los NaN)"""
+        valores = np.asarray(valores, dtype='float64')
+        valores = valores[~np.isnan(valores)]
+        if len(valores) == 0:
+            return cls(compresion=compresion)
+        return cls(valores, np.ones(len(valores)), valores.min(), valores.max(), compresion)
+
+    @property
+    def n(self):
+        """Cantidad de valores resumidos"""
+        return int(round(self.pesos.sum()))
+
+    def combinar(self, *otros):
+        """
+        Resumen de la unión de este y otros resúmenes (no modifica ninguno)
+
+        La compresión del resultado es la menor de las combinadas.
+        """
+        resumenes = [self, *otros]
+        return ResumenCuantiles(
+            np.concatenate([r.medias for r in resumenes]),
+            np.concatenate([r.pesos for r in resumenes]),
+            np.nanmin([r.minimo for r in resumenes]) if any(r.n for r in resumenes) else np.nan,
+            np.nanmax([r.maximo for r in resumenes]) if any(r.n for r in resumenes) else np.nan,
+            min(r.compresion for r in resumenes),
+        )
+
+    def percentiles(self, qs):
+        """
+        Percentiles estimados (interpolación lineal, como Excel PERCENTILE.INC)
+
+        Args:
+            qs: cuantiles entre 0 y 1 (ej: [0.25, 0.5, 0.75])
+
+        Returns:
+            array con un valor por cuantil (NaN si el resumen está vacío)
+        """
+        qs = np.asarray(qs, dtype='float64')
+        if ((qs < 0) | (qs > 1)).any():
+            raise ValueError("Los cuantiles deben estar entre 0 y 1")
+        n = self.pesos.sum()
+        if n == 0:
+            return np.full(qs.shape, np.nan)
+
+        # Cada centroide se ubica en el centro de su rango de posiciones; con todos los
+        # pesos en 1 el centro del valor i es i + 0.5 y la interpolación es la exacta
+        centros = np.cumsum(self.pesos) - self.pesos / 2
+        posiciones, valores = [centros], [self.medias]
+        if self.pesos[0] > 1:
+            posiciones.insert(0, [0.5])
+            valores.insert(0, [self.minimo])
+        if self.pesos[-1] > 1:
+            posiciones.append([n - 0.5])
+            valores.append([self.maximo])
+        return np.interp(qs * (n - 1) + 0.5, np.concatenate(posiciones), np.concatenate(valores))
+
+    def __repr__(self):
+        return f"ResumenCuantiles(n={self.n}, centroides={len(self.medias)}, compresion={self.compresion})"
+
+
+def tabla_resumenes(resumenes):
+    """
+    Tabla serializable (ej: a Parquet) de un dict {(cargo, segmento): ResumenCuantiles}
+
+    Returns:
+        DataFrame con una fila por resumen: cargo, segmento, n, minimo, maximo,
+        compresion, medias y pesos (listas)
+    """
+    filas = [
+        {'cargo': cargo, 'segmento': segmento, 'n': resumen.n, 'minimo': resumen.minimo,
+         'maximo': resumen.maximo, 'compresion': resumen.compresion,
+         'medias': resumen.medias.tolist(), 'pesos': resumen.pesos.tolist()}
+        for (cargo, segmento), resumen in resumenes.items()
+    ]
+    return pd.DataFrame(filas, columns=['cargo', 'segmento', 'n', 'minimo', 'maximo', 'compresion',
+                                        'medias', 'pesos'])
+
+
+def resumenes_desde_tabla(tabla):
+    """Inversa de tabla_resumenes"""
+    return {
+        (fila.cargo, fila.segmento): ResumenCuantiles(fila.medias, fila.pesos, fila.minimo, fila.maximo,
+                                                      fila.compresion)
+        for fila in tabla.itertuples(index=False)
+    }
+
+
+def combinar_resumenes(*grupos):
+    """
+    Combina varios dicts {(cargo, segmento): ResumenCuantiles} (ej: uno por edición)
+
+    Returns:
+        dict con un resumen por clave presente en al menos un grupo
+    """
+    por_clave = {}
+    for grupo in grupos:
+        for clave, resumen in grupo.items():
+            por_clave.setdefault(clave, []).append(resumen)
+    return {clave: resumenes[0].combinar(*resumenes[1:]) for clave, resumenes in por_clave.items()}
@@ -0,0 +1,354 @@
+"""
+Lectura y escritura del dataset normalizado de la Encuesta Salarial
+Define el esquema tipado del archivo Parquet que consumen el dashboard y el análisis
+"""
+
+from pathlib import Path
+
+import pandas as pd
+
+# Archivos del dataset normalizado (relativos a la raíz del proyecto)
+PARQUET_NORMALIZADO = Path('data') / 'processed' / 'encuesta_normalizada.parquet'
+CSV_NORMALIZADO = Path('data') / 'processed' / 'encuesta_normalizada.csv'
+
+# Dataset particionado con todas las ediciones y backups (edicion=<año>-S<semestre>/fuente=<nombre>/)
+DIRECTORIO_EDICIONES = Path('data') / 'processed' / 'ediciones'
+COLUMNAS_PARTICION = ['edicion', 'fuente']
+
+# Resúmenes de cuantiles de cada partición (ver cargar_resumenes_ediciones)
+RESUMENES_CUANTILES = 'resumenes_cuantiles.parquet'
+
+# Formato de "Marca temporal" en la exportación de Google Forms (ej: 15/9/25 16:05)
+FORMATO_TIMESTAMP = '%d/%m/%y %H:%M'
+
+# Formatos alternativos de exportaciones anteriores (se prueban en orden)
+FORMATOS_TIMESTAMP_ALTERNATIVOS = ['%d/%m/%Y %H:%M:%S', 'ISO8601']
+
+# Compresión del Parquet
+COMPRESION_PARQUET = 'zstd'
+
+# Columnas de texto con pocos valores distintos: se guardan como categóricas
+COLUMNAS_CATEGORICAS = ['rubro', 'rubro_corto', 'tamano', 'categoria_tamano']
+PREFIJOS_CATEGORICOS = ('benef_',)
+
+# Representación compacta en memoria (compactar_tipos): texto con a lo sumo esta
+# proporción de valores distintos sobre filas se guarda como categórica
+PROPORCION_MAX_CATEGORICA = 0.5
+
+
+def es_categorica(col):
+    """Indica si una columna del dataset normalizado se guarda como categórica"""
+    return col in COLUMNAS_CATEGORICAS or col.startswith(PREFIJOS_CATEGORICOS)
+
+
+def parsear_timestamp(serie):
+    """Convierte la columna timestamp a datetime probando los formatos conocidos en orden"""
+    resultado = pd.to_datetime(serie, format=FORMATO_TIMESTAMP, errors='coerce')
+    for formato in FORMATOS_TIMESTAMP_ALTERNATIVOS:
+        pendientes = resultado.isna() & serie.notna()
+        if not pendientes.any():
+            break
+        resultado[pendientes] = pd.to_datetime(serie[pendientes], format=formato, errors='coerce')
+    return resultado
+
+
+def clasificar_columnas(columns):
+    """{columna: 'salario' | 'timestamp' | 'categorica' | 'texto'} según el esquema"""
+    tipos = {}
+    for col in columns:
+        if col.startswith('salario_'):
+            tipos[col] = 'salario'
+        elif col == 'timestamp':
+            tipos[col] = 'timestamp'
+        elif es_categorica(col):
+            tipos[col] = 'categorica'
+        else:
+            tipos[col] = 'texto'
+    return tipos
+
+
+def aplicar_esquema(df, tipos=None):
+    """
+    Convierte el DataFrame normalizado a los tipos del esquema
+
+    - salario_*: float64
+    - timestamp: datetime64
+    - rubro, rubro_corto, tamano, categoria_tamano y benef_*: category
+    - resto de las columnas: texto (los vacíos quedan como NaN, igual que al
+      leer el CSV)
+
+    Args:
+        df: DataFrame normalizado (con o sin compactar_tipos)
+        tipos: clasificar_columnas(df.columns) ya calculado (ej: una vez para
+            todos los bloques de una escritura incremental)
+
+    Returns:
+        DataFrame nuevo con los tipos aplicados
+    """
+    if tipos is None:
+        tipos = clasificar_columnas(df.columns)
+    # Vacíos de todas las columnas de texto en una sola comparación
+    texto = [col for col in df.columns if df[col].dtype == object and tipos[col] != 'salario']
+    vacios = dict(zip(texto, (df[texto].to_numpy() == '').T)) if texto else {}
+
+    tipado = {}
+    for col in df.columns:
+        serie = df[col]
+        tipo = tipos[col]
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            # Viene compactado (ver compactar_tipos): el vacío sale de las categorías
+            # sin pasar cada fila por texto
+            if '' in serie.cat.categories:
+                serie = serie.cat.remove_categories([''])
+            if tipo == 'categorica':
+                # Mismas categorías que astype('category') desde el texto: las usadas, ordenadas
+                serie = serie.cat.remove_unused_categories()
+                if not serie.cat.categories.is_monotonic_increasing:
+                    serie = serie.cat.reorder_categories(sorted(serie.cat.categories))
+                tipado[col] = serie
+                continue
+            serie = serie.astype(object)
+
+        if tipo == 'salario':
+            if serie.dtype.kind != 'f':
+                serie = pd.to_numeric(serie, errors='coerce')
+            tipado[col] = serie.astype('float64')
+            continue
+
+        if serie.dtype == object:
+            vacio = vacios[col] if col in vacios else (serie == '').to_numpy()
+            if vacio.any():
+                serie = serie.mask(vacio)
+
+        if tipo == 'timestamp':
+            tipado[col] = parsear_timestamp(serie)
+        elif tipo == 'categorica':
+            tipado[col] = serie.astype('category')
+        else:
+            tipado[col] = serie
+
+    return pd.DataFrame(tipado, index=df.index)
+
+
+def compactar_tipos(df):
+    """
+    Representación compacta del DataFrame normalizado para tenerlo en memoria
+
+    - salario_*: float32 cuando todos los valores se representan exactamente
+      (si no, quedan en float64)
+    - texto con pocos valores distintos (rubro, tamaño, benef_*, bonus_*, aumentos,
+      previsiones, etc.): category, cada respuesta queda como un código entero del
+      menor ancho que alcanza (pandas usa int8 con menos de 127 valores distintos,
+      si no int16)
+    - timestamp y texto libre: sin cambios
+
+    No cambia ningún valor: guardar_parquet y to_csv producen los mismos archivos
+    que con el DataFrame original.
+
+    Returns:
+        DataFrame nuevo con los tipos compactos
+    """
+    compacto = {}
+    for col in df.columns:
+        serie = df[col]
+        if col.startswith('salario_') and serie.dtype == 'float64':
+            reducida = serie.astype('float32')
+            if reducida.astype('float64').equals(serie):
+                serie = reducida
+        elif col != 'timestamp' and serie.dtype == object:
+            if serie.nunique() <= PROPORCION_MAX_CATEGORICA * len(serie):
+                serie = serie.astype('category')
+        compacto[col] = serie
+    return pd.DataFrame(compacto, index=df.index)
+
+
+def memoria_por_tipo(df):
+    """Bytes en memoria del DataFrame por dtype (incluye el contenido de los strings)"""
+    uso = df.memory_usage(deep=True, index=False)
+    return uso.groupby(df.dtypes.astype(str)).sum()
+
+
+def esquema_arrow(columns):
+    """
+    Esquema Arrow explícito para las columnas del dataset normalizado
+
+    Se arma solo a partir de los nombres de columna, así todos los bloques de una
+    escritura incremental comparten exactamente los mismos tipos.
+    """
+    import pyarrow as pa
+
+    tipos_arrow = {
+        'salario': pa.float64(),
+        'timestamp': pa.timestamp('ns'),
+        'categorica': pa.dictionary(pa.int32(), pa.string()),
+        'texto': pa.string(),
+    }
+    return pa.schema([pa.field(col, tipos_arrow[tipo]) for col, tipo in clasificar_columnas(columns).items()])
+
+
+def tabla_arrow(df, esquema=None, tipos=None):
+    """
+    Convierte el DataFrame normalizado a una tabla Arrow con el esquema explícito
+
+    Args:
+        df: DataFrame normalizado
+        esquema, tipos: esquema_arrow y clasificar_columnas de sus columnas, si ya
+            están calculados (None = calcularlos)
+    """
+    import pyarrow as pa
+
+    if tipos is None:
+        tipos = clasificar_columnas(df.columns)
+    if esquema is None:
+        esquema = esquema_arrow(df.columns)
+    return pa.Table.from_pandas(aplicar_esquema(df, tipos), schema=esquema, preserve_index=False)
+
+
+def guardar_parquet(df, output_path):
+    """Guarda el DataFrame normalizado como Parquet tipado y comprimido"""
+    import pyarrow.parquet as pq
+
+    pq.write_table(tabla_arrow(df), output_path, compression=COMPRESION_PARQUET)
+
+
+def reemplazar_filas(base, nuevas):
+    """
+    Combina filas normalizadas nuevas o modificadas con el dataset existente
+
+    Las filas se identifican por el índice (posición de la respuesta en el CSV raw):
+    las de `nuevas` reemplazan a las de `base` con el mismo índice y el resto se agrega.
+
+    Args:
+        base: dataset normalizado existente (tipado)
+        nuevas: filas normalizadas (sin tipar o tipadas)
+
+    Returns:
+        DataFrame tipado ordenado por índice, con las categorías recalculadas
+    """
+    nuevas = aplicar_esquema(nuevas)
+    combinado = pd.concat([base.drop(index=nuevas.index, errors='ignore'), nuevas])
+    combinado = combinado.sort_index()[base.columns]
+
+    for col in combinado.columns:
+        if es_categorica(col):
+            combinado[col] = combinado[col].astype(object).astype('category')
+    return combinado
+
+
+def _ordenar_categorias(df):
+    """Deja las categorías ordenadas alfabéticamente (como astype('category'))"""
+    for col in df.columns:
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            categorias = df[col].cat.categories
+            if not categorias.is_monotonic_increasing:
+                df[col] = df[col].cat.reorder_categories(sorted(categorias))
+    return df
+
+
+def cargar_encuesta_normalizada(base_path, columns=None):
+    """
+    Carga el dataset normalizado con sus tipos
+
+    Lee el Parquet si existe (sin inferencia de tipos y solo las columnas pedidas);
+    si no, cae al CSV y le aplica el esquema.
+
+    Args:
+        base_path: raíz del proyecto
+        columns: lista de columnas a leer (None = todas). Las que no existen se ignoran.
+
+    Returns:
+        DataFrame normalizado
+    """
+    base_path = Path(base_path)
+    parquet_path = base_path / PARQUET_NORMALIZADO
+
+    if parquet_path.exists():
+        if columns is not None:
+            import pyarrow.parquet as pq
+            disponibles = set(pq.read_schema(parquet_path).names)
+            columns = [col for col in columns if col in disponibles]
+        return _ordenar_categorias(pd.read_parquet(parquet_path, columns=columns))
+
+    usecols = None if columns is None else (lambda col: col in columns)
+    df = pd.read_csv(base_path / CSV_NORMALIZADO, usecols=usecols, dtype=str, keep_default_na=False)
+    return aplicar_esquema(df)
+
+
+def quitar_categorias_vacias(df):
+    """Elimina categorías sin filas (ej: después de filtrar) para que no aparezcan en conteos"""
+    for col in df.columns:
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].cat.remove_unused_categories()
+    return df
+
+
+def cargar_ediciones(base_path, columns=None, ediciones=None):
+    """
+    Carga el dataset particionado con todas las ediciones (ver normalizer --batch)
+
+    Las ediciones no tienen exactamente las mismas preguntas: el esquema es la unión
+    de todos los archivos y las columnas que faltan en una fuente quedan en NaN.
+
+    Args:
+        base_path: raíz del proyecto
+        columns: lista de columnas a leer (None = todas). Las que no existen se ignoran.
+        ediciones: lista de ediciones a leer (ej: ['2024-S2', '2025-S2']; None = todas)
+
+    Returns:
+        DataFrame normalizado con las columnas edicion y fuente
+    """
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+
+    directorio = Path(base_path) / DIRECTORIO_EDICIONES
+    archivos = sorted(directorio.glob('edicion=*/fuente=*/part-*.parquet'))
+    if not archivos:
+        raise FileNotFoundError(f"No hay dataset por edición en {directorio} (ejecutar normalizer.py --batch)")
+
+    particion = pa.schema([(col, pa.string()) for col in COLUMNAS_PARTICION])
+    esquema = pa.unify_schemas([pq.read_schema(archivo) for archivo in archivos] + [particion])
+    dataset = ds.dataset([str(archivo) for archivo in archivos], schema=esquema, format='parquet',
+                         partitioning=ds.partitioning(particion, flavor='hive'),
+                         partition_base_dir=str(directorio))
+
+    if columns is not None:
+        columns = [col for col in esquema.names if col in columns or col in COLUMNAS_PARTICION]
+    filtro = None if ediciones is None else ds.field('edicion').isin([str(e) for e in ediciones])
+    df = dataset.to_table(columns=columns, filter=filtro).to_pandas()
+
+    for col in COLUMNAS_PARTICION:
+        df[col] = df[col].astype('category')
+    return _ordenar_categorias(df)
+
+
+def cargar_resumenes_ediciones(base_path, ediciones=None, fuentes=None):
+    """
+    Combina los resúmenes de cuantiles de las particiones del dataset por edición
+
+    Permite calcular percentiles agregados de varias ediciones sin leer las respuestas.
+    Los backups de una misma edición repiten respuestas: conviene elegir las fuentes.
+
+    Args:
+        base_path: raíz del proyecto
+        ediciones: lista de ediciones a combinar (ej: ['2024-S2', '2025-S2']; None = todas)
+        fuentes: lista de fuentes a combinar (nombre del CSV sin extensión; None = todas)
+
+    Returns:
+        dict {(cargo, segmento): ResumenCuantiles}
+    """
+    from src.utils.cuantiles import resumenes_desde_tabla, combinar_resumenes
+
+    directorio = Path(base_path) / DIRECTORIO_EDICIONES
+    grupos = []
+    for archivo in sorted(directorio.glob(f'edicion=*/fuente=*/{RESUMENES_CUANTILES}')):
+        edicion = archivo.parent.parent.name.split('=', 1)[1]
+        fuente = archivo.parent.name.split('=', 1)[1]
+        if ediciones is not None and edicion not in [str(e) for e in ediciones]:
+            continue
+        if fuentes is not None and fuente not in fuentes:
+            continue
+        grupos.append(resumenes_desde_tabla(pd.read_parquet(archivo)))
+    if not grupos:
+        raise FileNotFoundError(f"No hay resúmenes de cuantiles en {directorio} (ejecutar normalizer.py --batch)")
+    return combinar_resumenes(*grupos)
@@ -0,0 +1,141 @@
+"""
+Métricas por etapa del pipeline (tiempo, CPU, memoria y tamaño de los datos)
+Genera un reporte JSON por corrida para seguir regresiones de rendimiento del ETL
+"""
+
+import functools
+import json
+import platform
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+import pandas as pd
+
+MB = 1024 * 1024
+
+
+class RegistroEtapas:
+    """
+    Registra tiempo de pared, tiempo de CPU, pico de memoria (tracemalloc) y
+    filas/columnas de cada etapa
+
+    Las etapas pueden anidarse (ej: normalize_incremental llama a load_data): cada
+    una se registra con su nivel y el pico de la etapa externa incluye el de las
+    internas.
+
+    tracemalloc hace varias veces más lentas las etapas con mucho código Python:
+    con memoria=False solo se miden tiempos y tamaños.
+    """
+
+    def __init__(self, memoria=True):
+        self.etapas = []
+        self.inicio = datetime.now()
+        self._t0 = time.perf_counter()
+        self._cpu0 = time.process_time()
+        self._picos = []
+        self.memoria = memoria
+        self._inicio_tracemalloc = memoria and not tracemalloc.is_tracing()
+        if self._inicio_tracemalloc:
+            tracemalloc.start()
+
+    @contextmanager
+    def etapa(self, nombre):
+        """
+        Mide el bloque como una etapa
+
+        Yields:
+            dict de la etapa; se le pueden agregar 'filas' y 'columnas' antes de salir
+        """
+        if self.memoria:
+            if self._picos:
+                self._picos[-1] = max(self._picos[-1], tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+            memoria_inicial = tracemalloc.get_traced_memory()[0]
+        self._picos.append(0)
+
+        registro = {'etapa': nombre, 'nivel': len(self._picos) - 1}
+        self.etapas.append(registro)
+        t0 = time.perf_counter()
+        cpu0 = time.process_time()
+        try:
+            yield registro
+        finally:
+            registro['tiempo_s'] = round(time.perf_counter() - t0, 4)
+            registro['cpu_s'] = round(time.process_time() - cpu0, 4)
+            pico = self._picos.pop()
+            if self.memoria:
+                actual, pico_actual = tracemalloc.get_traced_memory()
+                pico = max(pico, pico_actual)
+                registro['memoria_pico_mb'] = round(pico / MB, 2)
+                registro['memoria_neta_mb'] = round((actual - memoria_inicial) / MB, 2)
+            if self._picos:
+                self._picos[-1] = max(self._picos[-1], pico)
+
+    def detener(self):
+        """Detiene tracemalloc si lo inició este registro"""
+        if self._inicio_tracemalloc and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self._inicio_tracemalloc = False
+
+    def reporte(self, **contexto):
+        """Reporte de la corrida: contexto + totales + etapas"""
+        pico = None
+        if self.memoria:
+            pico = max((e['memoria_pico_mb'] for e in self.etapas if e['nivel'] == 0), default=0)
+        return {
+            'inicio': self.inicio.isoformat(timespec='seconds'),
+            **contexto,
+            'tiempo_s': round(time.perf_counter() - self._t0, 4),
+            'cpu_s': round(time.process_time() - self._cpu0, 4),
+            'memoria_pico_mb': pico,
+            'entorno': {
+                'python': platform.python_version(),
+                'pandas': pd.__version__,
+                'plataforma': platform.platform(),
+            },
+            'etapas': self.etapas,
+        }
+
+    def guardar(self, output_path, **contexto):
+        """Escribe el reporte JSON de la corrida y detiene la medición"""
+        self.detener()
+        reporte = self.reporte(**contexto)
+        with open(output_path, 'w', encoding='utf-8') as f:
+            json.dump(reporte, f, ensure_ascii=False, indent=2)
+        return reporte
+
+    def imprimir(self):
+        """Tabla resumida de las etapas"""
+        print(f"\n{'Etapa':<32}{'Tiempo (s)':>11}{'CPU (s)':>9}{'Pico (MB)':>11}{'Filas':>8}{'Cols':>6}")
+        for e in self.etapas:
+            nombre = '  ' * e['nivel'] + e['etapa']
+            filas = e.get('filas')
+            columnas = e.get('columnas')
+            pico = e.get('memoria_pico_mb')
+            print(f"{nombre:<32}{e['tiempo_s']:>11.3f}{e['cpu_s']:>9.3f}{'-' if pico is None else pico:>11}"
+                  f"{'-' if filas is None else filas:>8}{'-' if columnas is None else columnas:>6}")
+
+
+def etapa_medida(metodo):
+    """
+    Decorador para métodos de etapa de un pipeline con atributo `registro`
+
+    Si el objeto no tiene registro (None) el método se ejecuta sin medir. Las filas
+    y columnas se toman de `self._forma()` al terminar la etapa.
+    """
+    @functools.wraps(metodo)
+    def envoltura(self, *args, **kwargs):
+        registro = getattr(self, 'registro', None)
+        if registro is None:
+            return metodo(self, *args, **kwargs)
+
+        with registro.etapa(metodo.__name__) as etapa:
+            resultado = metodo(self, *args, **kwargs)
+            forma = self._forma()
+            if forma is not None:
+                etapa['filas'], etapa['columnas'] = int(forma[0]), int(forma[1])
+        return resultado
+
+    return envoltura
@@ -0,0 +1,28 @@
+"""
+Tests de los artefactos publicados en data/processed
+"""
+
+import shutil
+from pathlib import Path
+
+import pandas as pd
+
+from src.analytics.artefactos import intervalos_bootstrap_en_cache
+from src.analytics.estadisticas import EstadisticasSalariales
+
+BASE_PATH = Path(__file__).parent
+
+
+def test_intervalos_bootstrap_desde_el_parquet_publicado(tmp_path, monkeypatch):
+    # Réplica nueva: solo data/processed, sin data/cache
+    procesados = tmp_path / 'data' / 'processed'
+    procesados.mkdir(parents=True)
+    for archivo in ['encuesta_normalizada.parquet', 'intervalos_bootstrap.parquet']:
+        shutil.copy2(BASE_PATH / 'data' / 'processed' / archivo, procesados / archivo)
+
+    def no_recalcular(*args, **kwargs):
+        raise AssertionError("el parquet publicado está al día")
+
+    monkeypatch.setattr(EstadisticasSalariales, 'intervalos_bootstrap', no_recalcular)
+    intervalos = intervalos_bootstrap_en_cache(tmp_path)
+    pd.testing.assert_frame_equal(intervalos, pd.read_parquet(procesados / 'intervalos_bootstrap.parquet'))
@@ -0,0 +1,47 @@
+"""
+Tests de los resúmenes de cuantiles combinables (t-digest)
+"""
+
+import numpy as np
+import pytest
+
+from src.utils.cuantiles import ResumenCuantiles, combinar_resumenes
+
+QS = [0.1, 0.25, 0.5, 0.75, 0.9]
+
+
+def test_combinar_exacto_con_pocos_valores():
+    rng = np.random.default_rng(0)
+    a, b = rng.lognormal(15, 0.5, 40), rng.lognormal(15.5, 0.4, 30)
+    combinado = ResumenCuantiles.desde_valores(a).combinar(ResumenCuantiles.desde_valores(b))
+    assert combinado.n == 70
+    np.testing.assert_allclose(combinado.percentiles(QS), np.percentile(np.concatenate([a, b]), np.multiply(QS, 100)))
+
+
+def test_combinar_aproximado_con_muchos_valores():
+    rng = np.random.default_rng(1)
+    partes = [rng.lognormal(15, 0.5, 5000) for _ in range(4)]
+    resumenes = [ResumenCuantiles.desde_valores(parte, compresion=100) for parte in partes]
+    combinado = resumenes[0].combinar(*resumenes[1:])
+    todos = np.concatenate(partes)
+    assert combinado.n == len(todos)
+    assert len(combinado.medias) <= 2 * combinado.compresion
+    assert combinado.minimo == todos.min() and combinado.maximo == todos.max()
+    np.testing.assert_allclose(combinado.percentiles(QS), np.percentile(todos, np.multiply(QS, 100)), rtol=0.01)
+
+
+def test_combinar_no_modifica_los_resumenes():
+    a = ResumenCuantiles.desde_valores([1.0, 2.0, 3.0])
+    b = ResumenCuantiles.desde_valores([4.0, np.nan])
+    a.combinar(b)
+    assert (a.n, b.n) == (3, 1)
+    assert a.maximo == 3.0
+
+
+def test_combinar_resumenes_por_clave():
+    grupos = [{('salario_ceo', 'General'): ResumenCuantiles.desde_valores([1.0, 2.0])},
+              {('salario_ceo', 'General'): ResumenCuantiles.desde_valores([3.0]),
+               ('salario_cfo', 'General'): ResumenCuantiles.desde_valores([5.0])}]
+    combinados = combinar_resumenes(*grupos)
+    assert combinados[('salario_ceo', 'General')].percentiles([0.5])[0] == pytest.approx(2.0)
+    assert combinados[('salario_cfo', 'General')].n == 1
@@ -5,8 +5,9 @@ import pandas as pd
 import sys
 from pathlib import Path
 
-sys.path.insert(0, 'src')
-from analytics.estadisticas import EstadisticasSalariales
+sys.path.insert(0, str(Path(__file__).parent))
+from src.analytics.estadisticas import EstadisticasSalariales
+from src.utils.datos import cargar_encuesta_normalizada
 
 print("="*70)
 print("   DASHBOARD ENCUESTA SALARIAL 2025 - VERIFICACIÓN")
@@ -14,7 +15,7 @@ print("="*70)
 
 # 1. Cargar datos
 print("\n1️⃣ CARGANDO DATOS...")
-df = pd.read_csv('data/processed/encuesta_normalizada.csv')
+df = cargar_encuesta_normalizada('.')
 print(f"   ✓ {len(df)} empresas cargadas")
 print(f"   ✓ {len(df.columns)} columnas procesadas")
 
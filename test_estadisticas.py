@@ -0,0 +1,62 @@
+"""
+Tests del motor de estadísticas: modo perezoso contra el cálculo completo
+"""
+
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from src.analytics.estadisticas import EstadisticasSalariales, _StatsPerezosas
+from src.utils.datos import cargar_encuesta_normalizada
+
+BASE_PATH = Path(__file__).parent
+
+
+@pytest.fixture(scope='module')
+def df():
+    return cargar_encuesta_normalizada(BASE_PATH)
+
+
+@pytest.fixture(scope='module')
+def completas(df):
+    return EstadisticasSalariales(df).calcular_todos_los_cargos()
+
+
+def test_tabla_resumen_perezosa_igual_a_completa(df, completas):
+    perezosas = EstadisticasSalariales(df, perezoso=True)
+    pd.testing.assert_frame_equal(perezosas.crear_tabla_resumen(), completas.crear_tabla_resumen())
+    # La tabla se arma aparte: stats_por_cargo sigue siendo la vista perezosa
+    assert all(isinstance(data['stats'], _StatsPerezosas) for data in perezosas.stats_por_cargo.values())
+
+
+def test_exportar_estadisticas_perezosas(df, tmp_path):
+    EstadisticasSalariales(df, perezoso=True).exportar_estadisticas(tmp_path / 'estadisticas.xlsx')
+    resumen = pd.read_excel(tmp_path / 'estadisticas.xlsx', sheet_name='Resumen_Cargos')
+    assert len(resumen) == 20
+
+
+def test_perezosas_iguales_a_completas(df, completas):
+    perezosas = EstadisticasSalariales(df, perezoso=True)
+    assert list(perezosas.stats_por_cargo) == list(completas.stats_por_cargo)
+    for cargo, data in completas.stats_por_cargo.items():
+        assert perezosas.stats_por_cargo[cargo]['nombre'] == data['nombre']
+        for segmento, stats in data['stats'].items():
+            perezosa = perezosas.estadisticas_cargo(cargo, segmento)
+            if stats is None:
+                assert perezosa is None
+            else:
+                assert perezosa == pytest.approx(stats, nan_ok=True)
+    pd.testing.assert_frame_equal(perezosas.get_top_cargos(20), completas.get_top_cargos(20))
+
+
+def test_cache_lru_perezosa(df):
+    perezosas = EstadisticasSalariales(df, perezoso=True, tamano_cache=2)
+    perezosas.estadisticas_cargo('salario_ceo')
+    perezosas.estadisticas_cargo('salario_ceo')
+    perezosas.estadisticas_cargo('salario_ceo', 'Grande')
+    perezosas.estadisticas_cargo('salario_ceo', 'Pyme')  # descarta ('salario_ceo', 'General')
+    perezosas.estadisticas_cargo('salario_ceo')
+    assert perezosas.info_cache() == {'aciertos': 1, 'fallos': 4, 'entradas': 2, 'maximo': 2}
+    with pytest.raises(KeyError):
+        perezosas.estadisticas_cargo('salario_ceo', 'Mediana')
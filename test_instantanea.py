@@ -0,0 +1,64 @@
+"""
+Tests de las instantáneas inmutables y del proveedor que las comparte
+"""
+
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from src.analytics.estadisticas import EstadisticasSalariales
+from src.analytics.instantanea import InstantaneaEstadisticas, ProveedorEstadisticas
+from src.utils.datos import cargar_encuesta_normalizada
+
+BASE_PATH = Path(__file__).parent
+
+
+@pytest.fixture(scope='module')
+def df():
+    return cargar_encuesta_normalizada(BASE_PATH)
+
+
+@pytest.fixture(scope='module')
+def completas(df):
+    return EstadisticasSalariales(df).calcular_todos_los_cargos()
+
+
+def test_instantanea_perezosa_no_reemplaza_stats(df, completas):
+    perezosas = EstadisticasSalariales(df, perezoso=True)
+    vista = perezosas.stats_por_cargo
+    instantanea = InstantaneaEstadisticas.desde_estadisticas(perezosas)
+    assert perezosas.stats_por_cargo is vista
+    pd.testing.assert_frame_equal(instantanea.tabla_cargos, completas.tabla_cargos, check_dtype=False)
+
+
+def test_proveedor_reintenta_si_falla_el_calculo(monkeypatch):
+    proveedor = ProveedorEstadisticas(BASE_PATH)
+    firma = proveedor._firma_dataset()
+    proveedor._vigente = (firma, EstadisticasSalariales(None))
+
+    def fallar(*args, **kwargs):
+        raise OSError("disco lleno")
+
+    monkeypatch.setattr('src.analytics.instantanea.estadisticas_en_cache', fallar)
+    proveedor._construir(firma)
+    assert proveedor._vigente == (None, None)
+
+
+def test_instantanea_inmutable(completas):
+    instantanea = InstantaneaEstadisticas.desde_estadisticas(completas)
+    with pytest.raises(AttributeError):
+        instantanea.stats_por_cargo = {}
+    with pytest.raises(TypeError):
+        instantanea.stats_por_cargo['salario_ceo'] = None
+    with pytest.raises(ValueError):
+        instantanea.tabla['P50'][0] = 0
+    assert instantanea.salarios_ordenados('salario_ceo').tolist() == \
+        completas.salarios_ordenados('salario_ceo').tolist()
+
+
+def test_proveedor_comparte_la_instantanea():
+    proveedor = ProveedorEstadisticas(BASE_PATH)
+    primera = proveedor.actual()
+    assert proveedor.actual() is primera
+    assert proveedor.refrescar() is primera
@@ -0,0 +1,73 @@
+"""
+Tests de la tabla por jerarquía contra el QA Excel
+
+La tabla calculada tiene que coincidir con el QA en todas las celdas salvo las de
+DIFERENCIAS_QA, y cada causa anotada ahí tiene que alcanzar para reproducir el valor
+del QA a partir del dataset.
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from src.analytics.jerarquia import construir_tabla_jerarquia, verificar_contra_qa, VALORES_QA, DIFERENCIAS_QA
+from src.utils.constants import NIVELES_JERARQUIA
+from src.utils.datos import cargar_encuesta_normalizada
+
+BASE_PATH = Path(__file__).parent
+
+CUANTILES = {'P25': 25, 'P50': 50, 'P75': 75}
+
+
+@pytest.fixture(scope='module')
+def df():
+    return cargar_encuesta_normalizada(BASE_PATH)
+
+
+@pytest.fixture(scope='module')
+def verificacion(df):
+    return verificar_contra_qa(construir_tabla_jerarquia(df)).set_index(['segmento', 'nivel', 'estadistico'])
+
+
+def test_coincide_con_qa_salvo_diferencias_explicadas(verificacion):
+    assert len(verificacion) == 40
+    explicadas = verificacion['causa'] != ''
+    assert set(verificacion.index[explicadas]) == set(DIFERENCIAS_QA)
+    # Las celdas sin causa coinciden y las explicadas no (si no, sobra la causa)
+    assert verificacion.loc[~explicadas, 'coincide'].all()
+    assert not verificacion.loc[explicadas, 'coincide'].any()
+
+
+def _estadistico_qa(df, segmento, nivel, estadistico):
+    """Celda del QA repitiendo los errores de la planilla que anota DIFERENCIAS_QA"""
+    filas = np.flatnonzero((df['categoria_tamano'] == segmento).to_numpy())
+    rango = filas[1:] if segmento == 'Pyme' and estadistico == 'P75' else filas
+    cargos = [(cargo, estadistico) for cargo in NIVELES_JERARQUIA[nivel]]
+    if segmento == 'Pyme' and nivel == 'DIRECTOR':
+        # La columna de director_it no tiene fórmulas Pyme en el QA
+        cargos.remove(('director_it', estadistico))
+    if segmento == 'Grande' and nivel == 'DIRECTOR' and estadistico in ('P75', 'Promedio'):
+        cargos.append(('jefe_ingenieria', {'P75': 'P25', 'Promedio': 'P50'}[estadistico]))
+
+    valores_qa = []
+    for cargo, stat in cargos:
+        salarios = df[f'salario_{cargo}'].to_numpy(dtype=float)
+        respuestas = np.count_nonzero(salarios[filas] > 0)
+        valores = salarios[rango]
+        valores = valores[valores > 0]
+        if respuestas == 0 or (respuestas == 1 and stat != 'P50'):
+            valores_qa.append(0.0)
+        elif stat == 'Promedio':
+            valores_qa.append(valores.mean())
+        else:
+            valores_qa.append(np.percentile(valores, CUANTILES[stat]))
+    return np.mean(valores_qa)
+
+
+@pytest.mark.parametrize('segmento', ['Grande', 'Pyme'])
+def test_las_causas_reproducen_el_qa(df, segmento):
+    # Queda un 0.005% sin explicar en el P75 de Jefe Pyme, dentro de la tolerancia
+    for nivel, valores in VALORES_QA[segmento].items():
+        for estadistico in ['P25', 'P50', 'P75', 'Promedio']:
+            assert _estadistico_qa(df, segmento, nivel, estadistico) == pytest.approx(valores[estadistico], rel=1e-4)
@@ -0,0 +1,92 @@
+"""
+Tests del normalizador
+"""
+
+import csv
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from src.etl.normalizer import EncuestaNormalizer
+from src.utils.cache import CacheResultados, clave_cache
+
+BASE_PATH = Path(__file__).parent
+RAW = BASE_PATH / 'data' / 'raw' / 'encuesta_salarial.csv'
+
+
+def escribir_raw(path, filas):
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        csv.writer(f, delimiter=';').writerows(filas)
+
+
+def normalizar_completo(csv_path, output_path):
+    return (EncuestaNormalizer(csv_path).generate_column_mapping().load_data().normalize().clean_data()
+            .save_normalized(output_path))
+
+
+def test_incremental_igual_a_reconstruir(tmp_path, capsys):
+    with open(RAW, encoding='utf-8', newline='') as f:
+        filas = list(csv.reader(f, delimiter=';'))
+    raw = tmp_path / 'encuesta.csv'
+    parquet = tmp_path / 'incremental.parquet'
+    estado = tmp_path / 'incremental.state.json'
+
+    # Primera corrida sin las últimas 5 respuestas
+    escribir_raw(raw, filas[:-5])
+    normalizar_completo(raw, parquet).save_state(estado)
+
+    # Llegan 5 respuestas nuevas y se corrige una ya procesada
+    filas[3] = [*filas[3][:4], '16 - 20 %', *filas[3][5:]]
+    escribir_raw(raw, filas)
+    EncuestaNormalizer(raw).normalize_incremental(parquet, estado).save_state(estado)
+    salida = capsys.readouterr().out
+    assert "5 respuestas nuevas" in salida and "1 modificadas" in salida
+
+    normalizar_completo(raw, tmp_path / 'completo.parquet')
+    pd.testing.assert_frame_equal(pd.read_parquet(parquet), pd.read_parquet(tmp_path / 'completo.parquet'))
+
+
+def test_cache_restaura_las_salidas(tmp_path):
+    entrada = tmp_path / 'entrada.csv'
+    entrada.write_text('a;b\n1;2\n', encoding='utf-8')
+    salida = tmp_path / 'salida.parquet'
+    salida.write_bytes(b'resultado')
+    cache = CacheResultados(tmp_path / 'cache')
+    clave = clave_cache([entrada], extras=['v1'])
+
+    assert not cache.restaurar(clave, [salida])
+    cache.guardar(clave, [salida])
+    salida.unlink()
+    assert cache.restaurar(clave, [salida])
+    assert salida.read_bytes() == b'resultado'
+
+
+@pytest.mark.parametrize('cambio', ['contenido', 'extras'])
+def test_clave_cache_cambia_con_las_entradas(tmp_path, cambio):
+    entrada = tmp_path / 'entrada.csv'
+    entrada.write_text('a;b\n1;2\n', encoding='utf-8')
+    clave = clave_cache([entrada], extras=['v1'])
+    if cambio == 'contenido':
+        entrada.write_text('a;b\n1;3\n', encoding='utf-8')
+        assert clave_cache([entrada], extras=['v1']) != clave
+    else:
+        assert clave_cache([entrada], extras=['v2']) != clave
+
+
+def test_camino_completo_igual_al_csv_publicado(tmp_path):
+    # data/processed/encuesta_normalizada.csv es la salida de referencia del pipeline
+    normalizar_completo(RAW, tmp_path / 'encuesta_normalizada.csv')
+    assert (tmp_path / 'encuesta_normalizada.csv').read_bytes() == \
+        (BASE_PATH / 'data' / 'processed' / 'encuesta_normalizada.csv').read_bytes()
+
+
+def test_tipos_compactos(tmp_path):
+    df = normalizar_completo(RAW, tmp_path / 'encuesta_normalizada.parquet').df_normalized
+    beneficios = [col for col in df.columns if col.startswith('benef_')]
+    assert beneficios
+    for col in beneficios:
+        assert isinstance(df[col].dtype, pd.CategoricalDtype)
+        # Menos de 127 respuestas distintas: pandas guarda los códigos en int8
+        assert len(df[col].cat.categories) < 127 and df[col].cat.codes.dtype == 'int8'
+    assert (df.filter(like='salario_').dtypes == 'float32').any()